@@ -4,15 +4,21 @@ taupy is a Python 3 library for the theory of dialectical structures.
 
 from .basic import Argument, Debate, EmptyDebate
 from .basic import (Position, position_compatibility, closedness)
+from .basic import (profile, Profile)
 from .basic import (satisfiability_count, satisfiability, dict_to_prop, 
+                    literal_sets,
                     dict_to_binary, pick_random_positions_from_debate,
                     free_premises, graph_from_positions, ari,
                     subsequences_with_length, satisfiable_extensions, fetch_premises,
-                    proposition_levels_from_debate, premise_usage_count,
+                    premise_key, PremiseIndex,
+                    random_subsets,
+                    proposition_levels_from_debate, PropositionLevels,
+                    premise_usage_count,
                     select_premises, fetch_conclusion, numsat_from_density,
                     density_from_numsat,
                     z3_assertion_from_argument, z3_soft_constraints_from_position,
-                    z3_all_models, z3_solver_status)
+                    z3_all_models, z3_solver_status, z3_assertions_from_debate,
+                    z3_projected_models)
 
 from .analysis import (doj, hamming_distance, normalised_hamming_distance, bna, next_neighbours, 
                        edit_distance, normalised_edit_distance, switch_deletion_neighbourhood,
@@ -29,9 +35,13 @@ from .analysis import (doj, hamming_distance, normalised_hamming_distance, bna,
 
 from .simulation import (Simulation, FixedDebateSimulation, 
                          SocialInfluenceSimulation,
-                         experiment, introduce, response,
+                         experiment, streaming_experiment, ExperimentStore,
+                         ResultCache, sweep, SocketExecutor, serve_worker,
+                         introduce, response,
                          strategies, 
-                         Evaluation, evaluate_experiment)
+                         Evaluation, evaluate_experiment, PositionHistory,
+                         SimulationLog, LogRecord, MetricRecorder, Budget,
+                         BudgetExceeded)
 
 from .generators import generate_hierarchical_argument_map
 
@@ -39,6 +49,8 @@ __all__ = [
             # Core ontology
             'Argument', 'Debate', 'EmptyDebate', 'Position', 
             'position_compatibility', 'closedness',
+            # Profiling
+            'profile', 'Profile',
             # .analysis
             'doj', 
             'attribute_diversity_page', 'Gini_Simpson_index', 
@@ -56,18 +68,28 @@ __all__ = [
             'switch_neighbourhood',
             # .simulation
             'Simulation', 'FixedDebateSimulation', 'SocialInfluenceSimulation',
-            'experiment', 'Evaluation', 'evaluate_experiment', 'strategies',
+            'experiment', 'streaming_experiment', 'ExperimentStore',
+            'ResultCache', 'sweep', 'SocketExecutor', 'serve_worker',
+            'Evaluation', 'evaluate_experiment', 'strategies',
+            'PositionHistory',
+            'SimulationLog', 'LogRecord', 'MetricRecorder', 'Budget',
+            'BudgetExceeded',
             # Update mechanisms
             'introduce', 'response',
             # Common utilities
             'satisfiability_count', 'satisfiability', 'dict_to_prop',
+            'literal_sets',
             'dict_to_binary', 'pick_random_positions_from_debate',
             'free_premises', 'graph_from_positions', 'ari', 
             'subsequences_with_length', 'satisfiable_extensions', 'fetch_premises',
-            'proposition_levels_from_debate', 'premise_usage_count',
+            'premise_key', 'PremiseIndex',
+            'random_subsets',
+            'proposition_levels_from_debate', 'PropositionLevels',
+            'premise_usage_count',
             'fetch_conclusion', 'select_premises', 'numsat_from_density',
             'density_from_numsat',
             'z3_assertion_from_argument', 'z3_soft_constraints_from_position',
+            'z3_assertions_from_debate', 'z3_projected_models',
             'z3_all_models', 'z3_solver_status',
             # Generators
             'generate_hierarchical_argument_map'
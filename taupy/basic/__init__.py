@@ -1,14 +1,19 @@
 from .core import (Argument, Debate, EmptyDebate)
 from .positions import (Position, position_compatibility, closedness)
+from .profiling import (profile, Profile)
 
 from .utilities import (satisfiability_count, satisfiability, dict_to_prop,
+                        literal_sets,
                         dict_to_binary, pick_random_positions_from_debate,
                         free_premises, graph_from_positions, ari,
                         subsequences_with_length, satisfiable_extensions,
-                        fetch_premises, proposition_levels_from_debate,
+                        random_subsets,
+                        fetch_premises, premise_key, PremiseIndex,
+                        proposition_levels_from_debate, PropositionLevels,
                         premise_usage_count, numsat_from_density, density_from_numsat,
                         fetch_conclusion, select_premises, z3_assertion_from_argument,
                         z3_soft_constraints_from_position, z3_all_models,
+                        z3_assertions_from_debate, z3_projected_models,
                         z3_solver_status)
 
 __all__ = [
@@ -16,14 +21,21 @@ __all__ = [
             'Argument', 'Debate', 'EmptyDebate',
             # positions
             'Position', 'position_compatibility', 'closedness',
+            # profiling
+            'profile', 'Profile',
             # utilities
             'satisfiability_count', 'satisfiability', 'dict_to_prop',
+            'literal_sets',
             'dict_to_binary', 'pick_random_positions_from_debate',
             'free_premises', 'graph_from_positions', 'ari',
             'subsequences_with_length', 'satisfiable_extensions', 'fetch_premises',
-            'proposition_levels_from_debate', 'fetch_conclusion', 'select_premises',
+            'premise_key', 'PremiseIndex',
+            'random_subsets',
+            'proposition_levels_from_debate', 'PropositionLevels',
+            'fetch_conclusion', 'select_premises',
             'premise_usage_count', 'numsat_from_density', 'density_from_numsat',
             # z3 helper functions
             'z3_assertion_from_argument', 'z3_soft_constraints_from_position',
+            'z3_assertions_from_debate', 'z3_projected_models',
             'z3_all_models', 'z3_solver_status'
           ]
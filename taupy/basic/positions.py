@@ -1,5 +1,6 @@
-from taupy.basic.utilities import satisfiability, dict_to_prop
+from taupy.basic.utilities import satisfiability, dict_to_prop, literal_sets
 from sympy.logic.algorithms.dpll2 import dpll_satisfiable
+import taupy.basic.profiling as profiling
 from copy import deepcopy
 from sympy import And, Not
 
@@ -16,6 +17,76 @@ class Position(dict):
         self.update_strategy = update_strategy
         dict.__init__(self, *args)
 
+    # The literal sets are cached until the position changes.
+
+    def _literal_sets(self):
+        if self.__dict__.get("_literals") is None:
+            self._literals = literal_sets(self)
+        return self._literals
+
+    def _changed(self):
+        self.__dict__.pop("_literals", None)
+
+    @property
+    def accepted(self):
+        """
+        The set of literals the position accepts, e.g. ``p1`` for 
+        ``{p1: True}`` and ``~p2`` for ``{p2: False}``.
+        """
+        return self._literal_sets()[0]
+
+    @property
+    def denied(self):
+        """
+        The set of literals the position denies, i.e. the negations of the 
+        accepted literals.
+        """
+        return self._literal_sets()[1]
+
+    @property
+    def suspended(self):
+        """
+        The set of sentences on which the position suspends judgement.
+        """
+        return self._literal_sets()[2]
+
+    def __setitem__(self, key, value):
+        self._changed()
+        dict.__setitem__(self, key, value)
+
+    def __delitem__(self, key):
+        self._changed()
+        dict.__delitem__(self, key)
+
+    def __ior__(self, other):
+        self._changed()
+        return dict.__ior__(self, other)
+
+    def update(self, *args, **kwargs):
+        self._changed()
+        dict.update(self, *args, **kwargs)
+
+    def setdefault(self, key, default=None):
+        self._changed()
+        return dict.setdefault(self, key, default)
+
+    def pop(self, *args):
+        self._changed()
+        return dict.pop(self, *args)
+
+    def popitem(self):
+        self._changed()
+        return dict.popitem(self)
+
+    def clear(self):
+        self._changed()
+        dict.clear(self)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state.pop("_literals", None)
+        return state
+
     def is_complete(self):
         return True if self.keys() == self.debate.atoms() else False
 
@@ -62,6 +133,7 @@ def position_compatibility(pos1, pos2, deep=False):
             return True
 
 
+@profiling.instrumented("closedness")
 def closedness(pos, debate=None, return_alternative=False):
     """
     A position `pos` is closed relative to a debate when it follows its dialectical
@@ -0,0 +1,150 @@
+"""
+Opt-in instrumentation of the hot paths in taupy. While a :py:func:`profile` is
+active, the time spent in and the number of calls to the instrumented functions
+are recorded per debate stage, together with statistics such as the size of the
+binary decision diagrams that are compiled. Outside of a profile, the
+instrumentation does nothing.
+"""
+
+from collections import defaultdict
+from contextlib import contextmanager, nullcontext
+from functools import wraps
+import time
+
+import pandas as pd
+
+# The profiles that are currently recording.
+_active = []
+
+# Returned by timed() when nothing is recorded. nullcontext objects are reusable.
+_inactive = nullcontext()
+
+
+class Profile:
+    """
+    Wall times, call counts and statistics recorded during a :py:func:`profile`.
+    Times are inclusive: the time of a phase contains the time of all phases
+    that are called from it. For example, the time spent in ``"introduce"``
+    contains the ``"satisfiability"`` checks of the introduced arguments.
+
+    Only calls in the current process are recorded. Work that is distributed
+    to other processes, e.g. with the ``update_executor`` of a simulation,
+    shows up as the time of the calling phase.
+    """
+
+    def __init__(self):
+        self.stage = 0
+        # Keyed by (stage, phase)
+        self.calls = defaultdict(int)
+        self.seconds = defaultdict(float)
+        # Keyed by stage, then by the name of the statistic
+        self.statistics = defaultdict(dict)
+
+    def __repr__(self):
+        return str(f"Profile with {len(self.calls)} records.")
+
+    def record(self, phase, seconds):
+        """
+        Record a call to ``phase`` that took ``seconds``.
+        """
+        self.calls[(self.stage, phase)] += 1
+        self.seconds[(self.stage, phase)] += seconds
+
+    def note(self, **statistics):
+        """
+        Save ``statistics`` for the current stage. Later values overwrite
+        earlier ones.
+        """
+        self.statistics[self.stage].update(statistics)
+
+    def to_frame(self):
+        """
+        Return the recordings as a :py:class:`pandas.DataFrame` with one row per
+        debate stage. The columns are indexed by phase and measure
+        (``"calls"`` or ``"seconds"``). Statistics of the stage are in the
+        columns under ``"stage"``.
+        """
+        rows = defaultdict(dict)
+        for (stage, phase) in self.calls:
+            rows[stage][(phase, "calls")] = self.calls[(stage, phase)]
+            rows[stage][(phase, "seconds")] = self.seconds[(stage, phase)]
+        for (stage, statistics) in self.statistics.items():
+            for (name, value) in statistics.items():
+                rows[stage][("stage", name)] = value
+
+        frame = pd.DataFrame.from_dict(rows, orient="index").sort_index()
+        frame.index.name = "stage"
+        if len(frame.columns):
+            frame.columns = pd.MultiIndex.from_tuples(frame.columns)
+            frame = frame.sort_index(axis=1)
+        return frame
+
+
+@contextmanager
+def profile():
+    """
+    Record the hot paths of everything that happens inside the ``with`` block::
+
+        with profile() as p:
+            sim.run()
+        p.to_frame()
+    """
+    p = Profile()
+    _active.append(p)
+    try:
+        yield p
+    finally:
+        _active.remove(p)
+
+def active():
+    """
+    Return whether a profile is recording.
+    """
+    return bool(_active)
+
+def timed(phase):
+    """
+    Return a context manager that records the time spent in its block as a call
+    to ``phase``, if a profile is recording.
+    """
+    if not _active:
+        return _inactive
+    return _timer(phase)
+
+@contextmanager
+def _timer(phase):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        for p in _active:
+            p.record(phase, elapsed)
+
+def note(**statistics):
+    """
+    Save ``statistics`` for the current stage in all recording profiles.
+    """
+    for p in _active:
+        p.note(**statistics)
+
+def set_stage(stage):
+    """
+    Set the debate stage that subsequent recordings belong to.
+    """
+    for p in _active:
+        p.stage = stage
+
+def instrumented(phase):
+    """
+    A decorator that records the calls to the decorated function as ``phase``.
+    """
+    def decorator(function):
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            if not _active:
+                return function(*args, **kwargs)
+            with _timer(phase):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -6,12 +6,14 @@ except ModuleNotFoundError:
 from sympy.logic import to_cnf, And, Not
 from sympy import symbols
 import numpy as np
-from random import sample, choice
+import random
 from itertools import chain, combinations
-from more_itertools import random_combination
 from collections import Counter
+from collections.abc import Set
 import taupy.basic.core as tpc
+import taupy.basic.profiling as profiling
 import math
+import sys
 import z3
 
 def dict_to_prop(dictionary):
@@ -26,6 +28,24 @@ def dict_to_prop(dictionary):
         if v == None: pass
     return And(*l)
 
+def literal_sets(dictionary):
+    """
+    Return the literals that the truth-value attributions in ``dictionary``
+    accept and deny, and the sentences on which they suspend judgement, as a
+    tuple of three frozensets.
+    """
+    (accepted, denied, suspended) = (set(), set(), set())
+    for (k, v) in dictionary.items():
+        if v == True:
+            accepted.add(k)
+            denied.add(Not(k))
+        elif v == False:
+            accepted.add(Not(k))
+            denied.add(k)
+        elif v == None:
+            suspended.add(k)
+    return (frozenset(accepted), frozenset(denied), frozenset(suspended))
+
 def dict_to_binary(dictionary):
     """
     A helper function that converts the dictionary representation of a position
@@ -77,6 +97,7 @@ def neighbours_of_list(l):
     for i in range(len(l)):
         yield (l[:i] + [complements[l[i]]] + l[i+1:])
 
+@profiling.instrumented("satisfiability_count")
 def satisfiability_count(formula):
     """
     Count the models that satisfy a Boolean formula, using binary decision 
@@ -86,21 +107,27 @@ def satisfiability_count(formula):
     diagram = BDD()
     diagram.declare(*variables)
     expression = diagram.add_expr(str(to_cnf(formula)))
-    return int(diagram.count(expression, nvars=len(formula.atoms())))
+    count = int(diagram.count(expression, nvars=len(formula.atoms())))
+    if profiling.active():
+        profiling.note(bdd_nodes=expression.dag_size, models=count)
+    return count
 
+@profiling.instrumented("satisfiability")
 def satisfiability(formula, all_models = False):
     """
     Return a generator of models for the given Boolean formula, using BDDs
     """
-    variables = iter_to_list_of_strings(formula.atoms())
+    variables = sorted(iter_to_list_of_strings(formula.atoms()))
     diagram = BDD()
     diagram.declare(*variables)
 
     if all_models:
         expression = diagram.add_expr(str(to_cnf(formula)))
-        return [{symbols(k): v for (k, v) in m.items()} for m in \
-            diagram.pick_iter(expression, care_vars={str(i) for i in \
-                formula.atoms()})]
+        models = diagram.pick_iter(expression, care_vars=set(variables))
+        # The order in which models are picked depends on hash values. Sort 
+        # them so that random draws from the list are reproducible.
+        return [{symbols(k): m[k] for k in variables} for m in \
+            sorted(models, key=lambda m: [m[k] for k in variables])]
     else:
         try:
             expression = diagram.add_expr(str(to_cnf(formula)))
@@ -190,15 +217,16 @@ def contingency_matrix(partition1, partition2):
         [[len(set(j) & set(k)) for j in partition1] for k in partition2]
     )
 
-def pick_random_positions_from_debate(n, debate):
+def pick_random_positions_from_debate(n, debate, rng=None):
     """
     A helper function to pull `n` random positions from a debate's SCCP. Returns
     :py:obj:`False` if the debate's SCCP is smaller than `n`.
     """
+    rng = random if rng is None else rng
     if satisfiability_count(debate) >= n:
         # Using satisfiability_count() here can spare us the construction of
         # a SCCP, which is more complex than just obtaining the SCCP's number.
-        return sample(population=satisfiability(debate, all_models=True), k=n)
+        return rng.sample(population=satisfiability(debate, all_models=True), k=n)
     else:
         return False
 
@@ -211,6 +239,42 @@ def subsequences_with_length(iterable, length):
     s = list(iterable)
     return chain.from_iterable(combinations(s, r) for r in range(length+1))
 
+def random_subsets(iterable, n, rng=None):
+    """
+    A helper function to draw up to `n` distinct random subsets of `iterable`,
+    in random order. Unlike shuffling the power set, this does not materialise 
+    the power set: every subset corresponds to a bit mask, and the masks are
+    drawn lazily from the range of all masks.
+
+    Random draws are taken from `rng`, a :py:class:`random.Random` instance, or
+    from the :py:mod:`random` module if `rng` is :py:obj:`None`.
+    """
+    rng = random if rng is None else rng
+    s = list(iterable)
+    total = 2 ** len(s)
+
+    if total <= sys.maxsize:
+        masks = rng.sample(range(total), k=min(n, total))
+    else:
+        # range() objects can't be sampled beyond sys.maxsize. At this size,
+        # rejecting the rare duplicate draws is cheap.
+        masks = set()
+        while len(masks) < n:
+            masks.add(rng.getrandbits(len(s)))
+
+    for mask in masks:
+        yield tuple(x for (i, x) in enumerate(s) if mask >> i & 1)
+
+def _literals_of(position):
+    """
+    The literal sets of ``position`` (see :py:func:`literal_sets`), which
+    Positions keep until they change.
+    """
+    try:
+        return position._literal_sets()
+    except AttributeError:
+        return literal_sets(position)
+
 def fetch_conclusion(*, sentencepool, exclude, strategy, source, target):
     """
     Finds a proposition from the `sentencepool` that is not already in `exclude`
@@ -227,59 +291,252 @@ def fetch_conclusion(*, sentencepool, exclude, strategy, source, target):
     if strategy["source_accepts_conclusion"] == "Yes":
         possible_conclusions = list(
                                 set(possible_conclusions) 
-                                & set(dict_to_prop(source).args)
+                                & _literals_of(source)[0]
                                 )
 
     if strategy["source_accepts_conclusion"] == "Toleration":
         possible_conclusions = list(
                                 set(possible_conclusions) 
-                                - {Not(i) for i in dict_to_prop(source).args}
+                                - _literals_of(source)[1]
                                 )
 
     if strategy["target_accepts_conclusion"] == "No":
         possible_conclusions = list(
                                 set(possible_conclusions) 
-                                - set(dict_to_prop(target).args)
+                                - _literals_of(target)[0]
                                 )
     
-    return possible_conclusions
-
-def fetch_premises(pool, length, exclude=[]):
+    # Sorted, so that random draws from the result do not depend on hash values.
+    return sorted(possible_conclusions, key=str)
+
+def premise_key(premises):
+    """
+    Return a hashable key of a combination of ``premises`` that does not depend
+    on their order. Premises can be given as a tuple of literals, as a
+    conjunction or as a single literal.
+    """
+    if isinstance(premises, And):
+        return frozenset(premises.args)
+    if isinstance(premises, (tuple, list, set, frozenset)):
+        return frozenset(premises)
+    return frozenset([premises])
+
+class PremiseIndex(Set):
+    """
+    A hashed collection of premise combinations, keyed by
+    :py:func:`premise_key`, so that it can be checked in constant time whether
+    a combination is contained, regardless of the order of its premises.
+
+    An index can be layered over a ``base`` index: it contains the
+    combinations of the base and its own, but only its own are added to it.
+    This allows to track the combinations tried in an attempt without copying
+    the base.
+    """
+
+    def __init__(self, premises=(), base=None):
+        self.keys = {premise_key(p) for p in premises}
+        self.base = base
+
+    def __repr__(self):
+        return str(f"PremiseIndex of {len(self)} premise combinations.")
+
+    def __contains__(self, premises):
+        if not isinstance(premises, frozenset):
+            premises = premise_key(premises)
+        return premises in self.keys \
+               or (self.base is not None and premises in self.base)
+
+    def __iter__(self):
+        yield from self.keys
+        if self.base is not None:
+            yield from (k for k in self.base if k not in self.keys)
+
+    def __len__(self):
+        if self.base is None:
+            return len(self.keys)
+        return len(self.base) + sum(1 for k in self.keys if k not in self.base)
+
+    def add(self, premises):
+        """
+        Add a combination of ``premises`` to this index.
+        """
+        self.keys.add(premise_key(premises))
+
+    def overlay(self):
+        """
+        Return an empty index layered over this one.
+        """
+        return PremiseIndex(base=self)
+
+def _sentence_of(literal):
+    return literal.args[0] if isinstance(literal, Not) else literal
+
+class _PremiseCombinations:
+    """
+    The consistent combinations of ``n`` literals from a sorted ``pool``, i.e.
+    those that do not contain a sentence and its negation, in a fixed order.
+    Combinations are numbered by choosing, sentence by sentence, whether and
+    with which literal the sentence occurs. ``counts[i][k]`` is the number of
+    consistent combinations of ``k`` literals from the sentences from the
+    ``i``-th on.
+
+    If a set of literals is given as ``within``, the combinations that only
+    consist of literals in ``within`` are left out. ``within_counts[i][k]``
+    is the number of those from the ``i``-th sentence on.
+    """
+
+    def __init__(self, pool, n, within=None):
+        self.n = n
+        self.index = {l: i for (i, l) in enumerate(pool)}
+        groups = {}
+        for literal in pool:
+            groups.setdefault(_sentence_of(literal), []).append(literal)
+        self.groups = list(groups.values())
+        self.position = {l: (i, j) for (i, g) in enumerate(self.groups)
+                         for (j, l) in enumerate(g)}
+        self.within = within
+
+        self.counts = self._counts([len(g) for g in self.groups])
+        if within is not None:
+            self.within_counts = self._counts(
+                [sum(1 for l in g if l in within) for g in self.groups])
+
+    def _counts(self, sizes):
+        n = self.n
+        m = len(sizes)
+        counts = [[0] * (n + 1) for _ in range(m + 1)]
+        counts[m][0] = 1
+        for i in reversed(range(m)):
+            for k in range(n + 1):
+                counts[i][k] = counts[i + 1][k]
+                if k > 0:
+                    counts[i][k] += sizes[i] * counts[i + 1][k - 1]
+        return counts
+
+    def _remaining(self, i, k, outside):
+        """
+        The number of combinations of ``k`` literals from the sentences from 
+        the ``i``-th on, if ``outside`` tells whether a literal outside of 
+        ``within`` was chosen before.
+        """
+        if self.within is None or outside:
+            return self.counts[i][k]
+        return self.counts[i][k] - self.within_counts[i][k]
+
+    def __len__(self):
+        return self._remaining(0, self.n, False)
+
+    def rank(self, combination):
+        """
+        The number of ``combination``, or :py:obj:`None` if it is not a
+        consistent combination of ``n`` literals from the pool or is left out.
+        """
+        if len(combination) != self.n \
+           or not all(l in self.position for l in combination):
+            return None
+        chosen = dict(self.position[l] for l in combination)
+        if len(chosen) != self.n:
+            return None
+        if self.within is not None and all(l in self.within 
+                                           for l in combination):
+            return None
+
+        (r, k, outside) = (0, self.n, False)
+        for i in sorted(chosen):
+            # Combinations that skip the i-th sentence come before those that
+            # contain it, and those with its earlier literals come first.
+            r += self._remaining(i + 1, k, outside)
+            for literal in self.groups[i][:chosen[i]]:
+                r += self._remaining(i + 1, k - 1, 
+                                     outside or not self._inside(literal))
+            outside = outside or not self._inside(self.groups[i][chosen[i]])
+            k -= 1
+        return r
+
+    def _inside(self, literal):
+        return self.within is not None and literal in self.within
+
+    def unrank(self, r):
+        """
+        The combination numbered ``r``, as a tuple in the order of the pool.
+        """
+        (combination, k, outside) = ([], self.n, False)
+        for (i, group) in enumerate(self.groups):
+            if k == 0:
+                break
+            skipping = self._remaining(i + 1, k, outside)
+            if r < skipping:
+                continue
+            r -= skipping
+            for literal in group:
+                chosen = outside or not self._inside(literal)
+                following = self._remaining(i + 1, k - 1, chosen)
+                if r < following:
+                    break
+                r -= following
+            combination.append(literal)
+            outside = chosen
+            k -= 1
+        return tuple(sorted(combination, key=self.index.__getitem__))
+
+def fetch_premises(pool, length, exclude=[], rng=None, exclude_within=None):
     """
     Fetch a combination of premises with length `n` from the input pool of
     sentences. This function will not return a combination of premises that
-    is mentioned in `exclude`.
+    is mentioned in `exclude`, nor one that contains a sentence together with
+    its negation. If a set of literals is given as `exclude_within`, neither
+    will it return a combination that only consists of these literals.
+
+    The combination is drawn uniformly from all remaining combinations: they
+    are numbered, the numbers of the excluded combinations are skipped, and
+    the combination with a random number is constructed directly. Combinations
+    in `exclude` are compared regardless of their order (see
+    :py:func:`premise_key`), and are best passed as a :py:class:`PremiseIndex`.
+    If no combination is left, :py:obj:`False` is returned.
 
-    This way of iteratively drawing a random sample has no natural breakpoint
-    (i.e., there is no iterator that is empty at some point). Thus we estimate
-    that there are at most (k over n) tries, where k is the length of the
-    pool and `n` the desired length. The main weakness of this approach
-    is that it can theoretically happen that the only available combination
-    is not reached before the maximum amount of tries is done.
+    Random draws are taken from `rng`, a :py:class:`random.Random` instance, or
+    from the :py:mod:`random` module if `rng` is :py:obj:`None`.
     """
+    rng = random if rng is None else rng
+    # Sorted, so that the draws do not depend on the order of a set.
+    pool = sorted(pool, key=str)
 
     try:
-        n = choice(length)
+        n = rng.choice(length)
     except TypeError:
         n = length
 
-    j = 0
-    k = math.comb(len(pool), n)
+    combinations = _PremiseCombinations(pool, n, within=exclude_within)
+    if not isinstance(exclude, PremiseIndex):
+        exclude = PremiseIndex(exclude)
 
-    while True:
-        if j < k:
-            i = random_combination(pool, n)
-            if i not in exclude:
-                for x in i:
-                    if Not(x) in i: break
-                else:
-                    return i
-            j += 1
-        else:
-            return False
+    # While few combinations are excluded, a random combination is most
+    # likely available, which is checked in constant time.
+    if len(exclude) < len(combinations):
+        for _ in range(4):
+            candidate = combinations.unrank(rng.randrange(len(combinations)))
+            if candidate not in exclude:
+                return candidate
+
+    excluded = {combinations.rank(e) for e in exclude} - {None}
+
+    remaining = len(combinations) - len(excluded)
+    if remaining <= 0:
+        return False
+
+    # Map a random number among the remaining combinations to the number of
+    # a combination by skipping the excluded ones.
+    r = rng.randrange(remaining)
+    for e in sorted(excluded):
+        if e > r:
+            break
+        r += 1
+
+    return combinations.unrank(r)
 
 def select_premises(*, sentencepool, length, exclude, 
-                    reserved_conclusion=None, strategy, source, target):
+                    reserved_conclusion=None, strategy, source, target, 
+                    rng=None):
     """
     Select fetched premises based on whether they fit an argument strategy.
     """
@@ -292,11 +549,11 @@ def select_premises(*, sentencepool, length, exclude,
         pool = sentencepool - conclusion_set
     else:
         if strategy["pick_premises_from"] == "source":
-            pool = set(dict_to_prop(source).args) - conclusion_set
+            pool = _literals_of(source)[0] - conclusion_set
         if strategy["pick_premises_from"] == "target":
-            pool = set(dict_to_prop(target).args) - conclusion_set
+            pool = _literals_of(target)[0] - conclusion_set
 
-    return fetch_premises(pool, length=length, exclude=exclude)
+    return fetch_premises(pool, length=length, exclude=exclude, rng=rng)
 
 def proposition_levels_from_debate(debate, key_statements=[]):
     """
@@ -324,7 +581,7 @@ def proposition_levels_from_debate(debate, key_statements=[]):
             for argument in debate.args:
                 c = next(iter(argument.args[1].atoms()))
                 if c in levels and levels[c] == i:
-                    for p in argument.args[0].atoms():
+                    for p in sorted(argument.args[0].atoms(), key=str):
                         if p not in levels:
                             levels[p] = i+1
             i += 1
@@ -337,6 +594,55 @@ def proposition_levels_from_debate(debate, key_statements=[]):
 
     return levels
 
+class PropositionLevels(dict):
+    """
+    The levels of the sentences in a debate, as in
+    :py:func:`proposition_levels_from_debate`, maintained incrementally while
+    arguments are added. Key statements have level 0, and the premises of an
+    argument are one level below its conclusion, unless they are closer to a
+    key statement via another argument. The levels of the negations of the
+    sentences are kept in :py:attr:`literals`.
+    """
+
+    def __init__(self, key_statements):
+        if not key_statements:
+            raise ValueError("Key statements are required to calculate levels.")
+        super().__init__()
+        self.literals = {}
+        # The premises of the arguments by the sentence of their conclusion.
+        self.premises = {}
+        self.arguments = 0
+        for k in key_statements:
+            self._set(k, 0)
+
+    def _set(self, sentence, level):
+        self[sentence] = level
+        self.literals[sentence] = level
+        self.literals[Not(sentence)] = level
+
+    def add(self, argument):
+        """
+        Update the levels with a new ``argument``.
+        """
+        conclusion = next(iter(argument.args[1].atoms()))
+        premises = sorted(argument.args[0].atoms(), key=str)
+        self.premises.setdefault(conclusion, []).append(premises)
+        self.arguments += 1
+
+        if conclusion not in self:
+            return
+        # Lower the levels that can be reached via the new argument, in order
+        # of their level.
+        frontier = [(conclusion, premises)]
+        while frontier:
+            reached = []
+            for (c, premises) in frontier:
+                for p in premises:
+                    if p not in self or self[p] > self[c] + 1:
+                        self._set(p, self[c] + 1)
+                        reached += [(p, q) for q in self.premises.get(p, [])]
+            frontier = reached
+
 def premise_usage_count(debate, premises=set()):
     """
     Counts the number of times each premise is used in the arguments of a Debate. 
@@ -350,7 +656,8 @@ def premise_usage_count(debate, premises=set()):
     else:
         c = Counter([x for x in [i.args[0].args for i in debate.args] for x in x])
     
-    unused = [j for j in list(set(premises) | set([Not(i) for i in premises])) if j not in c]
+    unused = [j for j in sorted(set(premises) | set([Not(i) for i in premises]), key=str) 
+              if j not in c]
     c = c | {u: 0 for u in unused}
     return c
 
@@ -388,6 +695,28 @@ def z3_assertion_from_argument(premises=[], conclusion=None):
 
     return z3.Implies(z3.And(*z3_premises), z3_conclusion)
 
+def _arguments_of_debate(debate):
+    """
+    Return the arguments of a taupy ``debate`` as a list. Works for Debates, 
+    single Arguments and EmptyDebates.
+    """
+    if isinstance(debate, tpc.EmptyDebate):
+        return []
+    if isinstance(debate, tpc.Argument):
+        return [debate]
+    return list(debate.args)
+
+def z3_assertions_from_debate(debate):
+    """
+    Convert all Arguments in a taupy ``debate`` to a list of z3 assertions. 
+    Works for Debates, single Arguments and EmptyDebates.
+    """
+    return [z3_assertion_from_argument(premises=a.args[0].args 
+                                                if isinstance(a.args[0], And)
+                                                else (a.args[0],), 
+                                       conclusion=a.args[1]) 
+            for a in _arguments_of_debate(debate)]
+
 def z3_soft_constraints_from_position(position=dict()):
     """
     A converter function from Positions to z3.Optimizers
@@ -425,6 +754,38 @@ def z3_all_models(s, initial_terms):
                s.pop()
     yield from all_smt_rec(list(initial_terms))
 
+def z3_projected_models(s, terms, max_models=None):
+    """
+    Enumerate the satisfying models of the assertions in solver ``s``, projected
+    onto the z3 Bools in ``terms``. Every model is blocked only on these terms, 
+    so that each solver call yields a new, distinct projection. Models are 
+    yielded as dictionaries from terms to Python Booleans. 
+    
+    At most ``max_models`` projections are returned, if given. The solver is 
+    restored to its previous state once the enumeration is finished.
+    """
+    terms = list(terms)
+    found = 0
+
+    s.push()
+    try:
+        while max_models is None or found < max_models:
+            with profiling.timed("z3"):
+                result = s.check()
+            if result != z3.sat:
+                break
+            m = s.model()
+            projection = {t: z3.is_true(m.eval(t, model_completion=True)) 
+                          for t in terms}
+            yield projection
+            found += 1
+            if not terms:
+                # There is exactly one (empty) projection.
+                break
+            s.add(z3.Or([t != projection[t] for t in terms]))
+    finally:
+        s.pop()
+
 def z3_solver_status(solver):
     """
     Check the status of `solver` and report back depending on satisfiability.
@@ -0,0 +1,307 @@
+"""
+Benchmarks of the hot paths in taupy. Each benchmark is run at several sizes,
+and its timings can be stored as JSON and compared against a baseline from an
+earlier run, e.g. before and after a change::
+
+    python -m taupy.benchmarks --output baseline.json
+    python -m taupy.benchmarks --output results.json --baseline baseline.json
+
+Benchmarks that have become slower than the baseline by more than the
+tolerance are reported as regressions, and the command exits with status 1.
+Comparisons only take place if ``--baseline`` is given. Timings are only 
+comparable between runs on the same machine, so the baseline should be 
+recorded on the machine that is compared against it.
+"""
+
+from functools import lru_cache
+import argparse
+import json
+import platform
+import random
+import re
+import statistics
+import sys
+import time
+
+from taupy.basic.core import Debate
+from taupy.basic.positions import Position, closedness
+from taupy.basic.utilities import (satisfiability, satisfiability_count,
+                                   z3_assertions_from_debate)
+from taupy.analysis.agreement import (difference_matrix, next_neighbours,
+                                      normalised_edit_agreement)
+from taupy.generators.maps import generate_hierarchical_argument_map
+from taupy.simulation.log import SimulationLog
+from taupy.simulation.update import response
+from taupy.simulation.simulation import (Simulation, FixedDebateSimulation,
+                                         SocialInfluenceSimulation)
+import taupy.simulation.strategies as strategies
+
+# Benchmarks by name. Each entry is a tuple of the sizes it runs at and a setup
+# function that receives a size and a random.Random instance and returns the
+# function to be timed.
+BENCHMARKS = {}
+
+def benchmark(name, sizes):
+    """
+    Register the decorated setup function as the benchmark ``name``.
+    """
+    def decorator(setup):
+        BENCHMARKS[name] = (sizes, setup)
+        return setup
+    return decorator
+
+def _debate(size, rng):
+    """
+    A hierarchical argument map over ``size`` sentences.
+    """
+    return _generated_debate(size, rng.getrandbits(64))
+
+@lru_cache(maxsize=None)
+def _generated_debate(size, seed):
+    # Generating maps takes longer than most benchmarks, so they are only
+    # generated once per size and seed.
+    rng = random.Random(seed)
+    while True:
+        d = generate_hierarchical_argument_map(N=size, k=2, max_density=0.5,
+                                               rng=rng)
+        # Only maps with at least two arguments are Debates.
+        if isinstance(d, Debate):
+            return d
+
+def _complete_positions(debate, n, rng):
+    """
+    ``n`` random complete positions towards the sentences of ``debate``.
+    """
+    atoms = sorted(debate.atoms(), key=str)
+    return [Position(debate, {a: rng.choice([True, False]) for a in atoms})
+            for _ in range(n)]
+
+def _partial_positions(debate, n, rng):
+    """
+    ``n`` random positions that take a stance on half of the sentences of
+    ``debate``.
+    """
+    atoms = sorted(debate.atoms(), key=str)
+    return [Position(debate, {a: rng.choice([True, False])
+                              for a in rng.sample(atoms, len(atoms) // 2)})
+            for _ in range(n)]
+
+@benchmark("satisfiability_count", sizes=[8, 12, 16])
+def _satisfiability_count(size, rng):
+    d = _debate(size, rng)
+    return lambda: satisfiability_count(d)
+
+@benchmark("satisfiability_all_models", sizes=[8, 12, 16])
+def _satisfiability_all_models(size, rng):
+    d = _debate(size, rng)
+    return lambda: satisfiability(d, all_models=True)
+
+@benchmark("closedness", sizes=[8, 12, 16])
+def _closedness(size, rng):
+    d = _debate(size, rng)
+    positions = _partial_positions(d, 10, rng)
+    return lambda: [closedness(p, d) for p in positions]
+
+@benchmark("difference_matrix", sizes=[10, 50, 100])
+def _difference_matrix(size, rng):
+    d = _debate(12, rng)
+    positions = _complete_positions(d, size, rng)
+    return lambda: difference_matrix(positions, normalised_edit_agreement)
+
+@benchmark("next_neighbours", sizes=[8, 12, 16])
+def _next_neighbours(size, rng):
+    d = _debate(size, rng)
+    models = list(satisfiability(d, all_models=True))
+    positions = _complete_positions(d, 10, rng)
+    return lambda: [next_neighbours(p, debate=d, models=models)
+                    for p in positions]
+
+@benchmark("generate_hierarchical_argument_map", sizes=[8, 12, 16])
+def _generate_hierarchical_argument_map(size, rng):
+    seed = rng.getrandbits(64)
+    return lambda: generate_hierarchical_argument_map(
+        N=size, k=2, max_density=0.5, rng=random.Random(seed))
+
+class _ResponseHost(list):
+    """
+    The parts of a simulation that :py:func:`response` works with.
+    """
+    def __init__(self, debate, seed):
+        super().__init__([debate])
+        self.positions = []
+        self.sentencepool = sorted(debate.atoms(), key=str)
+        self.partial_neighbour_search_radius = 50
+        self.assertions = z3_assertions_from_debate(debate)
+        self.log = SimulationLog()
+        self.rng = random.Random(seed)
+
+def _response_benchmark(method, positions):
+    def setup(size, rng):
+        d = _debate(size, rng)
+        population = positions(d, 10, rng)
+        seed = rng.getrandbits(64)
+        def run():
+            # Without sentences, the "random" method draws from all models of
+            # the debate. The other methods do not use them.
+            response(simulation=_ResponseHost(d, seed), method=method,
+                     debate=d, positions=population, sentences=[])
+        return run
+    return setup
+
+# The searches for closed partial positions are much more expensive than the
+# other methods and are benchmarked at smaller sizes.
+for (_method, _positions, _sizes) in [
+        ("random", _complete_positions, [8, 12, 16]),
+        ("closest_coherent_complete_search", _complete_positions, [8, 12, 16]),
+        ("closest_coherent", _complete_positions, [8, 12, 16]),
+        ("closest_coherent_batch", _complete_positions, [8, 12, 16]),
+        ("closest_closed_partial_coherent", _partial_positions, [6, 8, 10]),
+        ("closest_closed_partial_coherent_maxsat", _partial_positions,
+         [6, 8, 10])]:
+    benchmark(f"response_{_method}", sizes=_sizes)(
+        _response_benchmark(_method, _positions))
+
+@benchmark("Simulation", sizes=[8, 12, 16])
+def _simulation(size, rng):
+    seed = rng.getrandbits(64)
+    def run():
+        positions = [Position(debate=None,
+                              introduction_strategy=strategies.fortify)
+                     for _ in range(6)]
+        Simulation(positions=positions, sentencepool=f"p:{size}",
+                   argumentlength=2, seed=seed).run(max_steps=10)
+    return run
+
+@benchmark("FixedDebateSimulation", sizes=[6, 8, 10])
+def _fixed_debate_simulation(size, rng):
+    seed = rng.getrandbits(64)
+    def run():
+        positions = [Position(debate=None,
+                              introduction_strategy=strategies.fortify)
+                     for _ in range(6)]
+        FixedDebateSimulation(positions=positions, sentencepool=f"p:{size}",
+                              debate_generation={"max_density": 0.5},
+                              seed=seed).run(max_steps=10)
+    return run
+
+@benchmark("SocialInfluenceSimulation", sizes=[6, 8, 10])
+def _social_influence_simulation(size, rng):
+    seed = rng.getrandbits(64)
+    def run():
+        positions = [Position(debate=None,
+                              introduction_strategy=strategies.fortify)
+                     for _ in range(6)]
+        SocialInfluenceSimulation(positions=positions, sentencepool=f"p:{size}",
+                                  initial_position_size=size,
+                                  seed=seed).run(max_steps=5)
+    return run
+
+
+def run_benchmarks(pattern=None, *, repeat=5, seed=0, quiet=True):
+    """
+    Run the benchmarks whose names match the regular expression ``pattern``, or
+    all of them, ``repeat`` times at each of their sizes. Each repetition is
+    set up anew with the same inputs, and only the benchmarked call is timed.
+    Inputs are generated from ``seed``, so that runs with the same seed time
+    the same work.
+
+    Returns a dictionary with information on the machine under ``"machine"``
+    and the timings under ``"benchmarks"``, keyed by ``"name[size]"``. Timings
+    contain the median, minimum and maximum in seconds.
+    """
+    results = {}
+    for (name, (sizes, setup)) in BENCHMARKS.items():
+        if pattern is not None and not re.search(pattern, name):
+            continue
+        for size in sizes:
+            timings = []
+            for _ in range(repeat):
+                function = setup(size, random.Random(f"{seed}:{name}:{size}"))
+                start = time.perf_counter()
+                function()
+                timings.append(time.perf_counter() - start)
+            key = f"{name}[{size}]"
+            results[key] = {"median": statistics.median(timings),
+                            "min": min(timings),
+                            "max": max(timings),
+                            "repeat": repeat}
+            if not quiet:
+                print(f"{key}: {results[key]['median']:.4f}s", file=sys.stderr)
+
+    return {"machine": {"python": platform.python_version(),
+                        "platform": platform.platform(),
+                        "processor": platform.processor()},
+            "seed": seed,
+            "benchmarks": results}
+
+def compare(results, baseline, tolerance=0.2, min_seconds=1e-3):
+    """
+    Compare the ``results`` of :py:func:`run_benchmarks` with a ``baseline``
+    in the same format. Returns a list of ``(key, baseline, current, ratio)``
+    tuples of the benchmarks whose median got slower by more than the fraction
+    ``tolerance``. Benchmarks that took less than ``min_seconds`` in both runs
+    are too noisy to compare and are skipped, as are benchmarks that are
+    missing in either run.
+    """
+    regressions = []
+    for (key, current) in results["benchmarks"].items():
+        if key not in baseline["benchmarks"]:
+            continue
+        before = baseline["benchmarks"][key]["median"]
+        after = current["median"]
+        if max(before, after) < min_seconds:
+            continue
+        ratio = after / before if before > 0 else float("inf")
+        if ratio > 1 + tolerance:
+            regressions.append((key, before, after, ratio))
+    return regressions
+
+
+def main(arguments=None):
+    parser = argparse.ArgumentParser(
+        description="Run the benchmarks of taupy's hot paths.")
+    parser.add_argument("--output", help="Write the results to this JSON file.")
+    parser.add_argument("--baseline", default=None,
+                        help="Compare the results to this JSON file.")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="Slowdown, as a fraction of the baseline, that "
+                             + "counts as a regression.")
+    parser.add_argument("--filter", default=None,
+                        help="Only run benchmarks whose names match this "
+                             + "regular expression.")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--list", action="store_true",
+                        help="List the benchmarks and exit.")
+    arguments = parser.parse_args(arguments)
+
+    if arguments.list:
+        for (name, (sizes, _)) in BENCHMARKS.items():
+            print(f"{name} {sizes}")
+        return 0
+
+    results = run_benchmarks(arguments.filter, repeat=arguments.repeat,
+                             seed=arguments.seed, quiet=False)
+
+    if arguments.output:
+        with open(arguments.output, "w") as f:
+            json.dump(results, f, indent=2)
+    else:
+        json.dump(results, sys.stdout, indent=2)
+        print()
+
+    if arguments.baseline:
+        with open(arguments.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, tolerance=arguments.tolerance)
+        for (key, before, after, ratio) in regressions:
+            print(f"Regression in {key}: {before:.4f}s -> {after:.4f}s "
+                  + f"({ratio:.2f}x)", file=sys.stderr)
+        if regressions:
+            return 1
+        print("No regressions.", file=sys.stderr)
+
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
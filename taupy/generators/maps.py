@@ -6,7 +6,7 @@ from taupy.basic.core import EmptyDebate, Debate, Argument
 from taupy.basic.utilities import proposition_levels_from_debate, premise_usage_count
 from sympy import Not, And, symbols
 from sympy import satisfiable as dpll_satisfiability
-from random import choices
+import random
 import numpy as np
 
 def generate_hierarchical_argument_map(N = 20, 
@@ -16,13 +16,22 @@ def generate_hierarchical_argument_map(N = 20,
                                        distribution = {2: 0.19, 3: 0.23, 
                                                        4: 0.32, 5: 0.26},
                                        base_conclusion = 0.75,
-                                       base_premises = 0.75):
+                                       base_premises = 0.75,
+                                       rng = None):
 
     """
     Generate a hierarchical synthetic argument map, following the algorithm from 
     Betz, Chekan & Mchedlidze ([Betz2021]_).
+
+    Random draws are taken from ``rng``, a :py:class:`random.Random` instance,
+    or from the global random number generators if ``rng`` is :py:obj:`None`.
     """   
-    
+    if rng is None:
+        rng = random
+        np_rng = np.random
+    else:
+        np_rng = np.random.default_rng(rng.getrandbits(128))
+
     d = EmptyDebate()
     # Construct N propositional variables
     sentencepool = list(symbols(f"p:{N}"))
@@ -37,7 +46,7 @@ def generate_hierarchical_argument_map(N = 20,
         levels = atomic_levels | {Not(i): atomic_levels[i] for i in atomic_levels}
         w = [base_conclusion**i for i in levels.values()]
 
-        selected_conclusion = choices(list(levels.keys()), weights=w)[0]
+        selected_conclusion = rng.choices(list(levels.keys()), weights=w)[0]
 
         premise_usage = premise_usage_count(d, premises=sentencepool)
         del premise_usage[selected_conclusion]
@@ -46,9 +55,9 @@ def generate_hierarchical_argument_map(N = 20,
         # Normalised weights for premises
         vis = [i/sum(v) for i in v]
         # Number of premises for current argument
-        n = choices(list(distribution.keys()), weights=list(distribution.values()))[0]
+        n = rng.choices(list(distribution.keys()), weights=list(distribution.values()))[0]
 
-        selected_premises = np.random.choice(list(premise_usage.keys()), size=n, p=vis, replace=False)
+        selected_premises = np_rng.choice(list(premise_usage.keys()), size=n, p=vis, replace=False)
         
         if dpll_satisfiability(And(*selected_premises)):
             a = Argument(And(*selected_premises), selected_conclusion)
@@ -1,16 +1,28 @@
 from .simulation import (Simulation, FixedDebateSimulation, 
-                         SocialInfluenceSimulation, experiment)
+                         SocialInfluenceSimulation, experiment,
+                         streaming_experiment)
 from .update import introduce, response
 from .evaluation import Evaluation, evaluate_experiment
+from .history import PositionHistory
+from .log import SimulationLog, LogRecord
+from .observers import MetricRecorder
+from .budget import Budget, BudgetExceeded
+from .store import ExperimentStore, ResultCache
+from .sweep import sweep
+from .executors import SocketExecutor, serve_worker
 
 from .strategies import (random, attack, fortify, convert, undercut)
 
 __all__ = [
             'Simulation', 'FixedDebateSimulation', 'SocialInfluenceSimulation',
-            'experiment',
+            'experiment', 'streaming_experiment', 'ExperimentStore',
+            'ResultCache', 'sweep', 'SocketExecutor', 'serve_worker',
             'introduce',
             'response',
             'Evaluation',
             'evaluate_experiment',
+            'PositionHistory',
+            'SimulationLog', 'LogRecord', 'MetricRecorder', 'Budget',
+            'BudgetExceeded',
             'random', 'attack', 'fortify', 'convert', 'undercut'
           ]
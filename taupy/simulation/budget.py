@@ -0,0 +1,142 @@
+"""
+Limits on the wall-clock time and memory of simulation runs.
+"""
+
+import os
+import sys
+import time
+
+
+def resident_memory():
+    """
+    Return the resident memory of the current process in bytes. Where the
+    current value is not available, the peak value is returned instead.
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        pass
+
+    try:
+        import resource
+    except ImportError:
+        raise NotImplementedError(
+            "Memory budgets are not supported on this platform.") from None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Reported in bytes on macOS and in kilobytes elsewhere.
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+class BudgetExceeded(Exception):
+    """
+    Raised by :py:meth:`Budget.check` when a limit of the budget is exceeded.
+    ``reason`` is the name of the limit, as returned by 
+    :py:meth:`Budget.exceeded`.
+    """
+
+    def __init__(self, reason):
+        super().__init__(reason)
+        self.reason = reason
+
+
+class Budget:
+    """
+    Limits on the resources a simulation run may use. A run that exceeds one
+    of them ends, and the reason is recorded in the simulation's 
+    :py:attr:`stop_reason`. The limits are checked after every step and within
+    the searches for arguments and updated positions, so that a step that does
+    not finish can be interrupted as well. An interrupted step is discarded, so
+    that the simulation stays in a consistent state and can be pickled, 
+    analysed or run again.
+
+    :param float seconds: Wall-clock seconds for the entire run. If a 
+        simulation is run again to resume it, the time of its earlier runs 
+        counts towards this limit.
+
+    :param float step_seconds: Wall-clock seconds for a single step.
+
+    :param int memory: Resident memory of the process in bytes.
+
+    :param int step_memory: Growth of the resident memory during a single
+        step, in bytes.
+
+    .. admonition:: Example
+
+        End a run after an hour, or after a step that took longer than a
+        minute:
+
+        >>> sim.run(budget=Budget(seconds=3600, step_seconds=60))
+    """
+
+    def __init__(self, *, seconds=None, step_seconds=None, memory=None,
+                 step_memory=None):
+        self.seconds = seconds
+        self.step_seconds = step_seconds
+        self.memory = memory
+        self.step_memory = step_memory
+        self._run_start = None
+        self._step_start = None
+        self._step_memory = None
+
+    def __repr__(self):
+        limits = {k: v for (k, v) in [("seconds", self.seconds),
+                                      ("step_seconds", self.step_seconds),
+                                      ("memory", self.memory),
+                                      ("step_memory", self.step_memory)]
+                  if v is not None}
+        return str(f"Budget with limits {limits}.")
+
+    def start(self, elapsed=0):
+        """
+        Take note of the start of a run, which resumes runs that took 
+        ``elapsed`` seconds.
+        """
+        self._run_start = time.perf_counter() - elapsed
+
+    def elapsed(self):
+        """
+        Return the wall-clock seconds since the start of the run, including
+        the ``elapsed`` seconds it resumes.
+        """
+        return time.perf_counter() - self._run_start
+
+    def start_step(self):
+        """
+        Take note of the start of a step.
+        """
+        self._step_start = time.perf_counter()
+        if self.step_memory is not None:
+            self._step_memory = resident_memory()
+
+    def exceeded(self):
+        """
+        Return the name of the limit that was exceeded in the last step or
+        since the start of the run, or :py:obj:`None`.
+        """
+        now = time.perf_counter()
+        in_step = self._step_start is not None
+        if self.step_seconds is not None and in_step \
+           and now - self._step_start > self.step_seconds:
+            return "step_time_budget"
+        if self.seconds is not None and now - self._run_start > self.seconds:
+            return "time_budget"
+
+        if self.memory is not None or self.step_memory is not None:
+            memory = resident_memory()
+            if self.step_memory is not None and in_step \
+               and memory - self._step_memory > self.step_memory:
+                return "step_memory_budget"
+            if self.memory is not None and memory > self.memory:
+                return "memory_budget"
+
+        return None
+
+    def check(self):
+        """
+        Raise :py:class:`BudgetExceeded` if a limit was exceeded in the current
+        step or since the start of the run.
+        """
+        reason = self.exceeded()
+        if reason is not None:
+            raise BudgetExceeded(reason)
@@ -0,0 +1,242 @@
+"""
+An index of the arguments that can be introduced into a debate stage, by
+argumentation strategy and by the agents involved.
+
+An argument is a valid candidate if its premises have not been used before,
+its conclusion does not mention a sentence of its premises, its premises and
+conclusion fit the strategy, and it is consistent with the debate stage and
+the ground truth. The last condition holds unless the debate and ground truth
+entail all premises and refute the conclusion, so it only depends on which
+literals are consistent with the debate stage. These are determined once per
+stage, and the candidates of an introduction are counted and drawn from the
+acceptance of the agents, which is stored as bitsets over the literals. The
+used premises are stored as bitsets as well, so that those in a pool of 
+premises are counted without ranking them.
+"""
+
+from math import comb
+
+import z3
+from sympy import Not
+
+from taupy.basic.utilities import (_PremiseCombinations, _literals_of,
+                                   fetch_premises,
+                                   z3_soft_constraints_from_position)
+import taupy.basic.profiling as profiling
+
+
+class CandidateIndex:
+    """
+    The candidate arguments of the current debate stage of a
+    :py:class:`Simulation` that grows its debate randomly. The index is valid
+    as long as no argument is added and the latest population does not
+    change.
+
+    Literals are numbered so that the ``i``-th sentence of the sentence pool
+    has the bit ``2*i`` if it is accepted and ``2*i+1`` if it is denied.
+    """
+
+    def __init__(self, simulation):
+        self.simulation = simulation
+        sentences = sorted(simulation.sentencepool, key=str)
+        self.literals = [l for s in sentences for l in (s, Not(s))]
+        self.bits = {l: 1 << i for (i, l) in enumerate(self.literals)}
+        self.everything = (1 << len(self.literals)) - 1
+        self._accepted_bits = int("01" * len(sentences), 2) \
+                              if sentences else 0
+        self.lengths = sorted(set(simulation.argumentlength)) \
+                       if isinstance(simulation.argumentlength, (list, tuple)) \
+                       else [simulation.argumentlength]
+        self.used = simulation.premise_index
+        # The bitsets of the consistent used premises, by their length.
+        self._used_bits = {}
+        for key in self.used:
+            if all(l in self.bits for l in key):
+                bits = sum(self.bits[l] for l in key)
+                if not bits & self._negated(bits):
+                    self._used_bits.setdefault(len(key), []).append(bits)
+
+        self.possible = self._possible_literals()
+        # Literals that hold in all models of the debate and the ground truth.
+        self.entailed = self.everything & ~self._negated(self.possible)
+        self._acceptance = {}
+        self._used_counts = {}
+        self._exists = {}
+
+    def __repr__(self):
+        return str(f"CandidateIndex over {len(self.literals)} literals.")
+
+    def _possible_literals(self):
+        """
+        The bitset of literals that are consistent with the debate stage and
+        the ground truth.
+        """
+        solver = z3.Solver()
+        solver.add(*self.simulation.assertions)
+        solver.add(*z3_soft_constraints_from_position(
+            self.simulation.ground_truth or {}))
+
+        possible = 0
+        with profiling.timed("z3"):
+            if solver.check() != z3.sat:
+                return possible
+            model = solver.model()
+            for (l, bit) in self.bits.items():
+                if z3.is_true(model.eval(self._z3(l), model_completion=True)):
+                    possible |= bit
+
+            # The literals that are false in the first model are only possible
+            # if another model makes them true.
+            for (l, bit) in self.bits.items():
+                if not possible & bit and solver.check(self._z3(l)) == z3.sat:
+                    possible |= bit
+        return possible
+
+    @staticmethod
+    def _z3(literal):
+        if literal.is_Not:
+            return z3.Not(z3.Bool(str(literal.args[0])))
+        return z3.Bool(str(literal))
+
+    def _negated(self, bits):
+        """
+        Swap the bits of the accepted and denied literal of every sentence.
+        """
+        return ((bits & self._accepted_bits) << 1) \
+               | ((bits >> 1) & self._accepted_bits)
+
+    def _literals_of(self, bits):
+        return [l for (l, bit) in self.bits.items() if bits & bit]
+
+    def acceptance(self, position):
+        """
+        The bitset of literals that ``position`` accepts.
+        """
+        key = id(position)
+        if key not in self._acceptance:
+            bits = 0
+            for literal in _literals_of(position)[0]:
+                bits |= self.bits.get(literal, 0)
+            # Positions are kept with the key, so that ids are not reused.
+            self._acceptance[key] = (position, bits)
+        return self._acceptance[key][1]
+
+    def _pools(self, strategy, source, target):
+        """
+        The bitsets of the premises and conclusions that fit ``strategy``.
+        """
+        premises = {None: self.everything,
+                    "source": self.acceptance(source) if source is not None
+                              else 0,
+                    "target": self.acceptance(target) if target is not None
+                              else 0}[strategy["pick_premises_from"]]
+
+        conclusions = self.everything
+        if strategy["source_accepts_conclusion"] == "Yes":
+            conclusions &= self.acceptance(source)
+        if strategy["source_accepts_conclusion"] == "Toleration":
+            conclusions &= ~self._negated(self.acceptance(source))
+        if strategy["target_accepts_conclusion"] == "No":
+            conclusions &= ~self.acceptance(target)
+        return (premises, conclusions)
+
+    def _options(self, strategy, source, target):
+        """
+        Generate the conclusions and premise lengths that fit ``strategy``,
+        with the pool of premises for each.
+        """
+        if not self.possible:
+            # The debate is inconsistent with the ground truth.
+            return
+        (premises, conclusions) = self._pools(strategy, source, target)
+        for (l, bit) in self.bits.items():
+            if conclusions & bit:
+                sentence = bit | self._negated(bit)
+                for n in self.lengths:
+                    yield (l, n, premises & ~sentence)
+
+    def _used_in(self, n, pool):
+        """
+        The number of used premise combinations of length ``n`` from ``pool``,
+        and the number of those that only consist of entailed literals.
+        """
+        if (n, pool) not in self._used_counts:
+            used = [b for b in self._used_bits.get(n, []) if not b & ~pool]
+            self._used_counts[(n, pool)] = (
+                len(used), sum(1 for b in used if not b & ~self.entailed))
+        return self._used_counts[(n, pool)]
+
+    def _count(self, conclusion, n, pool, at_least=None):
+        """
+        The number of valid premise combinations of length ``n`` from ``pool``
+        for ``conclusion``. If ``at_least`` is given, counting may stop once
+        it is clear that there are at least that many.
+        """
+        available = _PremiseCombinations(self._sorted(pool), n)
+        refuted = not self.possible & self.bits[conclusion]
+        # Entailed literals belong to different sentences, so all of their 
+        # combinations are consistent.
+        # int.bit_count() requires Python 3.10.
+        entailed = comb(bin(pool & self.entailed).count("1"), n) \
+                   if refuted else 0
+
+        if at_least is not None and len(available) >= len(self.used) \
+                                                       + entailed + at_least:
+            return len(available) - len(self.used) - entailed
+
+        (used, used_entailed) = self._used_in(n, pool)
+        count = len(available) - used
+        if refuted:
+            # Combinations of entailed premises can't support a refuted
+            # conclusion. Those that are used are already subtracted.
+            count -= entailed - used_entailed
+        return count
+
+    def _sorted(self, bits):
+        return sorted(self._literals_of(bits), key=str)
+
+    def exists(self, strategy, source=None, target=None):
+        """
+        Whether an argument can be introduced with ``strategy`` from ``source``
+        to ``target``.
+        """
+        if not self.possible:
+            return False
+        # Agents with the same acceptance have the same candidates.
+        key = self._pools(strategy, source, target)
+        if key not in self._exists:
+            self._exists[key] = any(
+                self._count(c, n, pool, at_least=1) > 0
+                for (c, n, pool) in self._options(strategy, source, target))
+        return self._exists[key]
+
+    def count(self, strategy, source=None, target=None):
+        """
+        The number of arguments that can be introduced with ``strategy`` from
+        ``source`` to ``target``.
+        """
+        return sum(self._count(c, n, pool)
+                   for (c, n, pool) in self._options(strategy, source, target))
+
+    def sample(self, strategy, source=None, target=None, rng=None):
+        """
+        Draw one of the arguments that can be introduced with ``strategy``
+        from ``source`` to ``target`` uniformly at random. Returns a tuple of
+        the premises and the conclusion, or :py:obj:`None` if there is none.
+        """
+        rng = self.simulation.rng if rng is None else rng
+        options = [(c, n, pool, self._count(c, n, pool))
+                   for (c, n, pool) in self._options(strategy, source, target)]
+        options = [o for o in options if o[3] > 0]
+        if not options:
+            return None
+
+        (conclusion, n, pool, _) = rng.choices(options,
+                                               weights=[o[3] for o in options])[0]
+        # Combinations of entailed premises can't support a refuted conclusion.
+        entailed = set(self._literals_of(pool & self.entailed)) \
+                   if not self.possible & self.bits[conclusion] else None
+
+        premises = fetch_premises(self._literals_of(pool), n, exclude=self.used,
+                                  rng=rng, exclude_within=entailed)
+        return (premises, conclusion)
@@ -5,7 +5,6 @@ this module operate on collections of objects. The analysis functions provide
 the atomic measures for these operations.
 """
 
-from concurrent.futures import ProcessPoolExecutor
 from taupy import (difference_matrix, group_divergence, group_consensus, 
                    normalised_hamming_distance, spread, pairwise_dispersion, 
                    bna, satisfiability_count, Position, 
@@ -15,6 +14,9 @@ from statistics import mean
 import numpy as np
 import pandas as pd
 
+from .executors import executor_from_settings
+from .simulation import Simulation
+
 def evaluate_experiment(*args, **dargs):
     """
     In taupy 0.4 and earlier, there wasn't an Evaluation class. All uses of this
@@ -44,7 +46,9 @@ class Evaluation():
     
     :param dict multiprocessing_settings: Settings forwarded to multiprocessing. 
         Should be options that are recognised by 
-        :py:class:`concurrent.futures.ProcessPoolExecutor`.
+        :py:class:`concurrent.futures.ProcessPoolExecutor`. An existing
+        :py:class:`concurrent.futures.Executor`, such as a 
+        :py:class:`SocketExecutor`, can be passed instead.
     
     :var data: A :py:obj:`pandas.DataFrame` containing the analysed data.
     
@@ -81,7 +85,7 @@ class Evaluation():
         if self.clustering_method is None:
             raise ValueError("No clustering method found.")
 
-        with ProcessPoolExecutor(**self.mpsettings) as executor:
+        with executor_from_settings(self.mpsettings) as executor:
             clustering_results = [executor.submit(
                                     obtain_clusterings,
                                     method=self.clustering_method,
@@ -116,7 +120,7 @@ class Evaluation():
         - :py:func:`progress`
         """
 
-        with ProcessPoolExecutor(**self.mpsettings) as executor:
+        with executor_from_settings(self.mpsettings) as executor:
             calculations = [executor.submit(
                                 function, 
                                 debate_stages=i
@@ -161,7 +165,7 @@ class Evaluation():
                 "No suitable clustering found. Have you run generate_clusters()?"
             )
         
-        with ProcessPoolExecutor(**self.mpsettings) as executor:
+        with executor_from_settings(self.mpsettings) as executor:
             clst = [executor.submit(
                     cluster_analysis,
                     function=function,
@@ -184,7 +188,7 @@ class Evaluation():
         - :py:func:`mean_agreement_between_positions`
         """
 
-        with ProcessPoolExecutor(**self.mpsettings) as executor:
+        with executor_from_settings(self.mpsettings) as executor:
             observations = [executor.submit(
                     function,
                     positions=i,
@@ -239,7 +243,7 @@ class Evaluation():
                 "No suitable clustering found. Have you run generate_clusters()?"
             )
 
-        with ProcessPoolExecutor(**self.mpsettings) as executor:
+        with executor_from_settings(self.mpsettings) as executor:
             clst = [executor.submit(
                         divergencies_among_positions,
                         clusters=self.clusters[n],
@@ -265,7 +269,7 @@ class Evaluation():
                 "No suitable clustering found. Have you run generate_clusters()?"
             )
 
-        with ProcessPoolExecutor(**self.mpsettings) as executor:
+        with executor_from_settings(self.mpsettings) as executor:
             clst = [executor.submit(
                         consensus_among_positions,
                         clusters=self.clusters[n],
@@ -280,7 +284,7 @@ class Evaluation():
 
     def coherence_of_majority_positions(self, *, not_present_value=None):
 
-        with ProcessPoolExecutor(**self.mpsettings) as executor:
+        with executor_from_settings(self.mpsettings) as executor:
             calculations = [executor.submit(
                                 majority_coherences,
                                 positions=self.positions[i],
@@ -296,7 +300,7 @@ class Evaluation():
     
     def veracity(self, *, measure=normalised_edit_agreement):
 
-        with ProcessPoolExecutor(**self.mpsettings) as executor:
+        with executor_from_settings(self.mpsettings) as executor:
             calculations = [executor.submit(
                                 average_agreement_with_ground_truth,
                                 positions=self.positions[i],
@@ -311,6 +315,10 @@ class Evaluation():
         return
 
 def densities_of_debate_stages(debate_stages):
+    if isinstance(debate_stages, Simulation):
+        # Use the densities the simulation computed during its run.
+        return pd.Series([debate_stages.density(i) 
+                          for i in range(len(debate_stages))], name="density")
     return pd.Series([i.density() for i in debate_stages], name="density")
 
 def progress(debate_stages):
@@ -373,6 +381,13 @@ def numbers_of_unique_positions(positions):
             )
 
 def sccp_extension(debate_stages):
+    if isinstance(debate_stages, Simulation):
+        # Use the model counts the simulation computed during its run.
+        return pd.Series(
+                [debate_stages.model_count(i) 
+                 for i in range(len(debate_stages))],
+                name="Size of SCCP"
+                )
     return pd.Series(
             [satisfiability_count(i) for i in debate_stages], 
             name="Size of SCCP"
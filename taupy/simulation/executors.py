@@ -0,0 +1,271 @@
+"""
+Executors that distribute the simulations of experiments and the calculations
+of evaluations. Besides the local :py:class:`concurrent.futures.ProcessPoolExecutor`,
+tasks can be sent to worker processes on other machines with a
+:py:class:`SocketExecutor`.
+
+A worker is started on each machine with::
+
+    TAUPY_AUTHKEY=<secret> python -m taupy.simulation.worker --host 0.0.0.0 --port 6000
+
+Each worker performs one task at a time, so one worker should be started per
+CPU. Tasks and results are exchanged as pickles. As unpickling data can execute
+arbitrary code, anyone who can connect to a worker can run code on its
+machine. Connections are therefore authenticated with a secret ``authkey``,
+which has no default and must be given to the workers and the executor. Use a
+long random key, e.g. from :py:func:`secrets.token_hex`, and only make
+workers reachable from trusted machines. Functions that are sent to workers
+must be importable there, i.e. taupy needs to be installed on every machine.
+"""
+
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from contextlib import contextmanager
+from multiprocessing.connection import Client, Listener
+import multiprocessing
+import queue
+import secrets
+import threading
+import traceback
+
+
+@contextmanager
+def executor_from_settings(settings):
+    """
+    Provide an executor for the ``executor`` settings of experiments and
+    evaluations. ``settings`` can be a dictionary of settings for a
+    :py:class:`concurrent.futures.ProcessPoolExecutor`, which is shut down
+    afterwards, or an existing :py:class:`concurrent.futures.Executor`, such as
+    a :py:class:`SocketExecutor`, which is used as it is and stays open.
+    """
+    if isinstance(settings, Executor):
+        yield settings
+    else:
+        with ProcessPoolExecutor(**(settings or {})) as executor:
+            yield executor
+
+
+class _RemoteTraceback(Exception):
+    """
+    Carries the formatted traceback of an exception raised in a worker.
+    """
+    def __init__(self, tb):
+        self.tb = tb
+
+    def __str__(self):
+        return self.tb
+
+
+class SocketExecutor(Executor):
+    """
+    An executor that sends tasks to workers over TCP connections. Every worker,
+    started with :py:func:`serve_worker`, receives a new task as soon as it has
+    returned the result of its previous one. If the connection to a worker is
+    lost, the task it was working on fails and the remaining tasks are
+    distributed over the other workers.
+
+    :param addresses: A list of ``(host, port)`` tuples of the workers.
+
+    :param bytes authkey: The secret key that the workers were started with.
+    """
+
+    def __init__(self, addresses, authkey):
+        _check_authkey(authkey)
+        self.addresses = list(addresses)
+        self.authkey = authkey
+        self._tasks = queue.Queue()
+        self._lock = threading.Lock()
+        self._shutdown = False
+        self._connected = len(self.addresses)
+        self._processes = []
+        self._threads = [threading.Thread(target=self._dispatch, args=(a,),
+                                          daemon=True)
+                         for a in self.addresses]
+        for t in self._threads:
+            t.start()
+
+    @classmethod
+    def local(cls, max_workers=None, authkey=None):
+        """
+        Start ``max_workers`` workers on localhost, defaulting to the number of
+        CPUs, and return an executor connected to them. The workers are
+        stopped when the executor is shut down. This is mostly useful for
+        testing. Unless an ``authkey`` is given, a random one is generated.
+        """
+        if authkey is None:
+            authkey = secrets.token_bytes(32)
+        max_workers = max_workers or multiprocessing.cpu_count()
+        processes = []
+        addresses = []
+        for _ in range(max_workers):
+            (receiver, sender) = multiprocessing.Pipe(duplex=False)
+            p = multiprocessing.Process(target=serve_worker,
+                                        kwargs={"host": "localhost", "port": 0,
+                                                "authkey": authkey,
+                                                "ready": sender},
+                                        daemon=True)
+            p.start()
+            addresses.append(receiver.recv())
+            processes.append(p)
+
+        executor = cls(addresses, authkey=authkey)
+        executor._processes = processes
+        return executor
+
+    def __repr__(self):
+        return str(f"SocketExecutor with {len(self.addresses)} workers.")
+
+    def submit(self, fn, /, *args, **kwargs):
+        with self._lock:
+            if self._shutdown:
+                raise RuntimeError("Cannot submit tasks after shutdown.")
+            if self._connected == 0:
+                raise RuntimeError("No worker is connected.")
+            future = Future()
+            self._tasks.put((future, fn, args, kwargs))
+            return future
+
+    def shutdown(self, wait=True, *, cancel_futures=False):
+        with self._lock:
+            self._shutdown = True
+            if cancel_futures:
+                self._cancel_queued()
+            for _ in self._threads:
+                self._tasks.put(None)
+        if wait:
+            for t in self._threads:
+                t.join()
+        for p in self._processes:
+            p.terminate()
+            p.join()
+
+    def _cancel_queued(self, exception=None):
+        """
+        Cancel the tasks that no worker has picked up yet, or fail them with
+        ``exception``.
+        """
+        while True:
+            try:
+                item = self._tasks.get_nowait()
+            except queue.Empty:
+                return
+            if item is None:
+                # Keep the signals for the dispatchers to stop.
+                self._tasks.put(None)
+                return
+            if exception is None:
+                item[0].cancel()
+            elif item[0].set_running_or_notify_cancel():
+                item[0].set_exception(exception)
+
+    def _dispatch(self, address):
+        """
+        Feed tasks to the worker at ``address`` one at a time.
+        """
+        try:
+            connection = Client(tuple(address), authkey=self.authkey)
+        except Exception:
+            self._disconnect()
+            return
+
+        with connection:
+            while True:
+                item = self._tasks.get()
+                if item is None:
+                    break
+
+                (future, fn, args, kwargs) = item
+                if not future.set_running_or_notify_cancel():
+                    continue
+
+                try:
+                    connection.send((fn, args, kwargs))
+                    (succeeded, value, tb) = connection.recv()
+                except (OSError, EOFError) as e:
+                    future.set_exception(e)
+                    self._disconnect()
+                    return
+                except Exception as e:
+                    # The task could not be pickled or the result unpickled.
+                    future.set_exception(e)
+                    continue
+
+                if succeeded:
+                    future.set_result(value)
+                else:
+                    value.__cause__ = _RemoteTraceback(tb)
+                    future.set_exception(value)
+
+    def _disconnect(self):
+        """
+        Take note of a lost worker. If it was the last one, the tasks that are
+        still waiting fail.
+        """
+        with self._lock:
+            self._connected -= 1
+            if self._connected == 0:
+                self._cancel_queued(exception=RuntimeError(
+                    "The connections to all workers were lost."))
+
+
+def _check_authkey(authkey):
+    """
+    Raise an error unless ``authkey`` is a non-empty bytes object.
+    """
+    if not isinstance(authkey, (bytes, bytearray)) or len(authkey) == 0:
+        raise ValueError("A secret authkey (a non-empty bytes object) is "
+                         + "required to authenticate connections to workers.")
+
+def serve_worker(host="localhost", port=6000, *, authkey, ready=None):
+    """
+    Run a worker for a :py:class:`SocketExecutor`. The worker accepts one
+    connection at a time and performs the tasks it receives until the
+    connection is closed. It then waits for the next connection.
+
+    Only connections that authenticate with the secret ``authkey`` are
+    accepted. As the worker runs the tasks it receives, anyone who knows the
+    key can run code on this machine.
+
+    If ``ready`` is a :py:class:`multiprocessing.connection.Connection`, the
+    address the worker listens on is sent through it. This way, ``port=0`` can
+    be used to listen on any free port.
+    """
+    _check_authkey(authkey)
+    with Listener((host, port), authkey=authkey) as listener:
+        if ready is not None:
+            ready.send(listener.address)
+            ready.close()
+
+        while True:
+            try:
+                connection = listener.accept()
+            except Exception:
+                # Failed authentication or a broken connection attempt.
+                continue
+
+            with connection:
+                while True:
+                    try:
+                        (fn, args, kwargs) = connection.recv()
+                    except (OSError, EOFError):
+                        break
+                    except Exception as e:
+                        # The task could not be unpickled, e.g. because its
+                        # function is not available on this machine.
+                        connection.send((False, e, traceback.format_exc()))
+                        continue
+
+                    try:
+                        response = (True, fn(*args, **kwargs), None)
+                    except Exception as e:
+                        response = (False, e, traceback.format_exc())
+
+                    try:
+                        connection.send(response)
+                    except (OSError, EOFError):
+                        break
+                    except Exception as e:
+                        # The result or the exception can't be pickled.
+                        connection.send((False,
+                                         RuntimeError(f"Could not send result: {e}"),
+                                         traceback.format_exc()))
+
@@ -0,0 +1,233 @@
+"""
+Storage for the populations of positions over the stages of a simulation.
+"""
+
+
+class PositionHistory:
+    """
+    The populations of a simulation, one per debate stage. The history behaves
+    like a list of lists of positions: ``history[i]`` returns the population at
+    stage ``i`` and ``history[i][j]`` the position of agent ``j`` at that stage.
+
+    Populations are stored with structural sharing. Only agents whose positions
+    changed compared to the previous stage are recorded at each stage. Agents
+    whose truth-value attributions, strategies and :py:attr:`debate` did not
+    change refer to the same position object across stages. Positions that a
+    simulation passes on unchanged keep the debate they were created with,
+    while a position that was recreated for a new debate stage is recorded as
+    changed. Every :py:attr:`checkpoint_interval` stages, a complete list of 
+    references is kept so that accessing old stages does not require replaying
+    the entire history.
+
+    A history can be thinned out with :py:meth:`thin`, so that only the
+    populations of some stages are kept.
+
+    :param int checkpoint_interval: Number of stages between two complete
+        populations.
+    """
+
+    # Keep the populations of all stages. Also the default for histories
+    # pickled before histories could be thinned out.
+    keep_every = 1
+
+    def __init__(self, populations=(), *, checkpoint_interval=50):
+        self.checkpoint_interval = checkpoint_interval
+        # Changed positions per stage, as a mapping from agent index to position.
+        self.deltas = []
+        # The size of the population at each stage.
+        self.sizes = []
+        self.checkpoints = {}
+        self._latest = None
+
+        for p in populations:
+            self.append(p)
+
+    @classmethod
+    def resumed(cls, population, stages):
+        """
+        Return a history of ``stages`` stages of which only the population at
+        the latest stage, ``population``, is known, as in a history thinned
+        out with ``keep_every=None``. Used to resume simulations from
+        snapshots.
+        """
+        history = cls()
+        history.keep_every = None
+        history.deltas = [None] * (stages - 1) + [dict(enumerate(population))]
+        history.sizes = [None] * (stages - 1) + [len(population)]
+        history.checkpoints = {stages - 1: list(population)}
+        return history
+
+    def __repr__(self):
+        return str(f"PositionHistory with {len(self)} stages.")
+
+    def __len__(self):
+        return len(self.deltas)
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return [self[i] for i in range(*key.indices(len(self)))]
+
+        if key < 0:
+            key += len(self)
+        if not 0 <= key < len(self):
+            raise IndexError("PositionHistory index out of range.")
+
+        # Return a copy so that the stored population can't be altered.
+        return list(self._population(key))
+
+    def __iter__(self):
+        if self.keep_every != 1:
+            for stage in self.stages():
+                yield list(self.checkpoints[stage])
+            return
+
+        population = []
+        for stage in range(len(self)):
+            population = self._apply(population, stage)
+            yield list(population)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_latest"] = None
+        return state
+
+    def append(self, population):
+        """
+        Add the population of the next stage to the history.
+        """
+        population = list(population)
+        stage = len(self.deltas)
+
+        if stage == 0:
+            delta = dict(enumerate(population))
+        else:
+            previous = self._population(stage - 1)
+            delta = {}
+            for (i, p) in enumerate(population):
+                if i < len(previous) and _same_position(previous[i], p):
+                    # Share the unchanged position with the previous stage.
+                    population[i] = previous[i]
+                else:
+                    delta[i] = p
+
+        self.deltas.append(delta)
+        self.sizes.append(len(population))
+
+        if self.keep_every != 1:
+            # The latest population is always kept. The previous one is
+            # discarded unless its stage is to be kept.
+            self.checkpoints[stage] = population
+            if stage > 0 and not _kept(stage - 1, self.keep_every):
+                del self.checkpoints[stage - 1]
+                self.deltas[stage - 1] = None
+        elif stage % self.checkpoint_interval == 0:
+            self.checkpoints[stage] = population
+
+        self._latest = (stage, population)
+
+    def changed(self, stage):
+        """
+        Return the indices of the agents whose positions changed at ``stage``,
+        including those that were recreated for a new debate.
+        """
+        if self.deltas[stage] is None:
+            raise IndexError(f"The population at stage {stage} was discarded.")
+        return sorted(self.deltas[stage])
+
+    def thin(self, keep_every):
+        """
+        Only keep the populations of every ``keep_every``-th stage, starting
+        with the first, and of the latest stage. If ``keep_every`` is
+        :py:obj:`None`, only the latest population is kept. Populations of
+        other stages, including those already in the history, are discarded,
+        and accessing them raises an :py:exc:`IndexError`. Stages keep their
+        numbers, so ``len(history)`` still counts all stages, while iterating
+        over the history only yields the populations that were kept (see
+        :py:meth:`stages`).
+        """
+        if keep_every == 1:
+            if self.keep_every != 1:
+                raise ValueError("Discarded populations can't be restored.")
+            return
+
+        kept = {stage: self._population(stage) for stage in range(len(self))
+                if (stage == len(self) - 1 or _kept(stage, keep_every))
+                and self.deltas[stage] is not None}
+        self.keep_every = keep_every
+        self.checkpoints = kept
+        for stage in range(len(self)):
+            if stage not in kept:
+                self.deltas[stage] = None
+
+    def stages(self):
+        """
+        Return the stages whose populations are kept.
+        """
+        if self.keep_every != 1:
+            return sorted(self.checkpoints)
+        return list(range(len(self)))
+
+    def _population(self, stage):
+        """
+        Reconstruct the population at ``stage`` from the closest preceding
+        checkpoint.
+        """
+        if self._latest is not None and self._latest[0] == stage:
+            return self._latest[1]
+
+        if self.keep_every != 1:
+            try:
+                return self.checkpoints[stage]
+            except KeyError:
+                raise IndexError(
+                    f"The population at stage {stage} was discarded.") from None
+
+        start = stage - stage % self.checkpoint_interval
+        population = self.checkpoints[start]
+        for s in range(start + 1, stage + 1):
+            population = self._apply(population, s)
+
+        if stage == len(self) - 1:
+            self._latest = (stage, population)
+
+        return population
+
+    def _apply(self, population, stage):
+        """
+        Apply the changes recorded at ``stage`` to ``population``.
+        """
+        population = population[:self.sizes[stage]] \
+                     + [None] * (self.sizes[stage] - len(population))
+        for (i, p) in self.deltas[stage].items():
+            population[i] = p
+        return population
+
+
+def _kept(stage, keep_every):
+    """
+    Check whether a history thinned out to every ``keep_every``-th stage keeps
+    the population at ``stage``.
+    """
+    return keep_every is not None and stage % keep_every == 0
+
+def _same_position(pos1, pos2):
+    """
+    Check whether two positions have the same type, truth-value attributions,
+    strategies and debate.
+    """
+    if pos1 is pos2:
+        return True
+
+    return type(pos1) is type(pos2) \
+           and dict.__eq__(pos1, pos2) \
+           and all(getattr(pos1, a, None) == getattr(pos2, a, None)
+                   for a in ["introduction_strategy", "update_strategy"]) \
+           and _same_debate(getattr(pos1, "debate", None), 
+                            getattr(pos2, "debate", None))
+
+def _same_debate(debate1, debate2):
+    """
+    Check whether two debates are the same. They are compared by identity 
+    first, as comparing their arguments is costly for large debates.
+    """
+    return debate1 is debate2 or debate1 == debate2
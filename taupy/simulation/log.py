@@ -0,0 +1,117 @@
+"""
+A structured log for simulations.
+"""
+
+from collections import deque
+from logging import DEBUG, INFO, WARNING
+
+from sympy import Basic
+
+
+class LogRecord:
+    """
+    A single entry in a :py:class:`SimulationLog`. The message is only
+    formatted, in the style of ``message % args``, when the record is turned
+    into a string. Immutable arguments, such as numbers, strings, sympy 
+    expressions and tuples of them, are kept as they are. Other arguments are 
+    turned into strings when the record is created, so that the record does 
+    not keep positions alive and is not affected by later changes to them.
+    """
+    __slots__ = ("level", "message", "args")
+
+    def __init__(self, level, message, args=()):
+        self.level = level
+        self.message = message
+        self.args = tuple(a if _immutable(a) else str(a) for a in args)
+
+    def __str__(self):
+        return self.message % self.args if self.args else self.message
+
+    def __repr__(self):
+        return f"LogRecord({self.level}, {str(self)!r})"
+
+    def __getstate__(self):
+        return (self.level, self.message, self.args)
+
+    def __setstate__(self, state):
+        self.level, self.message, self.args = state
+
+
+def _immutable(a):
+    """
+    Check whether ``a`` can be kept in a :py:class:`LogRecord` as it is.
+    """
+    if a is None or isinstance(a, (int, float, str, Basic)):
+        return True
+    return isinstance(a, (tuple, frozenset)) and all(_immutable(i) for i in a)
+
+
+class SimulationLog:
+    """
+    The log of a simulation. Entries are stored as :py:class:`LogRecord`
+    objects and read back as strings, so that the log can be used like a list
+    of messages.
+
+    :param int level: Records below this level are not recorded at all. The
+        levels of Python's :py:mod:`logging` module are used: per-agent
+        messages are logged at :py:obj:`logging.DEBUG`, events at
+        :py:obj:`logging.INFO`, and failures at :py:obj:`logging.WARNING`. Set
+        to :py:obj:`None` to switch the log off entirely.
+
+    :param int maxlen: If given, only the last ``maxlen`` records are kept.
+    """
+
+    def __init__(self, level=DEBUG, maxlen=None):
+        self.level = level
+        self.records = deque(maxlen=maxlen)
+
+    def __repr__(self):
+        return str(f"SimulationLog with {len(self)} records.")
+
+    def __len__(self):
+        return len(self.records)
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return [str(r) for r in list(self.records)[key]]
+        return str(self.records[key])
+
+    def __iter__(self):
+        return (str(r) for r in self.records)
+
+    def enabled(self, level):
+        """
+        Check whether records at ``level`` are recorded.
+        """
+        return self.level is not None and level >= self.level
+
+    def record(self, level, message, *args):
+        """
+        Record ``message`` at ``level``. Formatting with ``args`` is deferred
+        until the record is read, but mutable arguments are converted as 
+        described in :py:class:`LogRecord`.
+        """
+        if self.enabled(level):
+            self.records.append(LogRecord(level, message, args))
+
+    def debug(self, message, *args):
+        self.record(DEBUG, message, *args)
+
+    def info(self, message, *args):
+        self.record(INFO, message, *args)
+
+    def warning(self, message, *args):
+        self.record(WARNING, message, *args)
+
+    def append(self, message):
+        """
+        Record a preformatted ``message`` at :py:obj:`logging.INFO`.
+        """
+        self.record(INFO, message)
+
+    def extend(self, messages):
+        """
+        Record several preformatted ``messages`` at :py:obj:`logging.INFO`.
+        """
+        for m in messages:
+            self.append(m)
@@ -0,0 +1,143 @@
+"""
+Observers that are called while a simulation runs. An observer is any callable
+that accepts the simulation. It is called once when :py:meth:`run` starts and
+after every step that adds a debate stage, and can inspect the latest debate
+stage and population. Observers are passed to :py:meth:`run` as a list::
+
+    recorder = MetricRecorder(["density", "agreement"])
+    sim.run(observers=[recorder], keep_every=None)
+    recorder.to_frame()
+
+The observers of the last run are kept in :py:attr:`observers` of the
+simulation, so that they are returned together with the results of an
+:py:func:`experiment`.
+"""
+
+from math import sqrt
+
+import numpy as np
+import pandas as pd
+
+from taupy.analysis.agreement import normalised_hamming_distance
+
+# The metrics a MetricRecorder can compute, with the names of their columns.
+# The names agree with the columns of an Evaluation.
+METRICS = {"density": "density",
+           "sccp_extension": "Size of SCCP",
+           "agreement": "agreement",
+           "dispersion": "dispersion",
+           "unique_positions": "number of unique positions"}
+
+
+class MetricRecorder:
+    """
+    An observer that records summary measures of every debate stage while a
+    simulation runs. As the measures are available without the populations and
+    debate stages of the run, these can be discarded with the ``keep_every``
+    setting of :py:meth:`run`.
+
+    Measures are computed incrementally. The density and the extension of the
+    SCCP are taken from the simulation, which computes them once per debate
+    stage, and the distances between agents are only updated for agents whose
+    positions changed.
+
+    :param metrics: The names of the measures to record, a selection of
+        :py:obj:`"density"`, :py:obj:`"sccp_extension"`, :py:obj:`"agreement"`,
+        :py:obj:`"dispersion"` and :py:obj:`"unique_positions"`.
+
+    :param measure: The distance between two positions that the agreement and
+        the dispersion are based on. The agreement is one minus the mean
+        distance between agents, which is the mean :py:func:`bna` for the
+        default measure. The dispersion is defined as in
+        :py:func:`pairwise_dispersion`.
+    """
+
+    def __init__(self, metrics=tuple(METRICS), *,
+                 measure=normalised_hamming_distance):
+        unknown = set(metrics) - set(METRICS)
+        if unknown:
+            raise ValueError(f"Unknown metrics: {sorted(unknown)}. Available "
+                             + f"metrics are {list(METRICS)}.")
+        self.metrics = list(metrics)
+        self.measure = measure
+        self.records = {}
+        # State of the incremental computations: the stage and population size
+        # last seen, the matrix of distances between agents and the agents'
+        # positions as hashable keys.
+        self._stage = None
+        self._size = None
+        self._distances = None
+        self._keys = None
+
+    def __repr__(self):
+        return str(f"MetricRecorder of {len(self.records)} debate stages.")
+
+    def __call__(self, simulation):
+        stage = len(simulation.positions) - 1
+        if stage in self.records:
+            return
+
+        population = simulation.positions[-1]
+        if self._stage is not None and stage == self._stage + 1 \
+           and len(population) == self._size:
+            changed = simulation.positions.changed(stage)
+        else:
+            changed = None
+        self._stage = stage
+        self._size = len(population)
+
+        record = {}
+        if "density" in self.metrics:
+            record["density"] = simulation.density()
+        if "sccp_extension" in self.metrics:
+            record["sccp_extension"] = simulation.model_count()
+        if {"agreement", "dispersion"} & set(self.metrics):
+            record |= self._measure_distances(population, changed)
+        if "unique_positions" in self.metrics:
+            record["unique_positions"] = self._count_unique(population, changed)
+
+        self.records[stage] = {k: record[k] for k in self.metrics}
+
+    def to_frame(self):
+        """
+        Return the recorded measures as a :py:class:`pandas.DataFrame` with one
+        row per debate stage.
+        """
+        frame = pd.DataFrame.from_dict(self.records, orient="index",
+                                       columns=self.metrics)
+        frame = frame.rename(columns=METRICS).sort_index()
+        frame.index.name = "stage"
+        return frame
+
+    def _measure_distances(self, population, changed):
+        """
+        The agreement and dispersion in ``population``. Only the distances of
+        agents in ``changed`` are computed anew, or all distances if
+        ``changed`` is :py:obj:`None`.
+        """
+        n = len(population)
+        if changed is None or self._distances is None:
+            self._distances = np.array([[self.measure(i, j) for j in population]
+                                        for i in population], dtype=float)
+        else:
+            for i in changed:
+                row = [self.measure(population[i], j) for j in population]
+                self._distances[i, :] = row
+                self._distances[:, i] = row
+
+        if n < 2:
+            return {"agreement": np.nan, "dispersion": np.nan}
+        distances = self._distances[np.triu_indices(n, k=1)]
+        return {"agreement": 1 - distances.mean(),
+                "dispersion": 2 * sqrt(distances.var())}
+
+    def _count_unique(self, population, changed):
+        """
+        The number of distinct positions in ``population``.
+        """
+        if changed is None or self._keys is None:
+            self._keys = [frozenset(p.items()) for p in population]
+        else:
+            for i in changed:
+                self._keys[i] = frozenset(population[i].items())
+        return len(set(self._keys))
@@ -1,11 +1,14 @@
 """
 Basic tools in simulations
 """
-from sympy import symbols, Not
-from random import choice, choices, sample
-from copy import deepcopy
-from concurrent.futures import ProcessPoolExecutor, as_completed
+from sympy import symbols, Not, And
+from random import Random
+from copy import copy, deepcopy
+from math import log2
+from concurrent.futures import as_completed
 import time
+import traceback
+from logging import DEBUG
 import numpy as np
 
 from taupy.analysis.agreement import (normalised_edit_distance, 
@@ -14,32 +17,62 @@ from taupy.analysis.agreement import (normalised_edit_distance,
 from taupy.basic.utilities import (satisfiability_count, 
                                    density_from_numsat,
                                    z3_assertion_from_argument,
-                                   satisfiability)
-from taupy.basic.core import EmptyDebate, Debate
+                                   satisfiability, PremiseIndex,
+                                   PropositionLevels, premise_key,
+                                   _arguments_of_debate)
+from taupy.basic.core import EmptyDebate, Debate, Argument
 from taupy.basic.positions import Position
-from .update import introduce, response
+from .history import PositionHistory
+from .log import SimulationLog
+from .store import ExperimentStore, ResultCache
+from .snapshot import take_snapshot, restore_snapshot
+from .budget import Budget, BudgetExceeded
+from .executors import executor_from_settings
+from .update import introduce, response, close_update_pool
+from .candidates import CandidateIndex
 from taupy.generators.maps import generate_hierarchical_argument_map
 import taupy.simulation.strategies as strategies
+import taupy.basic.profiling as profiling
 
 
 class SimulationBase:
     """
     A super class for simulations.
     """
+    def init_rng(self, seed):
+        """
+        Set up the random number generator of the simulation. All random draws
+        in a simulation, including those of the argument map generators and the
+        update mechanisms, are taken from :py:attr:`rng`, so that simulations
+        with the same settings and seed yield the same results. 
+
+        The ``seed`` can be an integer, a :py:class:`numpy.random.SeedSequence`,
+        e.g. one spawned by :py:func:`experiment`, or :py:obj:`None` to draw 
+        fresh entropy from the operating system. The seed sequence is kept as
+        :py:attr:`seed`.
+        """
+        if not isinstance(seed, np.random.SeedSequence):
+            seed = np.random.SeedSequence(seed)
+        self.seed = seed
+        self.rng = Random(int.from_bytes(seed.generate_state(4).tobytes(), 
+                                         "little"))
+
     def init_positions(self, positions, target_length, shared_judgements=0):
         """
         Generate initial Positions. Optionally, the Positions may start off with
         explicit truth-value attributions. Positions are filled up with random
         values for truth-value attributions they do not yet have.
+
+        The populations are stored in a :py:class:`PositionHistory`.
         """
-        self.positions = []
+        self.positions = PositionHistory()
 
         if target_length == None:
             target_length = len(self.sentencepool)
 
         if shared_judgements > 0:
             shared_subposition = {
-                i: choice([True, False]) for i in sample(
+                i: self.rng.choice([True, False]) for i in self.rng.sample(
                     self.sentencepool, k=shared_judgements)
             }
 
@@ -51,15 +84,164 @@ class SimulationBase:
 
             if len(p) < target_length:
                 # Only fill up positions that do not have the desired length.
-                pool = sample(self.sentencepool, k=target_length)
+                pool = self.rng.sample(self.sentencepool, k=target_length)
                 for s in pool:
                     if s not in p and len(p) < target_length:
                         # While filling up a position, catch when it reaches the
                         # desired length.
-                        p[s] = choice([True, False])
+                        p[s] = self.rng.choice([True, False])
 
         self.positions.append(positions)
 
+    @property
+    def assertions(self):
+        """
+        The z3 assertions of the arguments in the current debate stage. As z3
+        objects can't be pickled, they are not kept when a simulation is
+        pickled or snapshotted, and are rebuilt when they are needed again.
+        """
+        if getattr(self, "_assertions", None) is None:
+            # Rebuilt in the order in which the arguments were asserted.
+            self._assertions = [
+                z3_assertion_from_argument(
+                    premises=a.args[0].args if isinstance(a.args[0], And)
+                             else (a.args[0],),
+                    conclusion=a.args[1])
+                for a in self._asserted_arguments()]
+        return self._assertions
+
+    @assertions.setter
+    def assertions(self, assertions):
+        self._assertions = assertions
+
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_assertions"] = None
+        state["_update_pool"] = None
+        return state
+
+    def snapshot(self, path=None, *, include_log=False):
+        """
+        Return a compact snapshot of the simulation as bytes, from which it can
+        be resumed with :py:meth:`restore`. If ``path`` is given, the snapshot
+        is also written to this file. 
+
+        Snapshots contain the settings and the arguments of the simulation, 
+        the state of its random number generator and its latest population.
+        The populations of earlier stages are not kept, as if the history had 
+        been thinned out with ``keep_every=None``. The :py:attr:`log` is only 
+        included if ``include_log`` is set.
+        """
+        return take_snapshot(self, path, include_log=include_log)
+
+    @classmethod
+    def restore(cls, snapshot):
+        """
+        Resume a simulation from a ``snapshot``, given as bytes or as the path
+        of a file written by :py:meth:`snapshot`. A restored simulation 
+        continues exactly as the original would have.
+        """
+        return restore_snapshot(cls, snapshot)
+
+    def _stage_measures(self, key, debate):
+        """
+        Return the model count and the density of a debate stage. Both are 
+        computed once per stage and kept in :py:attr:`model_counts` and 
+        :py:attr:`densities`, under the ``key`` that identifies the stage. 
+        ``debate`` is a function that returns the debate stage; it is only 
+        called if the stage was not measured before.
+        """
+        if key not in self.model_counts:
+            stage = debate()
+            count = satisfiability_count(stage)
+            atoms = len(stage.atoms())
+            self.model_counts[key] = count
+            self.densities[key] = (atoms - log2(count)) / atoms
+        return (self.model_counts[key], self.densities[key])
+
+    def model_count(self):
+        """
+        Return the number of coherent and complete positions, i.e. the 
+        extension of the SCCP, of the current debate stage.
+        """
+        return self._stage_measures(*self._current_stage())[0]
+
+    def density(self):
+        """
+        Return the dialectical density of the current debate stage.
+        """
+        return self._stage_measures(*self._current_stage())[1]
+
+    def _start_observers(self, observers, keep_every):
+        """
+        Keep the ``observers`` of a run in :py:attr:`observers`, thin out the
+        history of populations if requested and show the current stage to the
+        observers.
+        """
+        self.observers = list(observers)
+        if keep_every != 1:
+            self.positions.thin(keep_every)
+        self._notify_observers()
+
+    def _notify_observers(self):
+        """
+        Call the observers with the simulation after a step.
+        """
+        for observer in self.observers:
+            observer(self)
+
+    def _start_budget(self, budget):
+        """
+        Start measuring the resources of a run against ``budget``, which may
+        be a :py:class:`Budget`, a dictionary of its settings or 
+        :py:obj:`None`. Returns the :py:class:`Budget`, which has no limits 
+        if none were given.
+
+        The steps and the wall-clock time of a simulation are counted in 
+        :py:attr:`steps` and :py:attr:`run_seconds` over all of its runs, so
+        that a run that resumes a simulation continues to count from there.
+        """
+        self.stop_reason = None
+        # Simulations pickled before the counters were introduced.
+        self.steps = getattr(self, "steps", 0)
+        self.run_seconds = getattr(self, "run_seconds", 0.0)
+        if budget is None:
+            budget = Budget()
+        elif isinstance(budget, dict):
+            budget = Budget(**budget)
+        budget.start(elapsed=self.run_seconds)
+        return budget
+
+    def _finish_run(self, budget):
+        """
+        Add the wall-clock time of the run measured by ``budget`` to 
+        :py:attr:`run_seconds` and stop the worker processes of parallel 
+        responses.
+        """
+        self.run_seconds = budget.elapsed()
+        close_update_pool(self)
+
+    def _budget_exceeded(self, budget):
+        """
+        Check whether the last step or the run exceeded ``budget``. If so, the
+        reason is recorded in :py:attr:`stop_reason`.
+        """
+        reason = budget.exceeded()
+        if reason is not None:
+            self._end_early(reason)
+            return True
+        return False
+
+    def _end_early(self, reason):
+        """
+        Record that a run ended because the limit ``reason`` of its budget 
+        was exceeded.
+        """
+        self.stop_reason = reason
+        self.log.warning("Simulation ended early: %s exceeded.", 
+                         reason.replace("_", " "))
+
 
 class Simulation(list, SimulationBase):
     """
@@ -171,10 +353,14 @@ class Simulation(list, SimulationBase):
 
     :param default_update_strategy:
         Specifies how agents should update their belief system in case of 
-        incoherence. Two methods are implemented:
+        incoherence. Four methods are implemented:
         
         - :py:obj:`"closest_coherent"`: recommended for complete positions
+        - :py:obj:`"closest_coherent_batch"`: like the previous, but updates the
+          entire population at once, recommended for large populations
         - :py:obj:`"closest_closed_partial_coherent"`: recommended for partial positions
+        - :py:obj:`"closest_closed_partial_coherent_maxsat"`: like the previous,
+          but with a dedicated MaxSAT search that scales to larger debates
 
     :param int partial_neighbour_search_radius:
         A parameter for the :py:obj:`"closest_closed_partial_coherent"`. As the 
@@ -188,11 +374,34 @@ class Simulation(list, SimulationBase):
         number of positions in the simulation. It is recommended to increase
         this factor from the default 0.5 to a setting like 4 in difficult 
         scenarios, such as a low number of agents and an opponent-sensitive
-        argumentation strategy.
+        argumentation strategy. In randomly growing debates, the arguments 
+        are drawn from an index of all candidates of the debate stage (see 
+        :py:class:`CandidateIndex`). If none of the attempts succeeds, the 
+        index is searched for any pair of agents that can exchange an argument,
+        so the run only ends if there is none.
 
     :param dict ground_truth:
         A mapping of truth-value assignments that must never be violated
         through argument introduction.
+
+    :param dict update_executor:
+        Settings for a :py:class:`concurrent.futures.ProcessPoolExecutor` that
+        distributes the agents' updates in each step over several processes.
+        The processes are started with the first update of a run and are kept
+        until it ends. Only has effect for the 
+        :py:obj:`"closest_closed_partial_coherent"` update strategies. If 
+        :py:obj:`None` (default), agents are updated one after another.
+
+    :param int log_level: Only messages at or above this level are recorded in
+        the simulation's :py:attr:`log`. Per-agent messages are logged at 
+        :py:obj:`logging.DEBUG`. Set to :py:obj:`logging.INFO` to record events
+        only, or to :py:obj:`None` to switch the log off.
+
+    :param int log_maxlen: If given, the log only keeps the most recent 
+        ``log_maxlen`` messages.
+
+    :param seed: Seed for the simulation's random number generator, see 
+        :py:meth:`init_rng`. 
     """
 
     def __init__(self,
@@ -212,7 +421,13 @@ class Simulation(list, SimulationBase):
                  default_introduction_strategy = strategies.random,
                  default_update_strategy = "closest_coherent",
                  partial_neighbour_search_radius = 50,
-                 introduction_attempts = 0.5):
+                 introduction_attempts = 0.5,
+                 update_executor = None,
+                 log_level = DEBUG,
+                 log_maxlen = None,
+                 seed = None):
+
+        self.init_rng(seed)
 
         if sentencepool == "inherit": # import from parent debate
             self.sentencepool = [i for i in parent_debate.atoms()]
@@ -235,6 +450,7 @@ class Simulation(list, SimulationBase):
         self.partial_neighbour_search_radius = partial_neighbour_search_radius
         self.introduction_attempts = introduction_attempts
         self.ground_truth = ground_truth
+        self.update_executor = update_executor
 
         if positions is not None:
             if copy_input_positions == True:
@@ -257,8 +473,17 @@ class Simulation(list, SimulationBase):
         self.directed = directed
         self.default_introduction_strategy = default_introduction_strategy
         self.default_update_strategy = default_update_strategy
-        self.log = []
+        self.log = SimulationLog(level=log_level, maxlen=log_maxlen)
         self.assertions = [] # assertions for z3.Solver and z3.Optimize
+        # The debate stages are stored as the number of arguments from the
+        # append-only argument log that they contain. Debate objects are only
+        # created when a stage is accessed.
+        self.arguments = []
+        self._stage_cache = {}
+        # Model counts and densities of the debate stages, by the number of
+        # arguments in the stage.
+        self.model_counts = {}
+        self.densities = {}
         list.__init__(self)
         # Initialise the Simulation with an empty debate. This is
         # necessary so that the initial positions can attach to some debate.
@@ -268,12 +493,471 @@ class Simulation(list, SimulationBase):
             self.append(parent_debate)
             # Add premises in the parent debate to the used premise storage.
             for i in parent_debate.args:
-                self.used_premises.append(i.args[0])
+                self.use_premises(i.args[0])
+
+    def __getitem__(self, key):
+        """
+        Return the debate stage(s) at ``key``, materialised from the argument
+        log.
+        """
+        if isinstance(key, slice):
+            return [self._materialise(n) for n in list.__getitem__(self, key)]
+        return self._materialise(list.__getitem__(self, key))
+
+    def __iter__(self):
+        for n in list.__iter__(self):
+            yield self._materialise(n)
+
+    def __reversed__(self):
+        for n in list.__reversed__(self):
+            yield self._materialise(n)
+
+    # The list methods that take or return debate stages work on the
+    # materialised stages. Stages are compared by their arguments.
+
+    def __contains__(self, debate):
+        return self._stage_length(debate) in set(list.__iter__(self))
+
+    def index(self, debate, *args):
+        """
+        Return the index of the first debate stage that equals ``debate``.
+        """
+        try:
+            return list.index(self, self._stage_length(debate), *args)
+        except ValueError:
+            raise ValueError(f"{debate} is not a debate stage of the "
+                             + "simulation.") from None
+
+    def count(self, debate):
+        """
+        Return the number of debate stages that equal ``debate``.
+        """
+        return list.count(self, self._stage_length(debate))
+
+    def copy(self):
+        """
+        Return a list of the debate stages.
+        """
+        return list(self)
+
+    def __eq__(self, other):
+        if not isinstance(other, list):
+            return NotImplemented
+        return len(self) == len(other) \
+               and all(a == b for (a, b) in zip(self, other))
+
+    def __ne__(self, other):
+        equal = self.__eq__(other)
+        return equal if equal is NotImplemented else not equal
+
+    __hash__ = None
+
+    # Debate stages can't be ordered.
+    def __lt__(self, other):
+        return NotImplemented
+
+    __le__ = __gt__ = __ge__ = __lt__
+
+    def __add__(self, other):
+        return list(self) + list(other)
+
+    def __radd__(self, other):
+        return list(other) + list(self)
+
+    def __mul__(self, n):
+        return list(self) * n
+
+    __rmul__ = __mul__
+
+    def extend(self, debates):
+        """
+        Add each of ``debates`` as the next debate stage, see :py:meth:`append`.
+        """
+        for debate in debates:
+            self.append(debate)
+
+    def __iadd__(self, debates):
+        self.extend(debates)
+        return self
+
+    def _unsupported(self, *args, **kwargs):
+        raise TypeError("Debate stages can only be added with append(), "
+                        + "append_argument() and repeat_stage(), and only be "
+                        + "removed with pop().")
+
+    insert = remove = clear = sort = reverse = _unsupported
+    __setitem__ = __delitem__ = __imul__ = _unsupported
+
+    def pop(self, index=-1):
+        """
+        Remove the debate stage at ``index`` and return it. Arguments that are
+        no longer part of any stage are removed from the argument log, 
+        together with their premises.
+        """
+        debate = self[index]
+        list.pop(self, index)
+        self._discard_arguments()
+        return debate
+
+    def _discard_arguments(self):
+        """
+        Remove the arguments that are not part of the last debate stage from 
+        the argument log, the used premises and the derived state.
+        """
+        n = list.__getitem__(self, -1) if len(self) else 0
+        if n == len(self.arguments):
+            return
+        for argument in reversed(self.arguments[n:]):
+            key = premise_key(argument.args[0])
+            for i in reversed(range(len(self.used_premises))):
+                if premise_key(self.used_premises[i]) == key:
+                    del self.used_premises[i]
+                    break
+        del self.arguments[n:]
+        for measures in [self.model_counts, self.densities, self._stage_cache]:
+            for k in [k for k in measures if k > n]:
+                del measures[k]
+        # The derived state is rebuilt without the arguments.
+        self._assertions = None
+        self._premise_index = None
+        self._proposition_levels = None
+
+    def _stage_length(self, debate):
+        """
+        Return the number of arguments of the debate stages that equal 
+        ``debate``, or :py:obj:`None` if it can't be a stage of the simulation.
+        """
+        if not isinstance(debate, (EmptyDebate, Argument, Debate)):
+            return None
+        arguments = set(_arguments_of_debate(debate))
+        n = len(arguments)
+        if n > len(self.arguments) or arguments != set(self.arguments[:n]):
+            return None
+        return n
+
+    def __repr__(self):
+        return str(f"Simulation with {len(self)} debate stages and "
+                   + f"{len(self.arguments)} arguments.")
+
+    def __reduce__(self):
+        # Pickle and copy the argument log and the stage lengths only, not the 
+        # materialised debate stages.
+        state = self.__dict__.copy()
+        state["_stage_cache"] = {}
+        state["_assertions"] = None
+        state["_premise_index"] = None
+        state["_proposition_levels"] = None
+        state["_update_pool"] = None
+        return (_rebuild_simulation, 
+                (type(self), list(list.__iter__(self))), 
+                state)
+
+    def _materialise(self, n):
+        """
+        Return the debate consisting of the first ``n`` arguments of the 
+        argument log. The most recently used debate stages are cached.
+        """
+        if n not in self._stage_cache:
+            if len(self._stage_cache) >= 8:
+                del self._stage_cache[next(iter(self._stage_cache))]
+            if n == 0:
+                self._stage_cache[n] = EmptyDebate()
+            else:
+                # If a Debate consists of just one Argument, the debate's type
+                # is Argument b/c of inheritance from sympy cls.
+                self._stage_cache[n] = Debate(*self.arguments[:n])
+        return self._stage_cache[n]
+
+    def append(self, debate):
+        """
+        Add ``debate`` as the next debate stage. The debate needs to contain 
+        all arguments of the previous stage. Prefer :py:meth:`append_argument`
+        and :py:meth:`repeat_stage` for the common cases, which do not need to
+        compare the arguments of the stages.
+        """
+        arguments = _arguments_of_debate(debate)
+        previous = self.arguments[:list.__getitem__(self, -1)] if len(self) else []
+        if not set(previous) <= set(arguments):
+            raise ValueError("A debate stage must contain all arguments of "
+                             + "the previous debate stage.")
+
+        for a in arguments:
+            if a not in set(previous):
+                self.arguments.append(a)
+        list.append(self, len(self.arguments))
+
+    def append_argument(self, argument):
+        """
+        Add a debate stage that extends the last stage by ``argument``.
+        """
+        self.arguments.append(argument)
+        list.append(self, len(self.arguments))
+
+    def repeat_stage(self):
+        """
+        Carry the last debate stage along to the next stage.
+        """
+        list.append(self, list.__getitem__(self, -1))
 
     def premise_candidates(self):
         return set(self.sentencepool + [Not(i) for i in self.sentencepool])
 
-    def run(self, max_density=0.8, max_steps=1000, min_sccp=1, quiet=True):
+    @property
+    def premise_index(self):
+        """
+        A :py:class:`PremiseIndex` of the :py:attr:`used_premises`. Premises
+        are added to both when an argument is introduced. The index is not 
+        kept when the simulation is pickled or snapshotted, and is rebuilt 
+        when it is needed again.
+        """
+        if getattr(self, "_premise_index", None) is None:
+            self._premise_index = PremiseIndex(self.used_premises)
+        return self._premise_index
+
+    @property
+    def proposition_levels(self):
+        """
+        The :py:class:`PropositionLevels` of the sentences in the current 
+        debate stage, which require :py:attr:`key_statements`. The levels are
+        updated with the arguments added since they were last read, and are
+        rebuilt after the simulation was pickled or snapshotted.
+        """
+        if getattr(self, "_proposition_levels", None) is None:
+            self._proposition_levels = PropositionLevels(self.key_statements)
+        levels = self._proposition_levels
+        for argument in self.arguments[levels.arguments:list.__getitem__(self, -1)]:
+            levels.add(argument)
+        return levels
+
+    def use_premises(self, premises):
+        """
+        Record that the combination ``premises`` is used in an argument.
+        """
+        self.used_premises.append(premises)
+        self.premise_index.add(premises)
+
+    def current_debate(self):
+        """
+        Return the latest debate stage.
+        """
+        return self[-1]
+
+    def _asserted_arguments(self):
+        return self.arguments[:list.__getitem__(self, -1)]
+
+    def model_count(self, stage=-1):
+        """
+        Return the number of coherent and complete positions, i.e. the 
+        extension of the SCCP, of the debate stage with the index ``stage``. 
+        Counts are computed once per stage, e.g. for the stopping criterion of 
+        :py:meth:`run`, and are kept in :py:attr:`model_counts`.
+        """
+        n = list.__getitem__(self, stage)
+        return self._stage_measures(n, lambda: self._materialise(n))[0]
+
+    def density(self, stage=-1):
+        """
+        Return the dialectical density of the debate stage with the index 
+        ``stage``. Densities are kept in :py:attr:`densities`.
+        """
+        n = list.__getitem__(self, stage)
+        return self._stage_measures(n, lambda: self._materialise(n))[1]
+
+    def _introduce_any(self, candidates, budget=None):
+        """
+        Introduce an argument with one of the pairs of agents and strategies
+        for which ``candidates`` contains an argument, chosen at random. 
+        Returns whether there was such a pair.
+        """
+        population = self.positions[-1]
+        viable = []
+        for source in population:
+            if budget is not None:
+                budget.check()
+            options = source.introduction_strategy \
+                         if isinstance(source.introduction_strategy, list) \
+                         else [source.introduction_strategy]
+            for target in population:
+                if target is source:
+                    continue
+                viable += [(source, target, s) for s in options
+                           if candidates.exists(s, source, target)]
+
+        if not viable:
+            self.log.warning("No argument can be introduced with the "
+                             + "strategies of the population.")
+            return False
+
+        (source, target, strategy) = self.rng.choice(viable)
+        return introduce(self, source=source, target=target, strategy=strategy,
+                         candidates=candidates)
+
+    def _discard_step(self, stages):
+        """
+        Discard the argument of a step that was interrupted before the 
+        positions were updated, given the number of debate ``stages`` before
+        the step. Only introductions can be interrupted, so the step added at
+        most one argument and its premises.
+        """
+        if len(self) == stages:
+            return
+        list.pop(self)
+        self._discard_arguments()
+
+    def step(self, budget=None):
+        """
+        Take a single step of the simulation, in which an event is drawn from
+        :py:attr:`events`. Returns :py:obj:`False` if an argument should be 
+        introduced but none could be found, and :py:obj:`True` otherwise.
+
+        The searches of the step raise :py:class:`BudgetExceeded` if a limit
+        of ``budget`` is exceeded. The simulation may then hold an argument 
+        without the updated population, see :py:meth:`run`.
+        """
+        selected_event = self.rng.choices([i[0] for i in self.events.items()],
+                                          weights=[i[1] for i in self.events.items()])[0]
+
+        if selected_event not in ["introduction", "new_sentence"]:
+            raise NotImplementedError(
+                f"No recipe for event type {selected_event}.")
+
+        if selected_event == "introduction":
+            if self.directed and len(self.positions[-1]) >= 2:
+                # The user asked for a directed simulation and has supplied
+                # enough Positions. Now instantiate turns of trying to 
+                # introduce arguments. In randomly growing debates, the 
+                # arguments are drawn from an index of the candidates.
+                candidates = CandidateIndex(self) \
+                             if self.debate_growth == "random" else None
+                j = 0
+                while j < len(self.positions[-1]) * self.introduction_attempts:
+                    pick_positions = self.rng.sample(self.positions[-1], k=2)
+
+                    # Support for positions with multiple introduction 
+                    # strategies. First, try to pick a random element from 
+                    # the list of introduction  strategies of a position. If
+                    # that fails, assume that the strategy preference of a 
+                    # position is not given as a list, but as a single item.
+                    try:
+                        pick_strategy = self.rng.choice(
+                            pick_positions[0].introduction_strategy)
+                    except KeyError:
+                        pick_strategy = pick_positions[0].introduction_strategy
+
+                    argument_introduced = introduce(self,
+                                                    source=pick_positions[0],
+                                                    target=pick_positions[1],
+                                                    strategy=pick_strategy,
+                                                    candidates=candidates,
+                                                    budget=budget)
+                    if not argument_introduced:
+                        # The argument introduction did not succeed in this 
+                        # turn. We are trying it again if there have been 
+                        # less tries than half the size of the population.
+                        j += 1
+                        if budget is not None:
+                            budget.check()
+                        continue
+                    else:
+                        # An argument was found, break out of the loop.
+                        # (implies argument_introduced == True)
+                        self.log.debug(
+                            "Argument introduction suceeded after %d attempts.", j+1)
+                        break
+                else:
+                    if candidates is not None:
+                        # The index tells whether any pair of agents can 
+                        # still exchange an argument. 
+                        argument_introduced = self._introduce_any(candidates,
+                                                                  budget)
+                    else:
+                        # An argument could not be found within the 
+                        # available introduction attempts. This is enough
+                        # grounds to terminate the simulation run.
+                        self.log.warning(
+                            "Argument introduction did not succeed, even "
+                            + "after %d attempts.", j+1)
+                        argument_introduced = False
+
+                if argument_introduced:
+                    # Check if introduction was succesful before attempting 
+                    # response.
+                    response(simulation=self,
+                             debate=self[-1], 
+                             positions=self.positions[-1],
+                             method=self.default_update_strategy,
+                             sentences=self.sentencepool,
+                             executor=self.update_executor,
+                             budget=budget)
+            else:
+                # The user did not ask for a directed simulation and/or 
+                # provided less than 2 positions. In this case, we're 
+                # investing less work.
+                argument_introduced = introduce(
+                    self, strategy=self.default_introduction_strategy,
+                    budget=budget)
+                if argument_introduced:
+                    response(simulation=self,
+                             debate=self[-1],
+                             positions=self.positions[-1], 
+                             method=self.default_update_strategy,
+                             sentences=self.sentencepool,
+                             executor=self.update_executor,
+                             budget=budget)
+
+            # If no argument could be inserted, the log will tell more about 
+            # what went wrong.
+            return argument_introduced
+
+        if selected_event == "new_sentence":
+            # Let's see which sentences could be inserted into the debate.
+            # This will be the difference between the sentencepool and the 
+            # max_sentencepool
+
+            sentence_candidates = set(self.max_sentencepool) \
+                                  - set(self.sentencepool)
+
+            if len(sentence_candidates) > 0:
+                # Append a random candidate to the debate's sentencepool.
+                selected_sentence = self.rng.choice(
+                    sorted(sentence_candidates, key=str))
+                self.sentencepool.append(selected_sentence)
+                self.log.info("Sentence %s added to the sentence pool.",
+                              selected_sentence)
+
+                # Carry along the debate stage.
+                self.repeat_stage()
+
+                # Now have the positions take a random stance toward the 
+                # newly inserted sentence.
+                expanded_positions = []
+                for p in self.positions[-1]:
+                    # There is a 2:1 chance that the position does not 
+                    # suspend judgement on the new sentence.
+                    if self.rng.choice([True, True, False]):
+                        # If the positions does not suspend, there is a 1:1 
+                        # chance it will assign either truth value. Only 
+                        # changed positions are copied, and a shallow copy
+                        # suffices for truth-value attributions.
+                        e = copy(p)
+                        e[selected_sentence] = self.rng.choice([True, False])
+                        expanded_positions.append(e)
+                    else:
+                        expanded_positions.append(p)
+
+                self.positions.append(expanded_positions)
+
+            else:
+                # Failure to insert a sentence does not end the simulation, 
+                # but we take note of it in the log.
+                self.log.warning(
+                    "Tried to insert a new sentence to the debate but "
+                    + "maximum extension was reached.")
+
+            return True
+
+    def run(self, max_density=0.8, max_steps=1000, min_sccp=1, quiet=True,
+            profile=False, observers=(), keep_every=1, budget=None):
         """
         Run a Simulation using ``introduction_method`` and ``update_mechanism``
         until either ``max_density`` is reached, the SCCP has an extension of
@@ -282,9 +966,43 @@ class Simulation(list, SimulationBase):
         If ``quiet=False``, the last log entry which contains a summary of
         the simulation is not output. This is useful in batch processing of
         Simulations (see ``experiment()``).
+
+        If ``profile=True``, the time spent in the hot paths of the simulation
+        is recorded per debate stage, and a tuple of the usual return value and
+        a :py:class:`pandas.DataFrame` of the recordings is returned (see
+        :py:class:`taupy.basic.profiling.Profile`).
+
+        ``observers`` is a list of callables that are called with the 
+        simulation when the run starts and after every step, such as a
+        :py:class:`MetricRecorder`. If ``keep_every`` is set, only the 
+        populations of every ``keep_every``-th debate stage and of the last 
+        stage are kept, or only the last population if ``keep_every=None``
+        (see :py:meth:`PositionHistory.thin`).
+
+        A :py:class:`Budget` limits the wall-clock time and memory of the run
+        and of single steps. The run ends once a limit is exceeded. A step 
+        that exceeds a limit before it is finished is interrupted and 
+        discarded, so that the simulation can be continued. Why the run ended
+        is recorded in :py:attr:`stop_reason`: :py:obj:`"density"` if 
+        ``max_density`` or ``min_sccp`` was reached, :py:obj:`"max_steps"`, 
+        :py:obj:`"no_argument"` if no argument could be introduced, or the 
+        name of the exceeded limit of the budget.
+
+        Steps are counted in :py:attr:`steps` over all runs of the simulation,
+        so a simulation that is run again, e.g. after it was restored from a 
+        snapshot, continues until it has taken ``max_steps`` in total.
         """
+        if profile:
+            with profiling.profile() as p:
+                result = self.run(max_density=max_density, max_steps=max_steps,
+                                  min_sccp=min_sccp, quiet=quiet,
+                                  observers=observers, keep_every=keep_every,
+                                  budget=budget)
+            return (result, p.to_frame())
+
+        self._start_observers(observers, keep_every)
+        budget = self._start_budget(budget)
 
-        i = 0
         # The expected density reached at `min_sccp`
         density_from_min_sccp = density_from_numsat(
             s=min_sccp, n=len(self.max_sentencepool), b=2
@@ -293,145 +1011,59 @@ class Simulation(list, SimulationBase):
         stopping_density = min(max_density, density_from_min_sccp)
 
         while True:
+            if self.steps >= max_steps:
+                self.stop_reason = "max_steps"
+                break
 
-            selected_event = choices([i[0] for i in self.events.items()],
-                                     weights=[i[1] for i in self.events.items()])[0]
-
-            if selected_event not in ["introduction", "new_sentence"]:
-                raise NotImplementedError(
-                    f"No recipe for event type {selected_event}.")
-
-            if selected_event == "introduction":
-                if self.directed and len(self.positions[-1]) >= 2:
-                    # The user asked for a directed simulation and has supplied
-                    # enough Positions. Now instantiate turns of trying to 
-                    # introduce arguments.
-                    j = 0
-                    while j < len(self.positions[-1]) * self.introduction_attempts:
-                        pick_positions = sample(self.positions[-1], k=2)
-
-                        # Support for positions with multiple introduction 
-                        # strategies. First, try to pick a random element from 
-                        # the list of introduction  strategies of a position. If
-                        # that fails, assume that the strategy preference of a 
-                        # position is not given as a list, but as a single item.
-                        try:
-                            pick_strategy = choice(
-                                pick_positions[0].introduction_strategy)
-                        except KeyError:
-                            pick_strategy = pick_positions[0].introduction_strategy
-
-                        argument_introduced = introduce(self,
-                                                        source=pick_positions[0],
-                                                        target=pick_positions[1],
-                                                        strategy=pick_strategy)
-                        if not argument_introduced:
-                            # The argument introduction did not succeed in this 
-                            # turn. We are trying it again if there have been 
-                            # less tries than half the size of the population.
-                            j += 1
-                            continue
-                        else:
-                            # An argument was found, break out of the loop.
-                            # (implies argument_introduced == True)
-                            self.log.append(
-                                f"Argument introduction suceeded after {j+1} attempts.")
-                            break
-                    else:
-                        # An argument could not be found within the available 
-                        # introduction attempts. 
-                        # This is enough grounds to terminate the simulation run.
-                        self.log.append(
-                            "Argument introduction did not succeed, even after "
-                            + f"{j+1} attempts.")
-                        argument_introduced = False
-
-                    if argument_introduced:
-                        # Check if introduction was succesful before attempting 
-                        # response.
-                        response(simulation=self,
-                                 debate=self[-1], 
-                                 positions=self.positions[-1],
-                                 method=self.default_update_strategy,
-                                 sentences=self.sentencepool)
-                else:
-                    # The user did not ask for a directed simulation and/or 
-                    # provided less than 2 positions. In this case, we're 
-                    # investing less work.
-                    argument_introduced = introduce(
-                        self, strategy=self.default_introduction_strategy)
-                    if argument_introduced:
-                        response(simulation=self,
-                                 debate=self[-1],
-                                 positions=self.positions[-1], 
-                                 method=self.default_update_strategy,
-                                 sentences=self.sentencepool)
-
-                if not argument_introduced:
-                    # Break out of the Simulation if no argument could be 
-                    # inserted. In this case, the log will tell more about what 
-                    # went wrong.
-                    del self.assertions
-                    break
-
-            if selected_event == "new_sentence":
-                # Let's see which sentences could be inserted into the debate.
-                # This will be the difference between the sentencepool and the 
-                # max_sentencepool
-
-                sentence_candidates = set(self.max_sentencepool) \
-                                      - set(self.sentencepool)
-
-                if len(sentence_candidates) > 0:
-                    # Append a random candidate to the debate's sentencepool.
-                    selected_sentence = choice(list(sentence_candidates))
-                    self.sentencepool.append(selected_sentence)
-                    self.log.append(f"Sentence {selected_sentence} added to "
-                                    + "the sentence pool.")
-
-                    # Carry along the debate stage.
-                    self.append(self[-1])
-
-                    # Now have the positions take a random stance toward the 
-                    # newly inserted sentence.
-                    expanded_positions = []
-                    for p in self.positions[-1]:
-                        e = deepcopy(p)
-                        # There is a 2:1 chance that the position does not 
-                        # suspend judgement on the new sentence.
-                        if choice([True, True, False]):
-                            # If the positions does not suspend, there is a 1:1 
-                            # chance it will assign either truth value.
-                            e[selected_sentence] = choice([True, False])
-                        expanded_positions.append(e)
+            stages = len(self)
+            profiling.set_stage(stages)
+            budget.start_step()
+            try:
+                argument_introduced = self.step(budget)
+            except BudgetExceeded as e:
+                self._discard_step(stages)
+                self._end_early(e.reason)
+                break
 
-                    self.positions.append(expanded_positions)
+            if not argument_introduced:
+                # Break out of the Simulation if no argument could be 
+                # inserted. In this case, the log will tell more about what 
+                # went wrong.
+                self.stop_reason = "no_argument"
+                break
 
-                else:
-                    # Failure to insert a sentence does not end the simulation, 
-                    # but we take note of it in the log.
-                    self.log.append(
-                        "Tried to insert a new sentence to the debate but "
-                        + "maximum extension was reached.")
-
-            i += 1
-            if self[-1].density() >= stopping_density or i >= max_steps:
-                # Delete objects that can't be pickled.
-                del self.assertions
+            self.steps += 1
+            self._notify_observers()
+            if self.density() >= stopping_density:
+                self.stop_reason = "density"
+                break
+            if self._budget_exceeded(budget):
                 break
 
-        self.log.append(
-            "Simulation ended. "
-            + str(f"{i} steps were taken. ")
-            + str(f"Density at end: {self[-1].density()}. ")
-            + str(f"Extension of SCCP: {satisfiability_count(self[-1])}.")
-            )
+        self._finish_run(budget)
+
+        # The summary is returned even if the log does not record it.
+        summary = "Simulation ended. " \
+                  + str(f"{self.steps} steps were taken. ") \
+                  + str(f"Density at end: {self.density()}. ") \
+                  + str(f"Extension of SCCP: {self.model_count()}. ") \
+                  + str(f"Stop reason: {self.stop_reason}.")
+        self.log.info(summary)
 
         if quiet:
-            return self.log[-1]
+            return summary
         else:
             return self
 
+def _rebuild_simulation(cls, stages):
+    """
+    Recreate a Simulation with the debate stages ``stages`` from the argument
+    log. Used when unpickling and copying Simulations.
+    """
+    simulation = cls.__new__(cls)
+    list.extend(simulation, stages)
+    return simulation
+
 class FixedDebateSimulation(SimulationBase):
     """
     A simulation that begins with a pre-defined debate. Agents uncover arguments
@@ -452,8 +1084,9 @@ class FixedDebateSimulation(SimulationBase):
         
     :param default_update_strategy: Agents who need to update their position do
         so according to the strategy selected here. Options are 
-        :py:obj:`"closest_coherent"` for complete positions and 
-        :py:obj:`"closest_closed_partial_coherent"` for partial positions.
+        :py:obj:`"closest_coherent"` or :py:obj:`"closest_coherent_batch"` for 
+        complete positions and :py:obj:`"closest_closed_partial_coherent"` or 
+        :py:obj:`"closest_closed_partial_coherent_maxsat"` for partial positions.
 
     :param initial_arguments: Start the simulation with these arguments, even
         if they are not part of the generated argument map. It is advised to 
@@ -484,8 +1117,31 @@ class FixedDebateSimulation(SimulationBase):
     :param sentencepool: A sentencepool, given as an iterable understood by
         :py:func:`sympy.symbols`, to be forwarded to the tree-like argument map
         generation. 
+
+    :param dict update_executor: Settings for a 
+        :py:class:`concurrent.futures.ProcessPoolExecutor` that distributes the 
+        agents' updates in each step over several processes, for the 
+        :py:obj:`"closest_closed_partial_coherent"` update strategies. Updates
+        are serial if :py:obj:`None`.
+
+    :param int log_level: Minimum level of messages recorded in the 
+        :py:attr:`log`, see :py:class:`Simulation`.
+
+    :param int log_maxlen: If given, the log only keeps the most recent 
+        ``log_maxlen`` messages.
+
+    :param seed: Seed for the simulation's random number generator, see 
+        :py:meth:`Simulation.init_rng`.
+
+    :param debate: A previously generated argument map, e.g. from 
+        :py:meth:`generate_debate`. If given, no argument map is generated and
+        :py:attr:`debate_generation` and :py:attr:`num_key_statements` have no
+        effect.
     """
 
+    # The settings that determine the generated argument map.
+    debate_parameters = ("sentencepool", "num_key_statements", "debate_generation")
+
     def __init__(self,
                  argument_selection_strategy = "any",
                  debate_generation = {"max_density": 1.0},
@@ -496,17 +1152,31 @@ class FixedDebateSimulation(SimulationBase):
                  num_key_statements = 1,
                  partial_neighbour_search_radius = 100,
                  positions = None,
-                 sentencepool = "p:10"
+                 sentencepool = "p:10",
+                 update_executor = None,
+                 log_level = DEBUG,
+                 log_maxlen = None,
+                 seed = None,
+                 debate = None
                  ):
 
-        self.log = []
+        self.init_rng(seed)
+        self.log = SimulationLog(level=log_level, maxlen=log_maxlen)
         self.assertions = []
+        # Model counts and densities by the number of uncovered arguments.
+        self.model_counts = {}
+        self.densities = {}
         self.partial_neighbour_search_radius = partial_neighbour_search_radius
+        self.update_executor = update_executor
         self.sentencepool = [i for i in symbols(sentencepool)]
-        self.debate = generate_hierarchical_argument_map(
-                        N = len(self.sentencepool),
-                        k = int(num_key_statements),
-                        **debate_generation)
+        if debate is None:
+            self.debate = self.generate_debate(
+                            sentencepool = sentencepool,
+                            num_key_statements = num_key_statements,
+                            debate_generation = debate_generation,
+                            rng = self.rng)
+        else:
+            self.debate = debate
         
         if positions is None:
             self.init_positions([], target_length=0)
@@ -530,11 +1200,26 @@ class FixedDebateSimulation(SimulationBase):
                                       + " is unknown.")
 
         if self.updating_strategy not in ["closest_coherent", 
-                                          "closest_closed_partial_coherent"]:
+                                          "closest_coherent_batch",
+                                          "closest_closed_partial_coherent",
+                                          "closest_closed_partial_coherent_maxsat"]:
             raise NotImplementedError("The selected default updating strategy "
                                       + str(self.updating_strategy)
                                       + " is unkown.")
 
+    @staticmethod
+    def generate_debate(*, sentencepool, num_key_statements, debate_generation, 
+                        rng=None):
+        """
+        Generate the argument map of a FixedDebateSimulation with the given 
+        settings.
+        """
+        return generate_hierarchical_argument_map(
+                    N = len(symbols(sentencepool)),
+                    k = int(num_key_statements),
+                    rng = rng,
+                    **debate_generation)
+
     def __repr__(self):
         """
         Control the display of individual Simulation objects
@@ -542,9 +1227,24 @@ class FixedDebateSimulation(SimulationBase):
         return str(f"Simulation with {len(self.debate)} arguments, of which "
                    + f"{len(self.uncovered_arguments)} are uncovered.")
 
-    def step(self):
+    def current_debate(self):
+        """
+        Return the debate of the arguments uncovered so far.
+        """
+        if len(self.uncovered_arguments) == 0:
+            return EmptyDebate()
+        return Debate(*self.uncovered_arguments)
+
+    def _current_stage(self):
+        return (len(self.uncovered_arguments), self.current_debate)
+
+    def _asserted_arguments(self):
+        return self.uncovered_arguments
+
+    def step(self, budget=None):
         """
-        Advance Simulation by one step.
+        Advance Simulation by one step. The step raises 
+        :py:class:`BudgetExceeded` if a limit of ``budget`` is exceeded.
         """
         # uncovering
 
@@ -554,7 +1254,28 @@ class FixedDebateSimulation(SimulationBase):
             seen_positions = []
             argument_available = False
 
+            # The literals that an agent has to accept to take the premises
+            # and the conclusion of an argument.
+            requirements = {}
+            for arg in self.debate.args:
+                if arg in self.uncovered_arguments:
+                    continue
+                try:
+                    reqs = arg.get_requirements()
+                except:
+                    raise Exception(
+                        "Could not retrieve requirements from argument: "
+                        + f"{arg}. Arguments uncovered so far: "
+                        + f"{len(self.uncovered_arguments)}"
+                        )
+                literals = {k: k if reqs[k] else Not(k) for k in reqs}
+                requirements[arg] = (
+                    frozenset(literals[k] for k in arg.args[0].atoms()),
+                    frozenset(literals[k] for k in arg.args[1].atoms()))
+
             while True:
+                if budget is not None:
+                    budget.check()
                 c = dict()
                 available_positions = [(i, p) for (i, p) in enum_pos \
                                        if i not in seen_positions]
@@ -562,7 +1283,7 @@ class FixedDebateSimulation(SimulationBase):
                     new_argument = False
                     break
 
-                source_id, source = choice(available_positions)
+                source_id, source = self.rng.choice(available_positions)
                 seen_positions.append(source_id)
 
                 # Support for positions with multiple introduction strategies.
@@ -571,49 +1292,44 @@ class FixedDebateSimulation(SimulationBase):
                 # that the strategy preference of a position is not given as a 
                 # list, but as a single item.
                 try:
-                    strategy = choice(source.introduction_strategy)
+                    strategy = self.rng.choice(source.introduction_strategy)
                 except KeyError:
                     strategy = source.introduction_strategy
 
                 for arg in [a for a in self.debate.args \
                                  if a not in self.uncovered_arguments]:
 
-                    try:
-                        reqs = arg.get_requirements()
-                        premise_reqs = {k: reqs[k] for k in reqs if k in arg.args[0].atoms()}
-                        conclusion_reqs = {k: reqs[k] for k in reqs if k in arg.args[1].atoms()}
-                    except:
-                        raise Exception(
-                            "Could not retrieve requirements from argument: "
-                            + f"{arg}. Arguments uncovered so far: "
-                            + f"{len(self.uncovered_arguments)}"
-                            )
+                    (premise_literals, conclusion_literals) = requirements[arg]
                     
                     if strategy["pick_premises_from"] == "target":                    
                         premise_ids = [i for (i, p) in enum_pos \
-                                       if premise_reqs.items() <= p.items()]                
+                                       if premise_literals <= p.accepted]
                     
                     if strategy["pick_premises_from"] == "source":
-                        premise_ids = [i for (i, p) in enum_pos \
-                                       if premise_reqs.items() <= source.items()]
+                        premise_ids = [i for (i, p) in enum_pos] \
+                                      if premise_literals <= source.accepted \
+                                      else []
 
                     if strategy["pick_premises_from"] == None:
                         premise_ids = [i for (i, p) in enum_pos]
 
                     if strategy["source_accepts_conclusion"] == "Yes":
-                        conclusion_source_ids = [i for (i, p) in enum_pos \
-                                                 if conclusion_reqs.items() <= source.items()]
+                        conclusion_source_ids = [i for (i, p) in enum_pos] \
+                                                if conclusion_literals <= source.accepted \
+                                                else []
 
                     if strategy["source_accepts_conclusion"] == "Toleration":
-                        suspend_conclusion = {k: None for k in conclusion_reqs}
-                        conclusion_source_ids = [i for (i, p) in enum_pos if conclusion_reqs.items() <= source.items()] \
-                                                + [i for (i, p) in enum_pos if conclusion_reqs.items() <= suspend_conclusion.items()]
+                        # The requirements of an argument never suspend 
+                        # judgement, so the source has to accept the conclusion.
+                        conclusion_source_ids = [i for (i, p) in enum_pos] \
+                                                if conclusion_literals <= source.accepted \
+                                                else []
 
                     if strategy["source_accepts_conclusion"] == "NA":
                         conclusion_source_ids = [i for (i, p) in enum_pos if i != source_id]
 
                     if strategy["target_accepts_conclusion"] == "No":
-                        conclusion_target_ids = [i for (i, p) in enum_pos if not conclusion_reqs.items() <= p.items() and i != source_id]
+                        conclusion_target_ids = [i for (i, p) in enum_pos if not conclusion_literals <= p.accepted and i != source_id]
 
                     if strategy["target_accepts_conclusion"] == "NA":
                         conclusion_target_ids = [i for (i, p) in enum_pos if i != source_id]
@@ -630,39 +1346,44 @@ class FixedDebateSimulation(SimulationBase):
                 if argument_available:
                     if self.argument_selection_strategy == "any":
                         # list of all arguments with at least one match
-                        new_argument = choice([k for k in c if c[k] > 0])
+                        new_argument = self.rng.choice([k for k in c if c[k] > 0])
 
                     if self.argument_selection_strategy == "max":
                         # list of all arguments that maximise the matches
-                        new_argument = choice([k for k in c if c[k] == c[max(c, key=c.get)]])
+                        new_argument = self.rng.choice([k for k in c if c[k] == c[max(c, key=c.get)]])
 
-                    self.log.append(
-                        str(f"Agent with id {source_id} introduced {new_argument}, ")
-                        + str(f"which targets {c[new_argument]} other agents.")
+                    self.log.info(
+                        "Agent with id %s introduced %s, which targets %d other agents.",
+                        source_id, new_argument, c[new_argument]
                     )
                     
                     break
 
                 else:
-                    self.log.append(
-                        f"No {strategy['name']} argument available for position {source}."
+                    self.log.debug(
+                        "No %s argument available for the agent with id %s.",
+                        strategy['name'], source_id
                     )
 
         else:
-            new_argument = choice([i for i in self.debate.args if i not in self.uncovered_arguments])
+            new_argument = self.rng.choice([i for i in self.debate.args if i not in self.uncovered_arguments])
 
         if new_argument:
-            self.uncovered_arguments.append(new_argument)
+            # The assertions come first, as they are rebuilt from the 
+            # uncovered arguments if they were discarded.
             self.assertions.append(
                 z3_assertion_from_argument(premises=new_argument.args[0].args, 
                                            conclusion=new_argument.args[1]))
+            self.uncovered_arguments.append(new_argument)
 
             # updating
             response(simulation = self,
                      debate = Debate(*self.uncovered_arguments),
                      positions = self.positions[-1],
                      method = self.updating_strategy,
-                     sentences = self.sentencepool)
+                     sentences = self.sentencepool,
+                     executor = self.update_executor,
+                     budget = budget)
 
             return True
 
@@ -670,27 +1391,64 @@ class FixedDebateSimulation(SimulationBase):
             return False
 
 
-    def run(self, max_density=0.8, max_steps=200, min_sccp=1, quiet=True):
+    def run(self, max_density=0.8, max_steps=200, min_sccp=1, quiet=True,
+            profile=False, observers=(), keep_every=1, budget=None):
         """
-        Run Simulation steps until targets are reached
+        Run Simulation steps until targets are reached. With ``profile=True``,
+        a tuple of the result and a profile of the run is returned. 
+        ``observers``, ``keep_every`` and ``budget`` work as in 
+        :py:meth:`Simulation.run`. ``max_steps`` limits the number of 
+        uncovered arguments, which includes those of earlier runs.
         """
+        if profile:
+            with profiling.profile() as p:
+                result = self.run(max_density=max_density, max_steps=max_steps,
+                                  min_sccp=min_sccp, quiet=quiet,
+                                  observers=observers, keep_every=keep_every,
+                                  budget=budget)
+            return (result, p.to_frame())
+
+        self._start_observers(observers, keep_every)
+        budget = self._start_budget(budget)
+
         density_from_min_sccp = density_from_numsat(
             s=min_sccp, n=len(self.sentencepool), b=2
             )
         stopping_density = min(max_density, density_from_min_sccp)
 
         while True:
-            if len(self.uncovered_arguments) > max_steps \
-               or (len(self.uncovered_arguments) > 1 
-                   and Debate(*self.uncovered_arguments).density() > stopping_density):
-               break
+            if len(self.uncovered_arguments) > max_steps:
+                self.stop_reason = "max_steps"
+                break
+            if len(self.uncovered_arguments) > 1 \
+               and self.density() > stopping_density:
+                self.stop_reason = "density"
+                break
 
-            introduced = self.step()
+            uncovered = (len(self.uncovered_arguments), len(self.assertions))
+            profiling.set_stage(len(self.positions))
+            budget.start_step()
+            try:
+                introduced = self.step(budget)
+            except BudgetExceeded as e:
+                # The positions are only updated at the end of the step.
+                del self.uncovered_arguments[uncovered[0]:]
+                del self.assertions[uncovered[1]:]
+                self._end_early(e.reason)
+                break
             if not introduced:
+                self.stop_reason = "no_argument"
+                break
+            self.steps += 1
+            self._notify_observers()
+            if self._budget_exceeded(budget):
                 break
+
+        self._finish_run(budget)
         
         if quiet:
-            return f"Simulation ended. {len(self.uncovered_arguments)} steps taken."
+            return f"Simulation ended. {len(self.uncovered_arguments)} steps " \
+                   + f"taken. Stop reason: {self.stop_reason}."
         else:
             # Generate a return object that only contains pickable data.
             return {
@@ -698,7 +1456,12 @@ class FixedDebateSimulation(SimulationBase):
                 "uncovered_arguments": self.uncovered_arguments,
                 "debate": self.debate,
                 "sentencepool": self.sentencepool,
-                "log": self.log
+                "model_counts": self.model_counts,
+                "densities": self.densities,
+                "log": self.log,
+                "observers": self.observers,
+                "stop_reason": self.stop_reason,
+                "steps": self.steps
             }
 
 class SocialInfluenceSimulation(SimulationBase):
@@ -716,6 +1479,10 @@ class SocialInfluenceSimulation(SimulationBase):
                     polarization. Philosophical Studies 176: 2243–2267. 
                     DOI: 10.1007/s11098-018-1124-5.
     """
+
+    # The settings that determine the generated argument map.
+    debate_parameters = ("sentencepool", "number_key_statements", "debate_generation")
+
     def __init__(self,
                  debate_generation = {"max_density": 0.8},
                  number_key_statements = 3,
@@ -724,20 +1491,34 @@ class SocialInfluenceSimulation(SimulationBase):
                  initial_position_size = 5,
                  updating_strategy = "closest_coherent",
                  partial_neighbour_search_radius = 50,
-                 influence_parameter = 0
+                 influence_parameter = 0,
+                 update_executor = None,
+                 log_level = DEBUG,
+                 log_maxlen = None,
+                 seed = None,
+                 debate = None
                  ):
 
+        self.init_rng(seed)
+        # The model count and density of the debate, which does not change.
+        self.model_counts = {}
+        self.densities = {}
         self.sentencepool = [i for i in symbols(sentencepool)]
         self.key_statements = list(sentencepool)[:number_key_statements]
-        self.debate = generate_hierarchical_argument_map(
-                        N = len(list(self.sentencepool)),
-                        k = len(self.key_statements),
-                        **debate_generation)
+        if debate is None:
+            self.debate = self.generate_debate(
+                            sentencepool = sentencepool,
+                            number_key_statements = number_key_statements,
+                            debate_generation = debate_generation,
+                            rng = self.rng)
+        else:
+            self.debate = debate
         
-        self.log = []
+        self.log = SimulationLog(level=log_level, maxlen=log_maxlen)
         self.assertions = []
         self.influence_parameter = influence_parameter
         self.partial_neighbour_search_radius = partial_neighbour_search_radius
+        self.update_executor = update_executor
 
         if positions is None:
             self.init_positions([], target_length=0)
@@ -759,19 +1540,33 @@ class SocialInfluenceSimulation(SimulationBase):
         # computation time, but currently is only available for complete 
         # positions that do not suspend.
 
-        if self.updating_strategy == "closest_coherent":
+        if self.updating_strategy in ["closest_coherent", "closest_coherent_batch"]:
             self.all_models = list(satisfiability(self.debate, all_models=True))
         else:
             self.all_models = None
-            self.log.append("I was unable to compute all models given the"
-                            + f"updating strategy {self.updating_strategy}.")
+            self.log.warning("I was unable to compute all models given the "
+                             + "updating strategy %s.", self.updating_strategy)
 
         response(simulation = self,
                 debate = self.debate,
                 models = self.all_models,
                 positions = self.positions[-1],
                 method = self.updating_strategy,
-                sentences = self.sentencepool)
+                sentences = self.sentencepool,
+                executor = self.update_executor)
+
+    @staticmethod
+    def generate_debate(*, sentencepool, number_key_statements, 
+                        debate_generation, rng=None):
+        """
+        Generate the argument map of a SocialInfluenceSimulation with the given
+        settings.
+        """
+        return generate_hierarchical_argument_map(
+                    N = len(symbols(sentencepool)),
+                    k = len(list(sentencepool)[:number_key_statements]),
+                    rng = rng,
+                    **debate_generation)
 
     def __repr__(self):
         """
@@ -780,18 +1575,37 @@ class SocialInfluenceSimulation(SimulationBase):
         return str(f"Simulation with {len(self.debate)} arguments "
                    + f"and {len(self.positions[-1])} agents.")
 
-    def step(self):
-        pick_position = choice(list(enumerate(self.positions[-1])))
+    def current_debate(self):
+        """
+        Return the debate, which does not change in the course of the 
+        simulation.
+        """
+        return self.debate
+
+    def _asserted_arguments(self):
+        # The arguments of the debate are not asserted for the updates.
+        return []
+
+    def _current_stage(self):
+        return (0, self.current_debate)
+
+    def step(self, budget=None):
+        """
+        Advance Simulation by one step. The step raises 
+        :py:class:`BudgetExceeded` if a limit of ``budget`` is exceeded, before
+        the updated positions are added.
+        """
+        pick_position = self.rng.choice(list(enumerate(self.positions[-1])))
         source = pick_position[1]
         source_id = pick_position[0]
-        influence_item = choice(self.sentencepool)
+        influence_item = self.rng.choice(self.sentencepool)
 
         candidates = []
 
         for i, p in enumerate(self.positions[-1]):
             d = normalised_edit_distance(source, p)
             w = [1 - d*self.influence_parameter, d*self.influence_parameter]
-            update = choices([True, False], weights=w)[0]
+            update = self.rng.choices([True, False], weights=w)[0]
             if update:
                 new_position = Position(
                     self.debate, 
@@ -800,13 +1614,13 @@ class SocialInfluenceSimulation(SimulationBase):
                 if influence_item in source:
                     new_position[influence_item] = source[influence_item]
 
-                self.log.append(
-                    f"Position {i} was influenced by Position {source_id}."
+                self.log.debug(
+                    "Position %d was influenced by Position %d.", i, source_id
                 )
             else:
                 new_position = p
-                self.log.append(
-                    f"Position {i} was not influenced by Position {source_id}."
+                self.log.debug(
+                    "Position %d was not influenced by Position %d.", i, source_id
                 )
 
             candidates.append(new_position)
@@ -816,13 +1630,30 @@ class SocialInfluenceSimulation(SimulationBase):
                  positions = candidates,
                  models = self.all_models,
                  method = self.updating_strategy,
-                 sentences = self.sentencepool)
+                 sentences = self.sentencepool,
+                 executor = self.update_executor,
+                 budget = budget)
+
+    def run(self, max_steps=float("inf"), max_agreement=0.9, quiet=True,
+            profile=False, observers=(), keep_every=1, budget=None):
+        """
+        Run Simulation steps until the mean agreement in the population exceeds
+        ``max_agreement`` or ``max_steps`` have been taken, counting the 
+        :py:attr:`steps` of earlier runs. With ``profile=True``, a tuple of the
+        result and a profile of the run is returned. ``observers``, 
+        ``keep_every`` and ``budget`` work as in :py:meth:`Simulation.run`.
+        """
+        if profile:
+            with profiling.profile() as p:
+                result = self.run(max_steps=max_steps,
+                                  max_agreement=max_agreement, quiet=quiet,
+                                  observers=observers, keep_every=keep_every,
+                                  budget=budget)
+            return (result, p.to_frame())
 
-    def run(self, max_steps=float("inf"), max_agreement=0.9, quiet=True):
+        self._start_observers(observers, keep_every)
+        budget = self._start_budget(budget)
 
-        # The step counter
-        i = 0
-                
         while True:
 
             # Determine the current population-wide mean agreement by taking
@@ -834,25 +1665,46 @@ class SocialInfluenceSimulation(SimulationBase):
                 normalised_edit_agreement)[np.triu_indices(
                     len(self.positions[-1]), k=1)].mean()
 
-            if i <= max_steps and current_mean_agreement <= max_agreement:
-                self.step()
-                i += 1
-            else:
+            if self.steps > max_steps:
+                self.stop_reason = "max_steps"
+                break
+            if current_mean_agreement > max_agreement:
+                self.stop_reason = "max_agreement"
+                break
+
+            profiling.set_stage(len(self.positions))
+            budget.start_step()
+            try:
+                self.step(budget)
+            except BudgetExceeded as e:
+                # Nothing is added to the simulation before the step ends.
+                self._end_early(e.reason)
                 break
+            self.steps += 1
+            self._notify_observers()
+            if self._budget_exceeded(budget):
+                break
+
+        self._finish_run(budget)
         
         if quiet:
-            return (f"Simulation ended. {i} steps taken. "
-                    + f"Reached mean agreement of {current_mean_agreement}.")
+            return (f"Simulation ended. {self.steps} steps taken. "
+                    + f"Reached mean agreement of {current_mean_agreement}. "
+                    + f"Stop reason: {self.stop_reason}.")
         else:
             return {
                 "positions": self.positions,
                 "debate": self.debate,
                 "sentencepool": self.sentencepool,
-                "log": self.log
+                "log": self.log,
+                "observers": self.observers,
+                "stop_reason": self.stop_reason,
+                "steps": self.steps
             }
 
 
-def experiment(n, *, sim_type=Simulation, executor={}, simulations={}, runs={}):
+def experiment(n, *, sim_type=Simulation, executor={}, simulations={}, runs={},
+               separate_initialisation=False, seed=None, cache=None):
     """
     Generate and execute :py:attr:`n` number of Simulations and output their 
     results. The Simulations can be controlled via a dictionary passed to 
@@ -860,28 +1712,51 @@ def experiment(n, *, sim_type=Simulation, executor={}, simulations={}, runs={}):
     with a dictionary passed to :py:attr:`runs`.
 
     Settings to the :py:obj:`ProcessPoolExecutor` should be forwarded in a 
-    dictionary to :py:attr:`executor`.
-
-    This function calls two Executors. The first is responsible for setting up
-    the Simulations in parallel. The second performs the simulation runs. This
-    is particularly helpful for Simulation types that involve substantial 
-    computation for set-up, such as FixedDebateSimulation.
+    dictionary to :py:attr:`executor`. Alternatively, an existing 
+    :py:class:`concurrent.futures.Executor` can be passed, e.g. a 
+    :py:class:`SocketExecutor` to distribute the simulations over several 
+    machines.
+
+    By default, each worker process sets up a Simulation, runs it and only 
+    sends back the result of the run. Set :py:attr:`separate_initialisation` to
+    :py:obj:`True` to instead set up all Simulations in a first Executor and 
+    perform the runs in a second one. This transfers every Simulation between 
+    processes three times and is only kept for backwards compatibility.
+
+    Every Simulation receives its own seed, spawned from the experiment's 
+    :py:attr:`seed` with :py:class:`numpy.random.SeedSequence`. Experiments with
+    the same settings and seed thus have the same results. If a directory is 
+    given as :py:attr:`cache`, results are stored in a :py:class:`ResultCache`
+    there, and runs whose configuration is found in the cache are not performed
+    again. This is only useful if a :py:attr:`seed` is given.
     """
     # TODO 1: Use logging instead of printing
     # TODO 2: Catch exceptions inside simulation processes
     print(f"Starting experiment at {time.ctime()}.")
 
-    with ProcessPoolExecutor(**executor) as init_sim_executor:
-        init_sims = [init_sim_executor.submit(sim_type, 
-                                              **simulations) for _ in range(n)]
-    
-    simulations = [i.result() for i in init_sims]
-    print(f"Simulations initialised at {time.ctime()}.")
+    seeds = np.random.SeedSequence(seed).spawn(n)
 
-    with ProcessPoolExecutor(**executor) as executor:
-        results = [executor.submit(i.run, 
-                                   quiet=False, 
-                                   **runs) for i in simulations]
+    if separate_initialisation:
+        with executor_from_settings(executor) as init_sim_executor:
+            init_sims = [init_sim_executor.submit(sim_type, 
+                                                  **simulations,
+                                                  seed=s) for s in seeds]
+        
+        simulations = [i.result() for i in init_sims]
+        print(f"Simulations initialised at {time.ctime()}.")
+
+    with executor_from_settings(executor) as pool:
+        if separate_initialisation:
+            results = [pool.submit(i.run, 
+                                       quiet=False, 
+                                       **runs) for i in simulations]
+        else:
+            results = [pool.submit(_initialise_and_run,
+                                       sim_type,
+                                       simulations,
+                                       runs,
+                                       s,
+                                       cache) for s in seeds]
 
         for count, future in enumerate(as_completed(results), start=1):
             print(f"Simulation {count}/{n} completed at {time.ctime()}.")
@@ -893,3 +1768,113 @@ def experiment(n, *, sim_type=Simulation, executor={}, simulations={}, runs={}):
         except:
             print(f"Failed to save simulation {idx}")
     return r
+
+def _initialise_and_run(sim_type, simulations, runs, seed, cache=None):
+    """
+    Set up a Simulation of ``sim_type`` and run it. Used by :py:func:`experiment`
+    so that the Simulation object only needs to leave the worker process as 
+    part of the result. If ``cache`` is given, the result is looked up in and 
+    stored to the :py:class:`ResultCache` at this path.
+    """
+    if cache is not None:
+        cache = ResultCache(cache)
+        key = cache.key(sim_type, simulations, runs, seed)
+        try:
+            return cache.get(key)
+        except KeyError:
+            pass
+
+    result = sim_type(**simulations, seed=seed).run(quiet=False, **runs)
+
+    if cache is not None:
+        cache.put(key, result)
+    return result
+
+def streaming_experiment(n, path, *, sim_type=Simulation, executor={}, 
+                         simulations={}, runs={}, retry_failed=True, 
+                         seed=None, cache=None):
+    """
+    Like :py:func:`experiment`, but each result is written to an 
+    :py:class:`ExperimentStore` at :py:attr:`path` as soon as its run has 
+    finished, instead of being kept in memory until all runs have finished. 
+    Runs that raise an exception are recorded in the store together with their
+    traceback.
+
+    If the store at :py:attr:`path` already contains results, e.g. because an 
+    earlier call was interrupted, runs whose IDs are already completed are 
+    skipped. Failed runs are attempted again unless :py:attr:`retry_failed` is 
+    :py:obj:`False`. The seed of the experiment is kept in the store, so that
+    resumed runs receive the same seeds as in the original call even if no 
+    :py:attr:`seed` is given. A :py:exc:`ValueError` is raised if the store 
+    holds an experiment with different settings.
+
+    Returns the :py:class:`ExperimentStore`. Use its :py:meth:`results` method 
+    to obtain the results in the same form as from :py:func:`experiment`.
+
+    Results are written by the worker processes. If the :py:attr:`executor` 
+    distributes runs over several machines, :py:attr:`path` must be on storage 
+    that all of them share.
+    """
+    store = ExperimentStore(path)
+    settings = {"n": n, "sim_type": sim_type, "simulations": simulations, 
+                "runs": runs}
+    stored = store.settings()
+    if stored is None:
+        settings["seed"] = np.random.SeedSequence(seed).entropy
+        store.save_settings(settings)
+    else:
+        if seed is not None:
+            settings["seed"] = np.random.SeedSequence(seed).entropy
+        store.check_settings(settings)
+        settings = stored
+
+    # The seed of run i is the i-th child of the experiment's seed sequence.
+    seeds = np.random.SeedSequence(settings["seed"]).spawn(n)
+
+    skip = set(store.completed())
+    if not retry_failed:
+        skip |= set(store.failed())
+    pending = [i for i in range(n) if i not in skip]
+
+    print(f"Starting experiment at {time.ctime()}. {len(pending)} of {n} "
+          + "runs remaining.")
+
+    with executor_from_settings(executor) as pool:
+        futures = {pool.submit(_initialise_run_and_store,
+                                   store.path,
+                                   run_id,
+                                   sim_type,
+                                   simulations,
+                                   runs,
+                                   seeds[run_id],
+                                   cache): run_id for run_id in pending}
+
+        for count, future in enumerate(as_completed(futures), start=1):
+            run_id = futures.pop(future)
+            try:
+                succeeded = future.result()
+            except Exception:
+                # The worker itself broke down, e.g. it ran out of memory.
+                store.save_failure(run_id, traceback.format_exc())
+                succeeded = False
+            status = "completed" if succeeded else "failed"
+            print(f"Simulation {count}/{len(pending)} (run {run_id}) {status} "
+                  + f"at {time.ctime()}.")
+
+    return store
+
+def _initialise_run_and_store(path, run_id, sim_type, simulations, runs, seed,
+                              cache=None):
+    """
+    Set up and run a Simulation and write its result, or the traceback of its
+    failure, to the :py:class:`ExperimentStore` at ``path``. Returns whether
+    the run succeeded.
+    """
+    store = ExperimentStore(path)
+    try:
+        result = _initialise_and_run(sim_type, simulations, runs, seed, cache)
+    except Exception:
+        store.save_failure(run_id, traceback.format_exc())
+        return False
+    store.save(run_id, result)
+    return True
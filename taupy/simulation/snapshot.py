@@ -0,0 +1,220 @@
+"""
+Snapshots of simulations, to pause long simulations and resume them later,
+possibly in another process or on another machine. A snapshot contains the
+settings of a simulation and the state it needs to continue: the arguments,
+the latest population, the state of the random number generator, the used
+premises and the sentence pool. Sentences are stored by name and literals as
+signed indices into the list of names, which keeps snapshots small.
+
+Derived state, such as the z3 assertions of the debate, the index of used
+premises, the levels of sentences and materialised debate stages, is not
+stored. It is rebuilt when it is first needed after the
+simulation is restored.
+"""
+
+import pickle
+import zlib
+from pathlib import Path
+from random import Random
+
+from sympy import And, Not, Symbol
+
+from taupy.basic.core import Argument, Debate, EmptyDebate
+from taupy.basic.positions import Position
+from .history import PositionHistory
+from .log import SimulationLog
+from .store import _write_atomically
+
+# Increased whenever the layout of snapshots changes.
+FORMAT = 1
+
+# Attributes that are rebuilt when needed, with a function that returns their
+# value in a restored simulation.
+_DERIVED = {"_stage_cache": dict,
+            "_assertions": lambda: None,
+            "_premise_index": lambda: None,
+            "_proposition_levels": lambda: None,
+            "_update_pool": lambda: None,
+            "observers": list}
+
+# Attributes that are stored in an encoded form, by the kind of their value.
+_ENCODED = {"arguments": "arguments",
+            "uncovered_arguments": "arguments",
+            "used_premises": "premises",
+            "sentencepool": "sentences",
+            "max_sentencepool": "sentences",
+            "key_statements": "sentences",
+            "ground_truth": "assignment",
+            "debate": "debate"}
+
+
+class _Sentences:
+    """
+    Translates sentences and literals to integers and back. Sentences are
+    numbered in the order in which they are first encoded.
+    """
+
+    def __init__(self, names=()):
+        self.names = list(names)
+        self._index = {n: i for (i, n) in enumerate(self.names)}
+        self._symbols = [Symbol(n) for n in self.names]
+
+    def sentence(self, symbol):
+        name = str(symbol)
+        if name not in self._index:
+            self._index[name] = len(self.names)
+            self.names.append(name)
+        return self._index[name]
+
+    def literal(self, literal):
+        if literal.is_Not:
+            return -(self.sentence(literal.args[0]) + 1)
+        return self.sentence(literal) + 1
+
+    def decode_literal(self, code):
+        if code < 0:
+            return Not(self._symbols[-code - 1])
+        return self._symbols[code - 1]
+
+    def encode(self, kind, value):
+        if kind == "sentences":
+            if not all(isinstance(s, Symbol) for s in value):
+                return ("raw", value)
+            return [self.sentence(s) for s in value]
+        if kind == "assignment":
+            return {self.sentence(k): v for (k, v) in value.items()}
+        if kind == "arguments":
+            return [self.argument(a) for a in value]
+        if kind == "premises":
+            # Premises are normally stored as tuples of literals.
+            return [tuple(self.literal(l) for l in p) if isinstance(p, tuple)
+                    else ("raw", p) for p in value]
+        if kind == "debate":
+            if isinstance(value, EmptyDebate):
+                return []
+            if isinstance(value, Argument):
+                return [self.argument(value)]
+            return [self.argument(a) for a in value.args]
+
+    def decode(self, kind, value):
+        if isinstance(value, tuple) and value[:1] == ("raw",):
+            return value[1]
+        if kind == "sentences":
+            return [self._symbols[i] for i in value]
+        if kind == "assignment":
+            return {self._symbols[i]: v for (i, v) in value.items()}
+        if kind == "arguments":
+            return [self.decode_argument(a) for a in value]
+        if kind == "premises":
+            return [p[1] if p[:1] == ("raw",)
+                    else tuple(self.decode_literal(l) for l in p) for p in value]
+        if kind == "debate":
+            if len(value) == 0:
+                return EmptyDebate()
+            return Debate(*[self.decode_argument(a) for a in value])
+
+    def argument(self, argument):
+        premises = argument.args[0].args if isinstance(argument.args[0], And) \
+                   else (argument.args[0],)
+        return (tuple(self.literal(p) for p in premises),
+                self.literal(argument.args[1]))
+
+    def decode_argument(self, code):
+        (premises, conclusion) = code
+        return Argument(And(*[self.decode_literal(p) for p in premises]),
+                        self.decode_literal(conclusion))
+
+    def position(self, position):
+        return ({self.sentence(k): v for (k, v) in position.items()},
+                position.introduction_strategy,
+                position.update_strategy)
+
+    def decode_position(self, code, debate):
+        (judgements, introduction_strategy, update_strategy) = code
+        return Position(debate,
+                        {self._symbols[i]: v for (i, v) in judgements.items()},
+                        introduction_strategy=introduction_strategy,
+                        update_strategy=update_strategy)
+
+
+def take_snapshot(simulation, path=None, *, include_log=False):
+    """
+    Return a snapshot of ``simulation`` as bytes and, if a ``path`` is given,
+    write it to that file. The log of the simulation is only included if
+    ``include_log`` is set. Otherwise, the restored simulation starts with an
+    empty log with the same settings.
+    """
+    sentences = _Sentences()
+    attributes = {}
+    encoded = {}
+    for (name, value) in simulation.__dict__.items():
+        if name in _DERIVED or name in ["positions", "rng", "log"]:
+            continue
+        if name in _ENCODED and value is not None:
+            encoded[name] = sentences.encode(_ENCODED[name], value)
+        else:
+            attributes[name] = value
+
+    state = {"format": FORMAT,
+             "type": (type(simulation).__module__, type(simulation).__qualname__),
+             "attributes": attributes,
+             "encoded": encoded,
+             "derived": [n for n in _DERIVED if n in simulation.__dict__],
+             "stages": list(list.__iter__(simulation))
+                       if isinstance(simulation, list) else None,
+             "positions": (len(simulation.positions),
+                           [sentences.position(p)
+                            for p in simulation.positions[-1]]),
+             "rng": simulation.rng.getstate(),
+             "log": simulation.log if include_log
+                    else (simulation.log.level, simulation.log.records.maxlen),
+             # Encoding adds sentences, so the names are collected last.
+             "sentences": sentences.names}
+
+    data = zlib.compress(pickle.dumps(state, protocol=pickle.HIGHEST_PROTOCOL))
+    if path is not None:
+        _write_atomically(Path(path), data)
+    return data
+
+def restore_snapshot(cls, snapshot):
+    """
+    Recreate a simulation of type ``cls`` from a ``snapshot``, given as bytes
+    or as the path of a file.
+    """
+    if not isinstance(snapshot, (bytes, bytearray)):
+        snapshot = Path(snapshot).read_bytes()
+    state = pickle.loads(zlib.decompress(snapshot))
+
+    if state["format"] != FORMAT:
+        raise ValueError(f"Snapshots of format {state['format']} can't be "
+                         + f"restored, only those of format {FORMAT}.")
+    if state["type"] != (cls.__module__, cls.__qualname__):
+        raise TypeError(f"The snapshot is of a {state['type'][1]}, not of a "
+                        + f"{cls.__qualname__}.")
+
+    sentences = _Sentences(state["sentences"])
+    simulation = cls.__new__(cls)
+    if state["stages"] is not None:
+        list.extend(simulation, state["stages"])
+
+    simulation.__dict__.update(state["attributes"])
+    for (name, value) in state["encoded"].items():
+        setattr(simulation, name, sentences.decode(_ENCODED[name], value))
+    for name in state["derived"]:
+        setattr(simulation, name, _DERIVED[name]())
+
+    simulation.rng = Random()
+    simulation.rng.setstate(state["rng"])
+
+    if isinstance(state["log"], SimulationLog):
+        simulation.log = state["log"]
+    else:
+        (level, maxlen) = state["log"]
+        simulation.log = SimulationLog(level=level, maxlen=maxlen)
+
+    (stages, population) = state["positions"]
+    debate = simulation.current_debate()
+    simulation.positions = PositionHistory.resumed(
+        [sentences.decode_position(p, debate) for p in population], stages)
+
+    return simulation
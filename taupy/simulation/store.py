@@ -0,0 +1,238 @@
+"""
+On-disk storage for the results of experiments.
+"""
+
+from functools import lru_cache
+import hashlib
+import os
+import pickle
+import tempfile
+from pathlib import Path
+
+import taupy
+
+
+def _write_atomically(target, data):
+    """
+    Write ``data`` (bytes) to the path ``target`` through a temporary file in 
+    the same directory.
+    """
+    (fd, tmp) = tempfile.mkstemp(dir=target.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, target)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+@lru_cache(maxsize=None)
+def source_hash():
+    """
+    Return a hash of the source code of taupy, which changes whenever the code
+    that produces a result may have changed.
+    """
+    root = Path(taupy.__file__).parent
+    digest = hashlib.sha256()
+    for f in sorted(root.rglob("*.py")):
+        digest.update(f.relative_to(root).as_posix().encode())
+        digest.update(f.read_bytes())
+    return digest.hexdigest()
+
+def _canonical(value):
+    """
+    Return a string that describes ``value`` independently of the order of
+    dictionaries and sets and of the memory layout of objects, so that equal 
+    configurations give equal strings in every process.
+    """
+    if value is None or isinstance(value, (bool, int, float, complex, str, bytes)):
+        return repr(value)
+    if hasattr(value, "__qualname__"):
+        # Functions and classes are identified by their name.
+        return f"{value.__module__}.{value.__qualname__}"
+
+    name = f"{type(value).__module__}.{type(value).__qualname__}"
+    # Public attributes, e.g. the strategies of a Position. Private ones hold
+    # caches and the state of running objects.
+    attributes = {k: v for (k, v) in getattr(value, "__dict__", {}).items()
+                  if not k.startswith("_")}
+    if isinstance(value, dict):
+        items = sorted(f"{_canonical(k)}: {_canonical(v)}" 
+                       for (k, v) in value.items())
+        return f"{name}{{{', '.join(items)}}}" \
+               + (_canonical(attributes) if attributes else "")
+    if isinstance(value, (list, tuple)):
+        return f"{name}[{', '.join(_canonical(v) for v in value)}]"
+    if isinstance(value, (set, frozenset)):
+        return f"{name}{{{', '.join(sorted(_canonical(v) for v in value))}}}"
+    if hasattr(value, "__dict__"):
+        return f"{name}({_canonical(attributes)})"
+    return f"{name}({value!r})"
+
+
+class ExperimentStore:
+    """
+    A directory that holds the results of an experiment, one file per run.
+    Runs are identified by their run ID, an integer between 0 and the number of
+    runs in the experiment. Successful runs are stored as ``run_<id>.pickle``,
+    failed runs as ``run_<id>.failed`` containing the traceback of the failure.
+    The settings of the experiment are kept in ``experiment.pickle``.
+
+    Files are written atomically, so that an interrupted experiment never
+    leaves a partially written result behind.
+
+    :param path: The directory of the store. It is created if it does not
+        exist.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+
+    def __repr__(self):
+        return str(f"ExperimentStore at {self.path} with {len(self.completed())} "
+                   + f"completed and {len(self.failed())} failed runs.")
+
+    def _result_file(self, run_id):
+        return self.path / f"run_{run_id:06d}.pickle"
+
+    def _failure_file(self, run_id):
+        return self.path / f"run_{run_id:06d}.failed"
+
+    def _run_ids(self, suffix):
+        return sorted(int(f.stem[len("run_"):])
+                      for f in self.path.glob(f"run_*{suffix}"))
+
+    def completed(self):
+        """
+        Return the sorted IDs of successfully completed runs.
+        """
+        return self._run_ids(".pickle")
+
+    def failed(self):
+        """
+        Return the sorted IDs of runs that failed and have not completed since.
+        """
+        completed = set(self.completed())
+        return [i for i in self._run_ids(".failed") if i not in completed]
+
+    def save(self, run_id, result):
+        """
+        Store the ``result`` of run ``run_id``. A failure previously recorded
+        for this run is removed.
+        """
+        _write_atomically(self._result_file(run_id),
+                          pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL))
+        self._failure_file(run_id).unlink(missing_ok=True)
+
+    def save_failure(self, run_id, traceback):
+        """
+        Record that run ``run_id`` failed with the formatted ``traceback``.
+        """
+        _write_atomically(self._failure_file(run_id), traceback.encode("utf-8"))
+
+    def save_settings(self, settings):
+        """
+        Store the settings of the experiment.
+        """
+        _write_atomically(self.path / "experiment.pickle",
+                          pickle.dumps(settings, protocol=pickle.HIGHEST_PROTOCOL))
+
+    def settings(self):
+        """
+        Return the settings of the experiment, or :py:obj:`None` if none were
+        stored.
+        """
+        try:
+            with open(self.path / "experiment.pickle", "rb") as f:
+                return pickle.load(f)
+        except FileNotFoundError:
+            return None
+
+    def check_settings(self, settings):
+        """
+        Raise a :py:exc:`ValueError` if the stored settings of the experiment
+        differ from ``settings``, which are compared as the keys of a 
+        :py:class:`ResultCache` are.
+        """
+        stored = self.settings()
+        differing = [k for k in settings 
+                     if _canonical(settings[k]) != _canonical(stored.get(k))]
+        if differing:
+            raise ValueError(f"The experiment in {self.path} was started with "
+                             + "different settings: "
+                             + ", ".join(differing) + ".")
+
+    def load(self, run_id):
+        """
+        Return the result of run ``run_id``.
+        """
+        with open(self._result_file(run_id), "rb") as f:
+            return pickle.load(f)
+
+    def results(self):
+        """
+        Return the results of all completed runs, ordered by their run ID.
+        """
+        return [self.load(i) for i in self.completed()]
+
+    def failures(self):
+        """
+        Return a dictionary that maps the IDs of failed runs to their
+        tracebacks.
+        """
+        return {i: self._failure_file(i).read_text(encoding="utf-8")
+                for i in self.failed()}
+
+
+class ResultCache:
+    """
+    A directory of simulation results, indexed by the complete configuration 
+    of a run: the simulation type, the settings of the simulation and of its 
+    run, and its seed. As seeded simulations are reproducible, a run with a 
+    configuration that is already in the cache does not need to be performed 
+    again. Keys also depend on the source code of taupy, so that results are 
+    not reused once the code that produced them has changed.
+
+    :param path: The directory of the cache. It is created if it does not 
+        exist.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+
+    def __repr__(self):
+        return str(f"ResultCache at {self.path} with {len(self)} results.")
+
+    def __len__(self):
+        return len(list(self.path.glob("*.pickle")))
+
+    @staticmethod
+    def key(sim_type, simulations, runs, seed):
+        """
+        Return the key of a configuration. ``seed`` is the 
+        :py:class:`numpy.random.SeedSequence` of the simulation.
+        """
+        configuration = (source_hash(), sim_type, simulations, runs, 
+                         seed.entropy, seed.spawn_key)
+        return hashlib.sha256(_canonical(configuration).encode()).hexdigest()
+
+    def get(self, key):
+        """
+        Return the result stored under ``key``. Raises :py:exc:`KeyError` if 
+        there is none.
+        """
+        try:
+            with open(self.path / f"{key}.pickle", "rb") as f:
+                return pickle.load(f)
+        except FileNotFoundError:
+            raise KeyError(key) from None
+
+    def put(self, key, result):
+        """
+        Store ``result`` under ``key``.
+        """
+        _write_atomically(self.path / f"{key}.pickle",
+                          pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL))
@@ -0,0 +1,244 @@
+"""
+Parameter sweeps: experiments over grids of simulation settings.
+"""
+
+from concurrent.futures import as_completed
+from itertools import product
+from pathlib import Path
+import inspect
+import random
+import time
+import traceback
+
+import numpy as np
+import pandas as pd
+from sympy import symbols
+
+from taupy.basic.utilities import satisfiability_count
+from taupy.basic.core import Debate
+from .simulation import Simulation
+from .store import ExperimentStore
+from .executors import executor_from_settings
+
+
+def sweep(grid, replicates=1, *, sim_type=Simulation, simulations={}, runs={},
+          executor={}, seed=None, path=None, cost=None):
+    """
+    Run :py:attr:`replicates` simulations for every combination of settings in
+    :py:attr:`grid`, a dictionary that maps the names of settings of
+    :py:attr:`sim_type` to lists of values. Values can also be given as a
+    dictionary that maps labels to values; the labels are then used in the
+    results table. This is helpful for values such as populations. Settings
+    that are shared by all cells of the grid are passed in :py:attr:`simulations`,
+    and settings to :py:meth:`run` in :py:attr:`runs`.
+
+    All runs are performed in a single :py:class:`ProcessPoolExecutor`,
+    configured with :py:attr:`executor`, or in the 
+    :py:class:`concurrent.futures.Executor` passed as :py:attr:`executor`. Runs that are expected to take longest
+    are started first, so that no long run is left at the end of the sweep. The
+    expected duration is estimated from the sentence pool, the population and
+    the number of steps, or by the function passed to :py:attr:`cost`, which
+    receives the settings of a simulation and of its run.
+
+    For simulation types with pre-generated argument maps, such as
+    :py:class:`FixedDebateSimulation`, cells that do not differ in the settings
+    of the argument map use the same argument map for the same replicate. Each
+    worker process generates a map only once.
+
+    Runs are seeded from :py:attr:`seed` (see :py:func:`experiment`).
+
+    Returns a tuple of a :py:class:`pandas.DataFrame` with one row per run,
+    indexed by cell and replicate, and the results of the runs in the order of
+    the rows. Besides the settings of the cell, a row holds the outcome of the
+    run, such as the number of steps it took and of debate stages it produced.
+    If a directory is given as :py:attr:`path`, the results are
+    instead written to an :py:class:`ExperimentStore` in ``path/runs`` as soon
+    as they are available, and the table is saved to ``path/table.pickle`` and
+    ``path/table.csv``. The store takes the place of the results in the
+    returned tuple.
+    """
+    names = list(grid)
+    values = [_labelled(grid[k]) for k in names]
+    cells = list(product(*values))
+
+    map_parameters = getattr(sim_type, "debate_parameters", None)
+    defaults = {k: v.default for (k, v) in
+                inspect.signature(sim_type).parameters.items()}
+
+    root = np.random.SeedSequence(seed)
+    store = None if path is None else ExperimentStore(Path(path) / "runs")
+
+    tasks = []
+    rows = []
+    map_configurations = {}
+    for (c, cell) in enumerate(cells):
+        settings = simulations | {k: v for (k, (_, v)) in zip(names, cell)}
+
+        if map_parameters is not None:
+            configuration = repr([settings.get(k, defaults.get(k))
+                                  for k in map_parameters])
+            map_id = map_configurations.setdefault(configuration,
+                                                   len(map_configurations))
+
+        for r in range(replicates):
+            run_id = len(tasks)
+            if map_parameters is None:
+                map_seed = None
+            else:
+                # Seeds of argument maps and runs are drawn from separate
+                # branches of the sweep's seed sequence.
+                map_seed = np.random.SeedSequence(root.entropy,
+                                                  spawn_key=(1, map_id, r))
+            tasks.append({
+                "run_id": run_id,
+                "settings": settings,
+                "seed": np.random.SeedSequence(root.entropy,
+                                               spawn_key=(0, run_id)),
+                "map_seed": map_seed,
+                "map_id": (map_id, r) if map_parameters is not None else None,
+                })
+            rows.append({"cell": c, "replicate": r, "run": run_id}
+                        | {k: label for (k, (label, _)) in zip(names, cell)})
+
+    if cost is None:
+        cost = lambda settings, runs: _expected_cost(sim_type, settings, runs)
+    order = sorted(tasks, key=lambda t: cost(t["settings"], runs), reverse=True)
+
+    print(f"Starting sweep of {len(cells)} cells with {replicates} replicates "
+          + f"at {time.ctime()}.")
+
+    results = [None] * len(tasks)
+    with executor_from_settings(executor) as pool:
+        futures = {pool.submit(_sweep_task,
+                               sim_type=sim_type,
+                               settings=t["settings"],
+                               runs=runs,
+                               seed=t["seed"],
+                               map_seed=t["map_seed"],
+                               map_id=t["map_id"],
+                               store_path=None if store is None else store.path,
+                               run_id=t["run_id"]): t["run_id"] for t in order}
+
+        for (count, future) in enumerate(as_completed(futures), start=1):
+            run_id = futures.pop(future)
+            try:
+                (summary, result) = future.result()
+            except Exception:
+                summary = {"status": "failed",
+                           "error": traceback.format_exc()}
+                result = None
+            rows[run_id] |= summary
+            results[run_id] = result
+            print(f"Run {count}/{len(tasks)} {summary['status']} at {time.ctime()}.")
+
+    table = pd.DataFrame(rows).set_index(["cell", "replicate"])
+
+    if path is not None:
+        table.to_pickle(Path(path) / "table.pickle")
+        table.to_csv(Path(path) / "table.csv")
+        return (table, store)
+
+    return (table, results)
+
+def _labelled(values):
+    """
+    Return (label, value) pairs for the values of a setting in a grid.
+    """
+    if isinstance(values, dict):
+        return list(values.items())
+    return [(v if isinstance(v, (str, int, float, bool, type(None)))
+             else repr(v), v) for v in values]
+
+def _expected_cost(sim_type, settings, runs):
+    """
+    A rough estimate of the duration of a run, used to order the runs of a
+    sweep. Model enumeration grows exponentially with the size of the sentence
+    pool, the updates linearly with the number of agents and steps.
+    """
+    parameters = inspect.signature(sim_type).parameters
+    run_parameters = inspect.signature(sim_type.run).parameters
+
+    def setting(name, default=None):
+        if name in settings:
+            return settings[name]
+        if name in parameters:
+            return parameters[name].default
+        return default
+
+    sentences = len(symbols(setting("sentencepool", "p:10")))
+    agents = len(setting("positions") or [])
+    steps = runs.get("max_steps", run_parameters["max_steps"].default
+                                  if "max_steps" in run_parameters else 1)
+    steps = min(steps, 1000)
+
+    return 2 ** min(sentences, 64) * max(1, agents) * max(1, steps) \
+           * max(1, setting("introduction_attempts", 1))
+
+# Argument maps that were generated in a worker process of a sweep, by map
+# configuration and replicate.
+_worker_debates = {}
+
+def _sweep_task(*, sim_type, settings, runs, seed, map_seed, map_id,
+                store_path, run_id):
+    """
+    Perform one run of a sweep in a worker process and summarise it.
+    """
+    start = time.perf_counter()
+    try:
+        if map_seed is not None:
+            if map_id not in _worker_debates:
+                arguments = {k: v for (k, v) in settings.items()
+                             if k in sim_type.debate_parameters}
+                defaults = inspect.signature(sim_type).parameters
+                for k in sim_type.debate_parameters:
+                    arguments.setdefault(k, defaults[k].default)
+                rng = random.Random(int.from_bytes(
+                        map_seed.generate_state(4).tobytes(), "little"))
+                _worker_debates[map_id] = sim_type.generate_debate(**arguments,
+                                                                   rng=rng)
+            settings = settings | {"debate": _worker_debates[map_id]}
+
+        result = sim_type(**settings, seed=seed).run(quiet=False, **runs)
+    except Exception:
+        return ({"status": "failed", "error": traceback.format_exc(),
+                 "seconds": time.perf_counter() - start}, None)
+
+    summary = {"status": "completed", "error": None,
+               "seconds": time.perf_counter() - start} | _summarise(result)
+
+    if store_path is not None:
+        ExperimentStore(store_path).save(run_id, result)
+        result = None
+
+    return (summary, result)
+
+def _summarise(result):
+    """
+    Key figures of the result of a run for the table of a sweep.
+    """
+    if isinstance(result, Simulation):
+        return {"steps": result.steps,
+                "stages": len(result),
+                "arguments": len(result.arguments),
+                "density": result.density(),
+                "sccp_extension": result.model_count(),
+                "agents": len(result.positions[-1]),
+                "stop_reason": getattr(result, "stop_reason", None)}
+
+    summary = {"steps": result.get("steps"),
+               "stages": len(result["positions"]),
+               "agents": len(result["positions"][-1]),
+               "stop_reason": result.get("stop_reason")}
+    if "uncovered_arguments" in result:
+        arguments = result["uncovered_arguments"]
+        summary["arguments"] = len(arguments)
+        if len(arguments) > 1:
+            if len(arguments) in result.get("model_counts", {}):
+                # Measured during the run.
+                summary["density"] = result["densities"][len(arguments)]
+                summary["sccp_extension"] = result["model_counts"][len(arguments)]
+            else:
+                final = Debate(*arguments)
+                summary["density"] = final.density()
+                summary["sccp_extension"] = satisfiability_count(final)
+    return summary
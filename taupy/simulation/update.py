@@ -2,47 +2,70 @@
 Functions to introduce Arguments into Debates and update Positions accordingly.
 """
 
-from copy import deepcopy
+from copy import copy, deepcopy
 import numpy as np
-from more_itertools import powerset, unique_everseen
-from random import randrange, choice, choices, shuffle
+from itertools import chain
+from concurrent.futures import BrokenExecutor, ProcessPoolExecutor
+import random
 from sympy import And, Not, symbols
 from sympy.logic.algorithms.dpll2 import dpll_satisfiable
+from taupy.simulation.budget import BudgetExceeded
 from taupy import (Argument, Debate, EmptyDebate, Position, satisfiability, closedness, 
                    dict_to_prop, next_neighbours,
                    hamming_distance, edit_distance, fetch_conclusion, select_premises,
-                   proposition_levels_from_debate,
+                   random_subsets,
                    z3_assertion_from_argument, z3_soft_constraints_from_position, 
-                   z3_all_models)
+                   z3_assertions_from_debate, z3_projected_models)
+from taupy.basic.utilities import _arguments_of_debate
 import taupy.simulation.strategies as strategies
+import taupy.basic.profiling as profiling
 import z3
+from logging import DEBUG
 
-def introduce(_sim, source=None, target=None, strategy=None):
+# Calls to the DPLL solver are recorded when profiling.
+dpll_satisfiable = profiling.instrumented("dpll")(dpll_satisfiable)
+
+@profiling.instrumented("introduce")
+def introduce(_sim, source=None, target=None, strategy=None, candidates=None,
+              budget=None):
     """
     Introduce an argument following an argumentation strategy from ``source`` to
     ``target``. If ``source`` or ``target`` are unspecified, they are filled in
     automatically. The ``source`` and ``target`` should be given as integers
     representing the position's location in the ``Simulation.positions``
     collection.
+
+    If a :py:class:`CandidateIndex` of the current debate stage is passed as 
+    ``candidates``, the argument is drawn from it instead of being searched 
+    for, which only works for debates that grow randomly.
+
+    The search raises :py:class:`BudgetExceeded` if a limit of ``budget`` is
+    exceeded while it is running.
     """
+    rng = _sim.rng
 
     # We begin by determining source and target positions,
-    # but only if the introduction strategy requires them.
+    # but only if the introduction strategy requires them. Their indices in
+    # the population are kept for the log.
+    (source_idx, target_idx) = (None, None)
     if strategy["source"] | strategy["target"]:
-        # Only copy the list if needed.
-        positions = _sim.positions[-1].copy()
+        population = _sim.positions[-1]
+        # Indices of the positions that can still be picked.
+        available = list(range(len(population)))
         if strategy["source"]:
             if source:
-                positions.remove(source)
+                source_idx = _pick_position(population, available, source)
                 source_pos = source
             else:
-                source_pos = positions.pop(randrange(0,len(positions)))
+                source_idx = available.pop(rng.randrange(0,len(available)))
+                source_pos = population[source_idx]
         if strategy["target"]:
             if target:
-                positions.remove(target)
+                target_idx = _pick_position(population, available, target)
                 target_pos = target
             else:
-                target_pos = positions.pop(randrange(0,len(positions)))
+                target_idx = available.pop(rng.randrange(0,len(available)))
+                target_pos = population[target_idx]
 
     # Track if source and target positions are set.
     if not strategy["source"]:
@@ -50,26 +73,40 @@ def introduce(_sim, source=None, target=None, strategy=None):
     if not strategy["target"]:
         target_pos = None
 
-    # Now we are looping over all available premises, and we store the ones already tried.
-    seen_premises = []
+    if candidates is not None:
+        candidate = candidates.sample(strategy, source_pos, target_pos, rng)
+        if candidate is None:
+            _sim.log.debug("No argument fits strategy '%s' for source agent %s and target agent %s.", strategy["name"], source_idx, target_idx)
+            return False
+        (selected_premises, selected_conclusion) = candidate
+        _sim.use_premises(selected_premises)
+        return _add_argument(_sim, strategy, selected_premises, 
+                             selected_conclusion, source_idx, target_idx)
+
+    # Now we are looping over all available premises, and we store the ones 
+    # already tried in an overlay of the used premises.
+    seen_premises = _sim.premise_index.overlay()
 
     while True:
+        if budget is not None:
+            budget.check()
         # There are two methods to grow the debate: one generates a random graph, the other one
         # a tree structure. 
         if _sim.debate_growth == "random":
             selected_premises = select_premises(sentencepool=_sim.premise_candidates(),
                                                 length=_sim.argumentlength,
-                                                exclude=_sim.used_premises + seen_premises,
+                                                exclude=seen_premises,
                                                 reserved_conclusion=None,
                                                 strategy=strategy,
                                                 source=source_pos,
-                                                target=target_pos)
+                                                target=target_pos,
+                                                rng=rng)
             if selected_premises:
                 _found_premises = True
-                seen_premises.append(selected_premises)
+                seen_premises.add(selected_premises)
             else:
                 # Can't find available premises.
-                _sim.log.append("Can't find premises for source %s and target %s" % (source_pos, target_pos))
+                _sim.log.warning("Can't find premises for source agent %s and target agent %s.", source_idx, target_idx)
                 _found_valid_argument = False
                 break
 
@@ -81,10 +118,10 @@ def introduce(_sim, source=None, target=None, strategy=None):
                                                         target=target_pos)
                 
                 if len(possible_conclusions) == 0:
-                    _sim.log.append("Introducing argument failed because no matching conclusion could be found for the selected premises. %d combinations of premises have been tried." % (len(seen_premises)))
+                    _sim.log.debug("Introducing argument failed because no matching conclusion could be found for the selected premises. %d combinations of premises have been tried.", len(seen_premises.keys))
                     _found_conclusion = False
                 else:
-                    selected_conclusion = choice(possible_conclusions)
+                    selected_conclusion = rng.choice(possible_conclusions)
                     _found_conclusion = True
 
         if _sim.debate_growth == "tree":
@@ -94,36 +131,37 @@ def introduce(_sim, source=None, target=None, strategy=None):
                                                     source=source_pos,
                                                     target=target_pos)
             if len(possible_conclusions) == 0:
-                    _sim.log.append("Can't find conclusion for source %s and target %s" % (source_pos, target_pos))
+                    _sim.log.warning("Can't find conclusion for source agent %s and target agent %s.", source_idx, target_idx)
                     _found_valid_argument = False
                     break
             else:
-                atomic_levels = proposition_levels_from_debate(_sim[-1], key_statements=_sim.key_statements)
-                levels = atomic_levels | {Not(i): atomic_levels[i] for i in atomic_levels}
+                levels = _sim.proposition_levels.literals
+                possible_conclusions = set(possible_conclusions)
                 c = {i: levels[i] for i in levels if i in possible_conclusions}
                 w = [0.75**i for i in c.values()]
                 if w:
-                    selected_conclusion = choices(list(c.keys()), weights=w)[0]
+                    selected_conclusion = rng.choices(list(c.keys()), weights=w)[0]
                     _found_conclusion = True
                 else: 
-                    _sim.log.append("Can't find conclusion that fits proposition hierarchy for source %s and target %s" % (source_pos, target_pos))
+                    _sim.log.warning("Can't find conclusion that fits proposition hierarchy for source agent %s and target agent %s.", source_idx, target_idx)
                     _found_valid_argument = False
                     break
 
             if _found_conclusion:
                 selected_premises = select_premises(sentencepool=_sim.premise_candidates(),
                                                     length=_sim.argumentlength,
-                                                    exclude=_sim.used_premises + seen_premises,
+                                                    exclude=seen_premises,
                                                     reserved_conclusion=selected_conclusion,
                                                     strategy=strategy,
                                                     source=source_pos,
-                                                    target=target_pos)
+                                                    target=target_pos,
+                                                    rng=rng)
                 if selected_premises:
                     _found_premises = True
-                    seen_premises.append(selected_premises)
+                    seen_premises.add(selected_premises)
                 else:
                     # Can't find available premises.
-                    _sim.log.append("Can't find premises for source %s and target %s" % (source_pos, target_pos))
+                    _sim.log.warning("Can't find premises for source agent %s and target agent %s.", source_idx, target_idx)
                     _found_valid_argument = False
                     break
         
@@ -135,52 +173,84 @@ def introduce(_sim, source=None, target=None, strategy=None):
                         Argument(And(*selected_premises), selected_conclusion)
                         )
                     ):
-                _sim.used_premises.append(selected_premises)
+                _sim.use_premises(selected_premises)
                 _found_valid_argument = True
                 break
             else:
-                _sim.log.append("Introducing argument failed because of UNSAT. %d combinations of premises tried." % (len(seen_premises)) )
+                _sim.log.debug("Introducing argument failed because of UNSAT. %d combinations of premises tried.", len(seen_premises.keys))
                 if not selected_premises:
                     _found_valid_argument = False
                     break
 
     if _found_valid_argument:
-        _sim.log.append("Introduce argument with strategy '%s'. Premises: %s. Conclusion: %s. Source: %s. Target: %s." % (strategy["name"], And(*selected_premises), selected_conclusion, source_pos, target_pos))
+        return _add_argument(_sim, strategy, selected_premises, 
+                             selected_conclusion, source_idx, target_idx)
+    else:
+        _sim.log.warning("Introduction with strategy '%s' failed. No valid combinations left in the premise pool.", strategy["name"])
+        return False
 
-        if type(_sim[-1]) == EmptyDebate:
-            # Are we just beginning the debate?
-            _sim.append(Debate(Argument(And(*selected_premises), selected_conclusion)))
-        else:
-            # If the previous debate stage was not empty, it's either a single Argument...
-            if type(_sim[-1]) == Argument:
-                # If a Debate conists of just one Argument, the debate's type
-                # is changed to Argument b/c of inheritance from sympy cls.
-                _sim.append(Debate( _sim[-1], Argument(And(*selected_premises), selected_conclusion)))
-            # Or a Debate consisting of 1 or more Arguments
-            else:
-                # Assuming type is Debate or And
-                _sim.append(Debate( *_sim[-1].args, Argument(And(*selected_premises), selected_conclusion)))
+def _pick_position(population, available, position):
+    """
+    Remove the index of the first of the ``available`` positions in 
+    ``population`` that equals ``position`` from ``available`` and return it.
+    """
+    for (i, idx) in enumerate(available):
+        if population[idx] == position:
+            return available.pop(i)
+    raise ValueError("The position is not part of the population.")
 
-        # Store the argument in the optimiser:
-        _sim.assertions.append(z3_assertion_from_argument(premises=selected_premises, 
-                                                          conclusion=selected_conclusion))
+def _add_argument(_sim, strategy, selected_premises, selected_conclusion, 
+                  source_idx, target_idx):
+    """
+    Add the argument from ``selected_premises`` to ``selected_conclusion`` to 
+    the simulation. The indices of the source and target positions are only
+    used for the log.
+    """
+    premises = And(*selected_premises)
+    _sim.log.info("Introduce argument with strategy '%s'. Premises: %s. Conclusion: %s. Source agent: %s. Target agent: %s.", strategy["name"], premises, selected_conclusion, source_idx, target_idx)
 
-        return True
-        # return Argument(And(*selected_premises), selected_conclusion)
-    else:
-        _sim.log.append("Introduction with strategy '%s' failed. No valid combinations left in the premise pool." % (strategy["name"]) )
-        return False
+    # Store the argument in the optimiser. This comes first, as the 
+    # assertions are rebuilt from the debate stage if they were discarded.
+    _sim.assertions.append(z3_assertion_from_argument(premises=selected_premises, 
+                                                      conclusion=selected_conclusion))
+
+    _sim.append_argument(Argument(premises, selected_conclusion))
 
+    return True
+
+@profiling.instrumented("response")
 def response(*, 
              simulation, 
              method,
              debate=None,
              models=None,
              positions=None,  
-             sentences=None):
+             sentences=None,
+             executor=None,
+             budget=None):
     """
     Updating Positions in a debate.
+
+    For the :py:obj:`"closest_closed_partial_coherent"` methods, the searches 
+    for new positions can be distributed over several processes by passing a
+    dictionary of settings for :py:class:`concurrent.futures.ProcessPoolExecutor`
+    to ``executor``. The worker processes are kept in an :py:class:`UpdatePool`
+    of the simulation until its run ends, and only compile the arguments that
+    were added since the previous response. Results and
+    log entries are merged in the order of the positions, and ties are broken
+    in the calling process.
+
+    Random draws are taken from the simulation's ``rng``. Searches that are
+    distributed over several processes receive seeds drawn from it, so that the
+    outcome does not depend on whether an ``executor`` is used.
+
+    The searches raise :py:class:`BudgetExceeded` if a limit of ``budget`` is
+    exceeded, before the updated positions are added to the simulation. 
+    Searches distributed to an ``executor`` are checked as their results 
+    arrive, and those already running in a worker process finish in the 
+    background.
     """
+    rng = simulation.rng
 
     # Defaults
     if debate == None:
@@ -195,11 +265,13 @@ def response(*,
     if method == "random":
         updated_positions = []
         for p in positions:
+            if budget is not None:
+                budget.check()
             if satisfiability(And(dict_to_prop(p), debate)):
                 updated_positions.append(p)
             else:
                 u = deepcopy(p)
-                u |= choice(satisfiability(And(*sentences, debate), all_models=True))
+                u |= rng.choice(satisfiability(And(*sentences, debate), all_models=True))
                 updated_positions.append(u)
         simulation.positions.append(updated_positions)
 
@@ -210,132 +282,644 @@ def response(*,
         distances = np.array([[hamming_distance(i, j) for i in models] for j in examinees])
 
         for i in range(distances.shape[0]):
+            if budget is not None:
+                budget.check()
             if np.min(distances[i]) == 0:
                 updated_positions.append(positions[i])
-                simulation.log.append(
-                    f"Position with index {i} did not need an update.")
+                simulation.log.debug(
+                    "Position with index %d did not need an update.", i)
             else:
                 u = deepcopy(positions[i])
-                update_index = choice(np.where(distances[i] == distances[i].min())[0].tolist())
+                update_index = rng.choice(np.where(distances[i] == distances[i].min())[0].tolist())
                 u |= models[update_index]
                 updated_positions.append(u)
-                simulation.log.append(
-                    f"Position with index {i} was updated with strategy closest_coherent.")
+                simulation.log.debug(
+                    "Position with index %d was updated with strategy closest_coherent.", i)
 
         simulation.positions.append(updated_positions)
 
     if method == "closest_coherent":
-        updated_positions = []
+        updated_positions = [None] * len(positions)
         if models is None:
             list_of_models = list(satisfiability(debate, all_models=True))
         else:
             list_of_models = models
-        for (i, p) in enumerate(positions):
+        # Agents holding identical positions share the search for neighbours,
+        # but each of them picks a neighbour independently.
+        for indices in _group_by_position(positions):
+            if budget is not None:
+                budget.check()
+            p = positions[indices[0]]
             if dpll_satisfiable(And(dict_to_prop(p), debate)):
-                updated_positions.append(p)
-                simulation.log.append(
-                    f"Position with index {i} did not need an update.")
+                for i in indices:
+                    updated_positions[i] = positions[i]
             else:
-                u = deepcopy(p)
-                u |= choice(next_neighbours(p, debate=debate, models=list_of_models))
-                updated_positions.append(u)
-                simulation.log.append(
-                    f"Position with index {i} was updated with strategy closest_coherent.")
+                neighbours = next_neighbours(p, debate=debate, models=list_of_models)
+                for i in indices:
+                    u = deepcopy(positions[i])
+                    u |= rng.choice(neighbours)
+                    updated_positions[i] = u
+        if simulation.log.enabled(DEBUG):
+            for (i, p) in enumerate(updated_positions):
+                if p is positions[i]:
+                    simulation.log.debug(
+                        "Position with index %d did not need an update.", i)
+                else:
+                    simulation.log.debug(
+                        "Position with index %d was updated with strategy closest_coherent.", i)
         simulation.positions.append(updated_positions)
 
-    if method == "closest_closed_partial_coherent":
+    if method == "closest_coherent_batch":
         """
-        Find a close, closed, coherent, partial neighbour for the positions.
+        Like closest_coherent, but the distances between all positions and all
+        models are computed at once.
         """
-        updated_positions = []
+        if models is None:
+            list_of_models = list(satisfiability(debate, all_models=True))
+        else:
+            list_of_models = models
+        updated_positions = closest_coherent_batch(positions, 
+                                                   debate=debate, 
+                                                   models=list_of_models,
+                                                   rng=rng)
+        updated_indices = [i for (i, p) in enumerate(updated_positions) 
+                           if p is not positions[i]]
+        simulation.log.debug(
+            "%d of %d positions were updated with strategy closest_coherent: %s.",
+            len(updated_indices), len(positions), updated_indices)
+        simulation.positions.append(updated_positions)
 
-        for (idx, position) in enumerate(positions):
-            # First, let's see whether the position has any chance wrt the updated debate:
-            if dpll_satisfiable(And(dict_to_prop(position), debate)) and \
-               closedness(position, debate=debate):
-                    new_position = Position(debate,
-                                            position,
-                                            introduction_strategy=position.introduction_strategy,
-                                            update_strategy=position.update_strategy)
-                    simulation.log.append(
-                        f"Position with index {idx} is still coherent and closed given the new debate.")
-                
-            else:
-                simulation.log.append(
-                    f"Position with index {idx} needs an update.")
-                
-                # Collect constraints for the current position. Empty positions pick a random 
-                # singular position for bootstrapping (otherwise they'd stay empty).
-                if len(position) > 0:                
-                    constraints = z3_soft_constraints_from_position(position)
+    if method in ["closest_closed_partial_coherent", 
+                  "closest_closed_partial_coherent_maxsat"]:
+        """
+        Find a close, closed, coherent, partial neighbour for the positions. The
+        "_maxsat" variant uses a dedicated MaxSAT engine for the search.
+        """
+        updated_positions = [None] * len(positions)
+        # Closed alternatives of candidates that were already inspected in 
+        # this step.
+        closures = {}
+        if method == "closest_closed_partial_coherent_maxsat":
+            # The debate is converted once per response, not once per position.
+            assertions = z3_assertions_from_debate(debate)
+        else:
+            assertions = simulation.assertions
+
+        # Agents holding identical positions share the search for candidates,
+        # but each of them picks a candidate independently.
+        groups = _group_by_position(positions)
+        # Every search draws from its own generator.
+        seeds = [rng.getrandbits(64) for _ in groups]
+
+        if executor is None:
+            searches = [_partial_update_candidates(
+                            positions[indices[0]],
+                            method=method,
+                            debate=debate,
+                            assertions=assertions,
+                            search_radius=simulation.partial_neighbour_search_radius,
+                            memo=closures,
+                            rng=random.Random(seed),
+                            budget=budget) 
+                        for (indices, seed) in zip(groups, seeds)]
+        else:
+            pool = update_pool(simulation, executor)
+            stage = pool.stage(*_stage_arguments(simulation, debate))
+            # Positions are sent as plain dictionaries, so that the debate
+            # attached to them is not pickled with every task.
+            tasks = [(dict(positions[indices[0]]), seed) 
+                     for (indices, seed) in zip(groups, seeds)]
+            futures = [pool.submit(stage, position, method, 
+                                   simulation.partial_neighbour_search_radius,
+                                   seed)
+                       for (position, seed) in tasks]
+            try:
+                searches = []
+                for (future, (position, seed)) in zip(futures, tasks):
+                    (current, candidates) = future.result()
+                    if not current:
+                        # The worker missed earlier debate stages.
+                        (_, candidates) = pool.submit(
+                            pool.complete(stage), position, method, 
+                            simulation.partial_neighbour_search_radius,
+                            seed).result()
+                    searches.append(candidates)
+                    if budget is not None:
+                        budget.check()
+            except BaseException as e:
+                # Don't wait for the searches that are still queued.
+                for future in futures:
+                    future.cancel()
+                if isinstance(e, BrokenExecutor):
+                    pool.shutdown()
+                raise
+
+        # Remember which positions needed an update to log them in order.
+        needed_update = [False] * len(positions)
+        for (indices, candidates) in zip(groups, searches):
+            for idx in indices:
+                if candidates is None:
+                    # Unchanged positions are passed on as they are, as in 
+                    # closest_coherent, so that the history can share them.
+                    new_position = positions[idx]
                 else:
-                    constraints = [choice([z3.Bool(str(i)) for i in debate.atoms()] \
-                                         + [z3.Not(z3.Bool(str(i))) for i in debate.atoms()])]
-                # Build the assertions iteratively. This is equivalent to adding 
-                # soft constraints via z3.Optimize.add_soft().
-                assertions = z3.If(constraints[0], 1, 0)
-                for c in constraints[1:]:
-                    assertions += z3.If(c, 1, 0)
-
-                # MaxSAT iteration over k, the number of fulfilled constraints.
-                k = len(constraints)
-                saved_candidates = []
-                while k >= 0:
-                    o = z3.Optimize()
-                    o.set(priority="pareto")
-                    for a in simulation.assertions:
-                        o.add(a)
-                    o.add(assertions == k)
-                    o.maximize(assertions)
-                    
-                    # Loop over all the solutions to the MaxSAT problem. Note that 
-                    # closedness(model,return_alternative=True)[1] stores the closed version of a model.
-                    candidates = []
-                    base_models = [{symbols(str(i)): eval(str(m[i])) for i in m if symbols(str(i)) in position} \
-                                    for m in z3_all_models(o, [z3.Bool(str(i)) for i in debate.atoms()])] # < --- care terms = model atoms?
-                    unique_base_models = list(unique_everseen(base_models, key=lambda item: frozenset(item.items())))
-
-                    for m in unique_base_models:
-                        candidates.append(closedness(m, debate=debate, return_alternative=True)[1])
-                        differences = [k for k in m if m[k] != position[k]]
-                        diff_samples = list(powerset(differences)); shuffle(diff_samples)
-
-                        for d in diff_samples[:min(len(diff_samples), simulation.partial_neighbour_search_radius)]:
-                            c = {l: position[l] for l in position if l not in differences} \
-                                 | {l: m[l] for l in m if l in d}
-                            
-                            candidates.append(closedness(c, debate=debate, return_alternative=True)[1])
-
-                    # Now calculate the ED() for the position to all candidates...
-                    curr_candidates = candidates + saved_candidates
-                    a = np.array([edit_distance(i, position) for i in curr_candidates])
-                    
-                    # ... and pick the min of distances, but ...
-                    if a.size > 0:
-                        new_position = Position(debate,
-                                            curr_candidates[choice(np.argwhere(a == np.amin(a)).flatten().tolist())],
-                                            introduction_strategy=position.introduction_strategy,
-                                            update_strategy=position.update_strategy)
-                        
-                        # ... only if it is better then what would be expected 
-                        # at the next iteration.
-                        if np.amin(a) > len(constraints)-k+1 and k > 0:
-                            saved_candidates.append(new_position)
-                        else:
-                            break
-
-                    # Could not determine an optimal candidate while demanding 
-                    # k constraints. Decrease k and try again.
-                    k -= 1
+                    new_position = Position(debate,
+                                            rng.choice(candidates),
+                                            introduction_strategy=positions[idx].introduction_strategy,
+                                            update_strategy=positions[idx].update_strategy)
+                    needed_update[idx] = True
+                updated_positions[idx] = new_position
+
+        # Edit distances are only computed if they are going to be recorded.
+        if simulation.log.enabled(DEBUG):
+            for idx in range(len(positions)):
+                if needed_update[idx]:
+                    simulation.log.debug(
+                        "Position with index %d needs an update.", idx)
+                    simulation.log.debug(
+                        "Position with index %d updated to a new position, edit distance %d.",
+                        idx, edit_distance(positions[idx], updated_positions[idx]))
                 else:
-                    # This is here purely for diagnostic purposes.
-                    raise Exception(f"Could not find a neighbour for position {position}.")
-
-                simulation.log.append(
-                    str(f"Position with index {idx} updated to a new position, ")
-                    + str(f"edit distance {edit_distance(position, new_position)}."))
-            # Found replacement for one position, continue loop with next position from
-            # previous debabte stage.
-            updated_positions.append(new_position)
+                    simulation.log.debug(
+                        "Position with index %d is still coherent and closed given the new debate.", idx)
+
         # Found candidates for all positions in pop. of cur. deb. stage.
-        simulation.positions.append(updated_positions)
\ No newline at end of file
+        simulation.positions.append(updated_positions)
+
+def _partial_update_candidates(position, *, method, debate, assertions, 
+                               search_radius, memo, rng=None, budget=None):
+    """
+    Return ``None`` if ``position`` is coherent and closed given ``debate``, and
+    the closest closed and coherent candidates found by ``method`` otherwise.
+    The search raises :py:class:`BudgetExceeded` if ``budget`` is exceeded.
+    """
+    if budget is not None:
+        budget.check()
+    # First, let's see whether the position has any chance wrt the updated debate:
+    if dpll_satisfiable(And(dict_to_prop(position), debate)) and \
+       closedness(position, debate=debate):
+        return None
+
+    if method == "closest_closed_partial_coherent":
+        return _closest_closed_partial_candidates(position,
+                                                  debate=debate,
+                                                  assertions=assertions,
+                                                  search_radius=search_radius,
+                                                  memo=memo,
+                                                  rng=rng,
+                                                  budget=budget)
+    else:
+        return closest_closed_partial_neighbours(position,
+                                                 debate=debate,
+                                                 assertions=assertions,
+                                                 search_radius=search_radius,
+                                                 memo=memo,
+                                                 rng=rng,
+                                                 budget=budget)
+
+class UpdatePool:
+    """
+    Worker processes for the searches of parallel responses, which are kept 
+    for as long as a simulation runs (see :py:func:`update_pool`). Every 
+    worker keeps the arguments of the debate stage it searched in last and 
+    their z3 assertions, so only the arguments that were added since the 
+    previous response are sent with the searches and compiled by the workers.
+
+    :param dict settings: Settings for the 
+        :py:class:`concurrent.futures.ProcessPoolExecutor` of the workers.
+    """
+
+    def __init__(self, settings):
+        self.settings = dict(settings or {})
+        self.executor = ProcessPoolExecutor(**self.settings)
+        # The arguments sent to the workers, in the order they were sent. The
+        # epoch changes when they are no longer the first arguments of the 
+        # stage, so that the workers start over.
+        self.arguments = []
+        self.epoch = 0
+        self.responses = 0
+
+    def __repr__(self):
+        return str(f"UpdatePool with settings {self.settings}.")
+
+    def stage(self, arguments, asserted):
+        """
+        Return the description of the debate stage of ``arguments`` that is 
+        sent with the searches of a response. The first ``asserted`` of the 
+        arguments are those asserted by the simulation, in this order.
+        """
+        n = len(self.arguments)
+        if len(arguments) < n \
+           or any(a is not b and a != b 
+                  for (a, b) in zip(arguments, self.arguments)):
+            self.epoch += 1
+            n = 0
+        self.arguments = list(arguments)
+        self.responses += 1
+        return (self.epoch, n, self.arguments[n:], asserted, self.responses)
+
+    def complete(self, stage):
+        """
+        Return ``stage`` with all of its arguments, for a worker that missed
+        earlier stages.
+        """
+        (epoch, _, _, asserted, response) = stage
+        return (epoch, 0, self.arguments, asserted, response)
+
+    def submit(self, stage, position, method, search_radius, seed):
+        """
+        Search for the candidates of ``position`` in the debate ``stage`` in a 
+        worker process. The future returns whether the worker knew the 
+        earlier arguments of the stage, and the candidates if it did.
+        """
+        return self.executor.submit(_partial_update_task, stage, position, 
+                                    method, search_radius, seed)
+
+    def shutdown(self):
+        """
+        Stop the worker processes. Searches that are still running finish in 
+        the background.
+        """
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+def update_pool(simulation, settings):
+    """
+    Return the :py:class:`UpdatePool` with ``settings`` of ``simulation``.
+    It is started with the first parallel response and kept until the run 
+    ends (see :py:func:`close_update_pool`), so that the worker processes are
+    not started again in every step.
+    """
+    pool = getattr(simulation, "_update_pool", None)
+    if pool is not None and pool.settings != dict(settings or {}):
+        pool.shutdown()
+        pool = None
+    if pool is None:
+        pool = UpdatePool(settings)
+        simulation._update_pool = pool
+    return pool
+
+def close_update_pool(simulation):
+    """
+    Stop the worker processes of the :py:class:`UpdatePool` of 
+    ``simulation``, if it has one.
+    """
+    pool = getattr(simulation, "_update_pool", None)
+    if pool is not None:
+        pool.shutdown()
+        simulation._update_pool = None
+
+# The debate stage that the worker process of an UpdatePool operates on. It is
+# brought up to date by _update_worker_stage() with the arguments sent along
+# with the searches.
+_worker_stage = {"epoch": None, "arguments": [], "compiled": {}, 
+                 "response": None}
+
+def _update_worker_stage(epoch, start, new, asserted, response):
+    """
+    Add the ``new`` arguments of a debate stage to the stage of a worker 
+    process, which needs to hold the ``start`` arguments sent before. Returns
+    whether the worker is up to date.
+    """
+    stage = _worker_stage
+    if stage["epoch"] != epoch or len(stage["arguments"]) != start + len(new):
+        if start == 0:
+            (stage["epoch"], stage["arguments"], stage["compiled"]) = \
+                (epoch, [], {})
+        elif stage["epoch"] != epoch or len(stage["arguments"]) != start:
+            return False
+
+        stage["arguments"] += new
+        # Only the new arguments are compiled.
+        for a in new:
+            stage["compiled"][a] = z3_assertions_from_debate(a)[0]
+        arguments = stage["arguments"]
+        stage["debate"] = EmptyDebate() if not arguments else Debate(*arguments)
+        # The z3 assertions of the debate in its own order, as used by the 
+        # "_maxsat" variant.
+        stage["debate_assertions"] = [stage["compiled"][a] for a 
+                                      in _arguments_of_debate(stage["debate"])]
+        stage["response"] = None
+
+    if stage["response"] != response:
+        # As in the calling process, closures are shared within a response.
+        stage["response"] = response
+        stage["closures"] = {}
+        stage["assertions"] = [stage["compiled"][a] 
+                               for a in stage["arguments"][:asserted]]
+    return True
+
+def _partial_update_task(stage, position, method, search_radius, seed):
+    """
+    Search for the candidates of a single position in a worker process.
+    """
+    if not _update_worker_stage(*stage):
+        return (False, None)
+    assertions = _worker_stage["debate_assertions"] \
+                 if method == "closest_closed_partial_coherent_maxsat" \
+                 else _worker_stage["assertions"]
+    return (True, 
+            _partial_update_candidates(position,
+                                       method=method,
+                                       debate=_worker_stage["debate"],
+                                       assertions=assertions,
+                                       search_radius=search_radius,
+                                       memo=_worker_stage["closures"],
+                                       rng=random.Random(seed)))
+
+def _stage_arguments(simulation, debate):
+    """
+    Return the arguments of ``debate`` with those that ``simulation`` asserts
+    for its updates first, in the order of :py:attr:`assertions`, and the 
+    number of the latter.
+    """
+    arguments = _arguments_of_debate(debate)
+    if not hasattr(simulation, "_asserted_arguments"):
+        # The assertions of other objects are taken to be those of the debate.
+        return (arguments, len(arguments))
+    asserted = list(simulation._asserted_arguments())
+    known = set(asserted)
+    return (asserted + [a for a in arguments if a not in known], len(asserted))
+
+def _group_by_position(positions):
+    """
+    Return lists of indices of ``positions`` that share the same truth-value 
+    attributions, in the order of their first occurrence.
+    """
+    groups = {}
+    for (i, p) in enumerate(positions):
+        groups.setdefault(frozenset(p.items()), []).append(i)
+    return list(groups.values())
+
+def _closest_closed_partial_candidates(position, *, debate, assertions, 
+                                       search_radius=50, memo=None, rng=None,
+                                       budget=None):
+    """
+    Return the closest closed and coherent partial candidates for ``position``.
+    The MaxSAT problem is solved by iterating over k, the number of fulfilled
+    truth-value attributions of the position, starting from all of them.
+    ``assertions`` are the z3 assertions for ``debate``. The search raises 
+    :py:class:`BudgetExceeded` if a limit of ``budget`` is exceeded.
+    """
+    rng = random if rng is None else rng
+    if memo is None:
+        memo = {}
+
+    # Collect constraints for the current position. Empty positions pick a random 
+    # singular position for bootstrapping (otherwise they'd stay empty).
+    if len(position) > 0:                
+        constraints = z3_soft_constraints_from_position(position)
+    else:
+        atoms = sorted(debate.atoms(), key=str)
+        constraints = [rng.choice([z3.Bool(str(i)) for i in atoms] \
+                                 + [z3.Not(z3.Bool(str(i))) for i in atoms])]
+    # Build the assertions iteratively. This is equivalent to adding 
+    # soft constraints via z3.Optimize.add_soft().
+    fulfilled = z3.If(constraints[0], 1, 0)
+    for c in constraints[1:]:
+        fulfilled += z3.If(c, 1, 0)
+
+    # MaxSAT iteration over k, the number of fulfilled constraints.
+    k = len(constraints)
+    saved_candidates = []
+    while k >= 0:
+        # The number of fulfilled constraints is fixed to k, so a
+        # plain solver suffices to enumerate the MaxSAT solutions.
+        solver = z3.Solver()
+        for a in assertions:
+            solver.add(a)
+        solver.add(fulfilled == k)
+        
+        # Loop over all the solutions to the MaxSAT problem, projected onto
+        # the position's sentences. Note that closedness(model,return_alternative=True)[1]
+        # stores the closed version of a model.
+        candidates = []
+        projection = [z3.Bool(str(i)) for i in position 
+                      if position[i] is not None or i in debate.atoms()]
+        unique_base_models = []
+        for m in z3_projected_models(solver, projection):
+            if budget is not None:
+                budget.check()
+            unique_base_models.append({symbols(str(t)): v 
+                                       for (t, v) in m.items()})
+
+        for m in unique_base_models:
+            candidates.append(_memoised_closure(m, debate=debate, memo=memo))
+            differences = [k for k in m if m[k] != position[k]]
+
+            for d in random_subsets(differences, search_radius, rng=rng):
+                c = {l: position[l] for l in position if l not in differences} \
+                     | {l: m[l] for l in m if l in d}
+                
+                candidates.append(_memoised_closure(c, debate=debate, memo=memo))
+
+        # Now calculate the ED() for the position to all candidates...
+        curr_candidates = candidates + saved_candidates
+        a = np.array([edit_distance(i, position) for i in curr_candidates])
+        
+        # ... and pick the min of distances, but ...
+        if a.size > 0:
+            closest = [curr_candidates[i] for i in 
+                       np.argwhere(a == np.amin(a)).flatten().tolist()]
+            
+            # ... only if it is better then what would be expected 
+            # at the next iteration.
+            if np.amin(a) > len(constraints)-k+1 and k > 0:
+                saved_candidates.append(rng.choice(closest))
+            else:
+                return closest
+
+        # Could not determine an optimal candidate while demanding 
+        # k constraints. Decrease k and try again.
+        k -= 1
+
+    # This is here purely for diagnostic purposes.
+    raise Exception(f"Could not find a neighbour for position {position}.")
+
+def closest_coherent_batch(positions, *, debate, models, chunk_size=2**22, 
+                           rng=None):
+    """
+    Move every position in ``positions`` that is incoherent given ``debate`` to
+    a randomly selected next neighbour among the ``models`` of the debate. 
+    
+    Positions and models are encoded as bit matrices over the debate's 
+    sentences, so that the Hamming distances for all agents and models are 
+    obtained by matrix multiplication. This is done in chunks of at most 
+    ``chunk_size`` distance entries. Only positions that change are copied; 
+    all others are returned as they are.
+
+    Positions that do not attribute a truth value to every sentence of the 
+    debate have no Hamming distance to the models and are updated 
+    individually, as in the :py:obj:`"closest_coherent"` strategy.
+
+    Ties are broken with draws from ``rng``, a :py:class:`random.Random` 
+    instance, or from the global random number generators if ``rng`` is 
+    :py:obj:`None`.
+    """
+    if rng is None:
+        rng = random
+        np_rng = np.random
+    else:
+        np_rng = np.random.default_rng(rng.getrandbits(128))
+    atoms = sorted(debate.atoms(), key=lambda x: x.sort_key())
+    updated_positions = list(positions)
+
+    complete = []
+    for (i, p) in enumerate(positions):
+        if all(p.get(a) is not None for a in atoms):
+            complete.append(i)
+        elif not dpll_satisfiable(And(dict_to_prop(p), debate)):
+            u = deepcopy(p)
+            u |= rng.choice(next_neighbours(p, debate=debate, models=models))
+            updated_positions[i] = u
+
+    if not complete:
+        return updated_positions
+
+    P = np.array([[p[a] for a in atoms] for p in 
+                  (positions[i] for i in complete)], dtype=np.int32)
+    M = np.array([[m[a] for a in atoms] for m in models], dtype=np.int32)
+    # The number of agents per chunk
+    rows = max(1, chunk_size // max(1, len(models)))
+
+    for start in range(0, len(complete), rows):
+        chunk = P[start:start+rows]
+        # Hamming distance: positions where the agent is True and the model 
+        # False, plus the positions where the agent is False and the model True.
+        D = chunk @ (1 - M).T + (1 - chunk) @ M.T
+        minima = D.min(axis=1)
+        # Random tie-breaking: draw random keys and pick the largest key among
+        # the models at minimal distance.
+        keys = np.where(D == minima[:, None], np_rng.random(D.shape), -1)
+        picks = keys.argmax(axis=1)
+
+        for row in np.flatnonzero(minima > 0):
+            i = complete[start + row]
+            # A shallow copy suffices: truth values are immutable, and the
+            # debate attached to a Position need not be duplicated.
+            u = copy(positions[i])
+            u |= models[picks[row]]
+            updated_positions[i] = u
+
+    return updated_positions
+
+def closest_closed_partial_neighbours(position, *, debate, assertions=None, 
+                                      search_radius=50, max_models=1000, 
+                                      memo=None, rng=None, budget=None):
+    """
+    Return the closed and coherent (partial) positions that have a minimal edit
+    distance to ``position`` relative to ``debate``.
+
+    The search is a MaxSAT problem over the truth-value attributions of 
+    ``position``: the optimal number of attributions that need to be given up 
+    is determined by z3's core-guided MaxSAT solver first. Starting from that 
+    optimum, models are enumerated level by level (linear search over the number
+    of violated attributions), and only projected onto the sentences of 
+    ``position``. Every edit of a model violates at least as many attributions
+    as the level it stems from, so the search stops once no further level can
+    contain a closer candidate.
+
+    ``assertions`` can be supplied as a list of z3 assertions for ``debate`` to
+    avoid repeated conversions. ``search_radius`` limits the number of partial
+    alternatives that are inspected per model, and ``max_models`` the number 
+    of models that are enumerated per level, or :py:obj:`None` for all of 
+    them. Closed alternatives are looked 
+    up in and stored to ``memo``, which can be shared between calls on the same
+    ``debate``. Random draws are taken from ``rng``, a :py:class:`random.Random`
+    instance, or from the :py:mod:`random` module if ``rng`` is :py:obj:`None`.
+    The search raises :py:class:`BudgetExceeded` if a limit of ``budget``, a
+    :py:class:`Budget`, is exceeded.
+    """
+    rng = random if rng is None else rng
+    if assertions is None:
+        assertions = z3_assertions_from_debate(debate)
+
+    if memo is None:
+        memo = {}
+
+    atoms = debate.atoms()
+    reference = dict(position)
+
+    if len(reference) == 0 and len(atoms) > 0:
+        # Empty positions pick a random singular position for bootstrapping 
+        # (otherwise they'd stay empty).
+        reference = {rng.choice(sorted(atoms, key=str)): rng.choice([True, False])}
+
+    attributions = {k: reference[k] for k in reference 
+                    if k in atoms and reference[k] is not None}
+
+    if not attributions:
+        # Nothing to give up: the position only needs to be closed.
+        return [closedness(reference, debate=debate, return_alternative=True)[1]]
+
+    terms = {k: z3.Bool(str(k)) for k in attributions}
+    constraints = [terms[k] if attributions[k] else z3.Not(terms[k]) 
+                   for k in attributions]
+
+    # Core-guided MaxSAT to obtain the minimal number of violated attributions.
+    o = z3.Optimize()
+    o.add(*assertions)
+    for c in constraints:
+        o.add_soft(c)
+    with profiling.timed("z3"):
+        result = o.check()
+    if result != z3.sat:
+        raise RuntimeError(f"Could not find a neighbour for position {position}.")
+    m = o.model()
+    optimum = len([c for c in constraints 
+                   if not z3.is_true(m.eval(c, model_completion=True))])
+
+    best_candidates = []
+    # The attributions of the best candidates, to skip duplicates.
+    best_keys = set()
+    best_distance = float("inf")
+
+    for cost in range(optimum, len(constraints) + 1):
+        s = z3.Solver()
+        s.add(*assertions)
+        s.add(z3.PbEq([(c, 1) for c in constraints], len(constraints) - cost))
+
+        for m in z3_projected_models(s, terms.values(), max_models=max_models):
+            if budget is not None:
+                budget.check()
+            base_model = {symbols(str(t)): v for (t, v) in m.items()}
+
+            differences = [k for k in base_model 
+                           if base_model[k] != attributions[k]]
+            # The model itself is always inspected, partial alternatives only 
+            # within the search radius.
+            diff_samples = chain([tuple(differences)], 
+                                 random_subsets(differences, search_radius, 
+                                                rng=rng))
+
+            for d in diff_samples:
+                c = {l: reference[l] for l in reference if l not in differences} \
+                    | {l: base_model[l] for l in d}
+                closed = _memoised_closure(c, debate=debate, memo=memo)
+                distance = edit_distance(closed, reference)
+
+                if distance < best_distance:
+                    best_distance = distance
+                    best_candidates = []
+                    best_keys = set()
+                if distance == best_distance:
+                    key = frozenset(closed.items())
+                    if key not in best_keys:
+                        best_keys.add(key)
+                        best_candidates.append(closed)
+
+        # Candidates from the next level have an edit distance of at least
+        # cost+1 to the position.
+        if best_distance <= cost + 1:
+            break
+
+    return best_candidates
+
+def _memoised_closure(candidate, *, debate, memo):
+    """
+    Return the closed alternative to ``candidate``, obtained via closedness().
+    Results are stored in ``memo`` so that each candidate is checked only once.
+    """
+    key = frozenset(candidate.items())
+    if key not in memo:
+        memo[key] = closedness(candidate, debate=debate, return_alternative=True)[1]
+    return memo[key]
\ No newline at end of file
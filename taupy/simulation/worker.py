@@ -0,0 +1,31 @@
+"""
+Start a worker for a :py:class:`SocketExecutor` from the command line::
+
+    TAUPY_AUTHKEY=<secret> python -m taupy.simulation.worker --host 0.0.0.0 --port 6000
+
+The secret key is read from the environment variable ``TAUPY_AUTHKEY``, so
+that it does not show up in the list of processes, or from ``--authkey``.
+There is no default key.
+"""
+
+import argparse
+import os
+
+from taupy.simulation.executors import serve_worker
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Start a worker for taupy's SocketExecutor.")
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=6000)
+    parser.add_argument("--authkey", default=os.environ.get("TAUPY_AUTHKEY"),
+                        help="The secret key of the connections. Defaults to "
+                             + "the environment variable TAUPY_AUTHKEY.")
+    arguments = parser.parse_args()
+
+    if not arguments.authkey:
+        parser.error("A secret key is required: set TAUPY_AUTHKEY or pass "
+                     + "--authkey.")
+
+    serve_worker(host=arguments.host, port=arguments.port,
+                 authkey=arguments.authkey.encode())
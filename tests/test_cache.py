@@ -0,0 +1,78 @@
+"""
+Tests of seeded experiments and the :py:class:`ResultCache`.
+"""
+
+import numpy as np
+import pytest
+
+from taupy import Position, ResultCache, Simulation, experiment, strategies
+
+EXECUTOR = {"max_workers": 1}
+RUNS = {"max_steps": 3}
+
+
+def settings():
+    positions = [Position(None, introduction_strategy=strategies.attack)
+                 for _ in range(4)]
+    return {"positions": positions, "sentencepool": "p:6"}
+
+def outcome(simulation):
+    return ([str(a) for a in simulation.arguments], list(simulation))
+
+
+def test_seeded_experiments_are_reproducible():
+    first = experiment(2, executor=EXECUTOR, simulations=settings(), runs=RUNS,
+                       seed=11)
+    second = experiment(2, executor=EXECUTOR, simulations=settings(), runs=RUNS,
+                        seed=11)
+    assert [outcome(s) for s in first] == [outcome(s) for s in second]
+
+def test_keys_do_not_depend_on_the_order_of_settings():
+    seed = np.random.SeedSequence(3)
+    simulations = settings()
+    reordered = dict(reversed(list(simulations.items())))
+    key = ResultCache.key(Simulation, simulations,
+                          {"max_steps": 3, "quiet": True}, seed)
+
+    assert key == ResultCache.key(Simulation, reordered,
+                                  {"quiet": True, "max_steps": 3}, seed)
+    assert key != ResultCache.key(Simulation, simulations, {"max_steps": 4}, seed)
+    assert key != ResultCache.key(Simulation, simulations,
+                                  {"max_steps": 3, "quiet": True},
+                                  seed.spawn(1)[0])
+
+def test_keys_depend_on_the_strategies_of_positions():
+    seed = np.random.SeedSequence(3)
+    simulations = settings()
+    changed = {**simulations, "positions": [
+        Position(None, introduction_strategy=strategies.fortify)
+        for _ in range(4)]}
+    assert ResultCache.key(Simulation, simulations, RUNS, seed) \
+           != ResultCache.key(Simulation, changed, RUNS, seed)
+
+def test_cache_stores_results(tmp_path):
+    cache = ResultCache(tmp_path)
+    with pytest.raises(KeyError):
+        cache.get("missing")
+    cache.put("key", [1, 2])
+    assert cache.get("key") == [1, 2]
+    assert len(cache) == 1
+
+def test_cached_results_are_reused(tmp_path):
+    first = experiment(2, executor=EXECUTOR, simulations=settings(), runs=RUNS,
+                       seed=11, cache=tmp_path)
+    cache = ResultCache(tmp_path)
+    assert len(cache) == 2
+
+    # Replace the cached results to tell whether they are returned.
+    for f in tmp_path.glob("*.pickle"):
+        cache.put(f.stem, f.stem)
+    second = experiment(2, executor=EXECUTOR, simulations=settings(), runs=RUNS,
+                        seed=11, cache=tmp_path)
+    assert sorted(second) == sorted(f.stem for f in tmp_path.glob("*.pickle"))
+
+    third = experiment(2, executor=EXECUTOR, simulations=settings(),
+                       runs={"max_steps": 2}, seed=11, cache=tmp_path)
+    assert len(cache) == 4
+    assert [len(s.arguments) for s in third] \
+           == [min(len(s.arguments), 2) for s in first]
@@ -0,0 +1,113 @@
+"""
+Tests of the :py:class:`CandidateIndex` against an enumeration of all
+arguments that could be introduced.
+"""
+
+from itertools import combinations, product
+import random
+
+import pytest
+from sympy import Not, false, symbols, true
+
+from taupy import Position, Simulation, strategies
+from taupy.basic.utilities import premise_key
+from taupy.simulation.candidates import CandidateIndex
+
+all_strategies = [strategies.fortify, strategies.attack, strategies.convert,
+                  strategies.undercut, strategies.unrestricted_undercut,
+                  strategies.random]
+
+
+def holds(literal, model):
+    return not model[literal.args[0]] if isinstance(literal, Not) \
+           else model[literal]
+
+def models(simulation):
+    """
+    The truth-value assignments to the sentence pool that satisfy the current
+    debate stage and the ground truth.
+    """
+    stage = simulation[-1]
+    ground_truth = simulation.ground_truth or {}
+    found = []
+    for values in product([True, False], repeat=len(simulation.sentencepool)):
+        model = dict(zip(simulation.sentencepool, values))
+        if all(model[s] == v for (s, v) in ground_truth.items()) \
+           and stage.xreplace({s: true if v else false
+                               for (s, v) in model.items()}) == true:
+            found.append(model)
+    return found
+
+def accepted(position):
+    return {s if v else Not(s) for (s, v) in position.items() if v is not None}
+
+def candidates(simulation, strategy, source, target):
+    """
+    All arguments that ``source`` can introduce against ``target`` with
+    ``strategy``, as pairs of a premise key and a conclusion.
+    """
+    literals = simulation.premise_candidates()
+    pool = {None: literals,
+            "source": accepted(source),
+            "target": accepted(target)}[strategy["pick_premises_from"]]
+    conclusions = set(literals)
+    if strategy["source_accepts_conclusion"] == "Yes":
+        conclusions &= accepted(source)
+    if strategy["source_accepts_conclusion"] == "Toleration":
+        conclusions -= {Not(l) for l in accepted(source)}
+    if strategy["target_accepts_conclusion"] == "No":
+        conclusions -= accepted(target)
+
+    stage_models = models(simulation)
+    found = set()
+    for premises in combinations(sorted(pool, key=str),
+                                 simulation.argumentlength):
+        mentioned = {l.atoms().pop() for l in premises}
+        if len(mentioned) < len(premises) \
+           or premises in simulation.premise_index:
+            continue
+        for conclusion in conclusions:
+            # The argument must be consistent with the debate stage.
+            if conclusion.atoms().pop() not in mentioned \
+               and any(holds(conclusion, m)
+                       or not all(holds(l, m) for l in premises)
+                       for m in stage_models):
+                found.add((premise_key(premises), conclusion))
+    return found
+
+def simulations():
+    agents = lambda: [Position(None, introduction_strategy=all_strategies)
+                      for _ in range(4)]
+    ground_truth = {s: i % 2 == 0 for (i, s) in enumerate(symbols("p:5"))}
+    return [Simulation(positions=agents(), sentencepool="p:5", seed=0,
+                       initial_position_size=5),
+            Simulation(positions=agents(), sentencepool="p:5", seed=1,
+                       initial_position_size=3,
+                       default_update_strategy="closest_closed_partial_coherent"),
+            # Literals entailed by the ground truth can't support arguments
+            # against it.
+            Simulation(positions=agents(), sentencepool="p:5", seed=9,
+                       ground_truth=ground_truth)]
+
+
+@pytest.mark.parametrize("simulation", simulations())
+def test_candidates_agree_with_enumeration(simulation):
+    simulation.run(max_steps=6, max_density=1, quiet=True)
+    index = CandidateIndex(simulation)
+    population = simulation.positions[-1]
+    rng = random.Random(0)
+
+    for strategy in all_strategies:
+        for (source, target) in [(population[0], population[2]),
+                                 (population[1], population[3])]:
+            expected = candidates(simulation, strategy, source, target)
+            assert index.count(strategy, source, target) == len(expected)
+            assert index.exists(strategy, source, target) == bool(expected)
+
+            for _ in range(3):
+                drawn = index.sample(strategy, source, target, rng=rng)
+                if not expected:
+                    assert drawn is None
+                else:
+                    (premises, conclusion) = drawn
+                    assert (premise_key(premises), conclusion) in expected
@@ -0,0 +1,79 @@
+"""
+Tests of the :py:class:`SocketExecutor` and its workers.
+"""
+
+import multiprocessing
+import operator
+
+import pytest
+
+from taupy import (Position, SocketExecutor, experiment, serve_worker,
+                   strategies)
+
+
+@pytest.fixture(scope="module")
+def executor():
+    executor = SocketExecutor.local(max_workers=2)
+    yield executor
+    executor.shutdown()
+
+@pytest.fixture
+def worker():
+    """
+    Start a worker with the key ``b"secret"`` and return its address.
+    """
+    (receiver, sender) = multiprocessing.Pipe(duplex=False)
+    process = multiprocessing.Process(target=serve_worker,
+                                      kwargs={"port": 0, "authkey": b"secret",
+                                              "ready": sender},
+                                      daemon=True)
+    process.start()
+    yield receiver.recv()
+    process.terminate()
+    process.join()
+
+
+def test_tasks_are_performed(executor):
+    futures = [executor.submit(operator.pow, 2, i) for i in range(10)]
+    assert [f.result(timeout=30) for f in futures] == [2**i for i in range(10)]
+    assert list(executor.map(abs, [-1, -2])) == [1, 2]
+
+def test_exceptions_are_raised_with_the_remote_traceback(executor):
+    future = executor.submit(int, "not a number")
+    with pytest.raises(ValueError) as info:
+        future.result(timeout=30)
+    assert "Traceback" in str(info.value.__cause__)
+
+    # The worker keeps accepting tasks after a failure.
+    assert executor.submit(operator.add, 1, 2).result(timeout=30) == 3
+
+def test_results_equal_those_of_a_process_pool(executor):
+    simulations = {"positions": [Position(None,
+                                          introduction_strategy=strategies.attack)
+                                 for _ in range(4)],
+                   "sentencepool": "p:6"}
+    runs = {"max_steps": 3}
+
+    def outcomes(executor):
+        return [list(s) for s in experiment(2, executor=executor, seed=4,
+                                            simulations=simulations, runs=runs)]
+
+    assert outcomes(executor) == outcomes({"max_workers": 1})
+
+@pytest.mark.parametrize("authkey", [None, b"", "secret"])
+def test_a_secret_authkey_is_required(authkey):
+    with pytest.raises(ValueError):
+        SocketExecutor([("localhost", 6000)], authkey=authkey)
+    with pytest.raises(ValueError):
+        serve_worker(port=0, authkey=authkey)
+
+def test_workers_only_accept_their_authkey(worker):
+    intruder = SocketExecutor([worker], authkey=b"guess")
+    with pytest.raises(RuntimeError):
+        intruder.submit(operator.neg, 1).result(timeout=30)
+    intruder.shutdown()
+
+    # The worker is still available with the right key.
+    executor = SocketExecutor([worker], authkey=b"secret")
+    assert executor.submit(operator.neg, 1).result(timeout=30) == -1
+    executor.shutdown()
@@ -0,0 +1,117 @@
+"""
+Tests of the storage of populations in a :py:class:`PositionHistory`.
+"""
+
+import pickle
+import random
+
+import pytest
+from sympy import symbols
+
+from taupy import (Argument, Debate, Position, PositionHistory, Simulation,
+                   strategies)
+
+p, q, r = symbols("p q r")
+
+
+def random_populations(stages, seed=0):
+    rng = random.Random(seed)
+    debate = Debate(Argument(p & r, q))
+    populations = []
+    for _ in range(stages):
+        population = [Position(debate, {s: rng.random() < 0.5
+                                        for s in rng.sample([p, q, r], 2)})
+                      for _ in range(rng.randint(3, 5))]
+        populations.append(population)
+    return populations
+
+@pytest.fixture
+def populations():
+    return random_populations(20)
+
+@pytest.fixture
+def history(populations):
+    return PositionHistory(populations, checkpoint_interval=3)
+
+
+def test_history_behaves_like_a_list_of_populations(history, populations):
+    assert len(history) == len(populations)
+    assert [history[i] for i in range(len(history))] == populations
+    assert list(history) == populations
+    assert history[-1] == populations[-1]
+    assert history[4:11:2] == populations[4:11:2]
+    with pytest.raises(IndexError):
+        history[len(populations)]
+
+def test_returned_populations_are_copies(history, populations):
+    history[3].append(None)
+    assert history[3] == populations[3]
+
+def test_unchanged_positions_are_shared():
+    debate = Debate(Argument(p & r, q))
+    first = [Position(debate, {p: True}), Position(debate, {q: False})]
+    second = [Position(debate, {p: True}), Position(debate, {q: True})]
+    history = PositionHistory([first, second])
+
+    assert history.changed(1) == [1]
+    assert history[1][0] is history[0][0]
+    assert history[1][1] is second[1]
+
+def test_positions_are_not_shared_across_debates():
+    first = [Position(Debate(Argument(p & r, q)), {p: True})]
+    second = [Position(Debate(Argument(p & r, q), Argument(q & r, ~p)),
+                       {p: True})]
+    history = PositionHistory([first, second])
+
+    assert history.changed(1) == [0]
+    assert history[1][0].debate is second[0].debate
+
+def test_thinned_history_keeps_some_stages(history, populations):
+    history.thin(4)
+    assert len(history) == len(populations)
+    assert history.stages() == [0, 4, 8, 12, 16, 19]
+    assert list(history) == [populations[s] for s in history.stages()]
+    assert history[8] == populations[8]
+    with pytest.raises(IndexError):
+        history[5]
+    with pytest.raises(IndexError):
+        history.changed(5)
+    with pytest.raises(ValueError):
+        history.thin(1)
+
+def test_thinned_history_keeps_appending(history, populations):
+    history.thin(None)
+    extra = random_populations(3, seed=1)
+    for population in extra:
+        history.append(population)
+
+    assert len(history) == len(populations) + len(extra)
+    assert history.stages() == [len(history) - 1]
+    assert history[-1] == extra[-1]
+
+def test_pickled_history(history, populations):
+    history[-1]
+    assert list(pickle.loads(pickle.dumps(history))) == populations
+
+def test_resumed_history():
+    population = random_populations(1)[0]
+    history = PositionHistory.resumed(population, 5)
+    assert len(history) == 5
+    assert history[-1] == population
+    assert history.stages() == [4]
+
+@pytest.mark.parametrize("strategy", ["closest_coherent",
+                                      "closest_closed_partial_coherent"])
+def test_simulations_only_record_changed_positions(strategy):
+    simulation = Simulation(
+        positions=[Position({}, introduction_strategy=strategies.fortify)
+                   for _ in range(6)],
+        sentencepool="p:8", seed=5, default_update_strategy=strategy,
+        initial_position_size=4)
+    simulation.run(max_steps=6, quiet=True)
+
+    history = simulation.positions
+    for stage in range(1, len(history)):
+        assert history.changed(stage) \
+               == [i for (i, p) in enumerate(history[stage])
+                   if dict(p) != dict(history[stage - 1][i])]
@@ -0,0 +1,72 @@
+"""
+Tests of the levels of sentences, computed at once and incrementally.
+"""
+
+import pickle
+import random
+
+import pytest
+from sympy import And, Not, symbols
+
+from taupy import (Argument, Debate, Position, PropositionLevels, Simulation,
+                   proposition_levels_from_debate, strategies)
+
+sentences = symbols("p:8")
+
+
+def random_arguments(rng, n):
+    def literal(s):
+        return s if rng.random() < 0.5 else Not(s)
+
+    arguments = []
+    for _ in range(n):
+        (a, b, c) = rng.sample(sentences, 3)
+        arguments.append(Argument(And(literal(a), literal(b)), literal(c)))
+    return arguments
+
+def expected_literals(levels):
+    return {**levels, **{Not(s): l for (s, l) in levels.items()}}
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_incremental_levels_equal_those_of_the_debate(seed):
+    rng = random.Random(seed)
+    key_statements = sentences[:rng.randint(1, 2)]
+    arguments = random_arguments(rng, 12)
+    levels = PropositionLevels(key_statements)
+
+    for (i, argument) in enumerate(arguments, start=1):
+        levels.add(argument)
+        assert levels.arguments == i
+        if i < 3:
+            # Smaller debates are not told apart from single arguments by
+            # proposition_levels_from_debate.
+            continue
+        expected = proposition_levels_from_debate(Debate(*arguments[:i]),
+                                                  key_statements)
+        assert dict(levels) == expected
+        assert levels.literals == expected_literals(expected)
+
+def test_levels_require_key_statements():
+    with pytest.raises(ValueError):
+        PropositionLevels([])
+
+def test_levels_of_a_tree_growing_simulation():
+    simulation = Simulation(
+        positions=[Position(None, introduction_strategy=strategies.fortify)
+                   for _ in range(4)],
+        debate_growth="tree", sentencepool="p:10", key_statements="p0:2",
+        seed=3)
+    simulation.run(max_steps=3, quiet=True)
+    assert dict(simulation.proposition_levels) \
+           == proposition_levels_from_debate(simulation[-1],
+                                             simulation.key_statements)
+
+    simulation.run(max_steps=6, quiet=True)
+    levels = simulation.proposition_levels
+    assert levels.arguments == len(simulation.arguments)
+    assert dict(levels) == proposition_levels_from_debate(
+        simulation[-1], simulation.key_statements)
+
+    restored = pickle.loads(pickle.dumps(simulation))
+    assert restored.proposition_levels == levels
@@ -0,0 +1,46 @@
+"""
+Tests of the records of a :py:class:`SimulationLog`.
+"""
+
+import pickle
+import re
+
+from sympy import And, symbols
+
+from taupy import LogRecord, Position, Simulation, SimulationLog, strategies
+
+
+def test_immutable_arguments_are_kept_until_the_record_is_read():
+    (p, q) = symbols("p q")
+    position = Position(None, {p: True})
+    record = LogRecord(20, "%s %s %s %s %d", (And(p, q), (p, 1), position,
+                                              [p], 3))
+
+    assert record.args[0] == And(p, q) and record.args[1] == (p, 1)
+    # Mutable arguments are formatted when the record is created.
+    assert record.args[2:4] == (str(position), "[p]")
+    position[q] = False
+    assert str(record) == "p & q (p, 1) {p: True} [p] 3"
+    assert str(pickle.loads(pickle.dumps(record))) == str(record)
+
+def test_introductions_log_agent_indices():
+    simulation = Simulation(
+        positions=[Position(None, introduction_strategy=strategies.attack)
+                   for _ in range(4)],
+        sentencepool="p:6", seed=1)
+    simulation.run(max_steps=2, quiet=True)
+
+    introductions = [r for r in simulation.log.records
+                     if r.message.startswith("Introduce argument")]
+    assert len(introductions) == 2
+    for record in introductions:
+        (source, target) = record.args[-2:]
+        assert source in range(4) and target in range(4) and source != target
+        assert re.search(r"Source agent: \d\. Target agent: \d\.$",
+                         str(record))
+
+def test_levels_below_the_log_level_are_not_recorded():
+    log = SimulationLog(level=20)
+    log.debug("Not recorded: %s", symbols("p"))
+    log.info("Recorded: %s", symbols("p"))
+    assert list(log) == ["Recorded: p"]
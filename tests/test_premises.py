@@ -0,0 +1,99 @@
+"""
+Tests of drawing premise combinations and of the :py:class:`PremiseIndex`.
+"""
+
+from collections import Counter
+from itertools import combinations
+import random
+
+import pytest
+from sympy import And, Not, symbols
+
+from taupy import PremiseIndex, fetch_premises, premise_key
+from taupy.basic.utilities import _PremiseCombinations
+
+sentences = symbols("p:5")
+# Both literals of the first three sentences, only the others' affirmations.
+pool = sorted(set(sentences) | {Not(s) for s in sentences[:3]}, key=str)
+
+
+def consistent(combination):
+    return len({s.args[0] if isinstance(s, Not) else s
+                for s in combination}) == len(combination)
+
+def enumerated(n, within=None):
+    return [c for c in combinations(pool, n) if consistent(c)
+            and not (within is not None and set(c) <= within)]
+
+
+@pytest.mark.parametrize("n", range(6))
+@pytest.mark.parametrize("within", [None, {Not(sentences[0]), sentences[1],
+                                           sentences[3], sentences[4]}])
+def test_combinations_are_numbered_bijectively(n, within):
+    numbered = _PremiseCombinations(pool, n, within=within)
+    expected = enumerated(n, within)
+
+    assert len(numbered) == len(expected)
+    unranked = [numbered.unrank(r) for r in range(len(numbered))]
+    assert sorted(unranked, key=str) == sorted(expected, key=str)
+    assert [numbered.rank(c) for c in unranked] == list(range(len(numbered)))
+
+def test_rank_of_other_combinations():
+    numbered = _PremiseCombinations(pool, 2, within={sentences[3],
+                                                     sentences[4]})
+    assert numbered.rank((sentences[0], Not(sentences[0]))) is None
+    assert numbered.rank((sentences[0],)) is None
+    assert numbered.rank((sentences[0], Not(symbols("q")))) is None
+    assert numbered.rank((sentences[3], sentences[4])) is None
+
+def test_premise_keys_do_not_depend_on_order():
+    (p, q) = sentences[:2]
+    assert premise_key((p, q)) == premise_key([q, p]) == premise_key(And(q, p))
+    assert premise_key(p) == premise_key((p,))
+
+def test_premise_index_overlay():
+    (p, q, r, s) = sentences[:4]
+    base = PremiseIndex([(p, q)])
+    overlay = base.overlay()
+    overlay.add(And(r, s))
+    overlay.add((q, p))
+
+    assert (q, p) in base and And(p, q) in overlay
+    assert (s, r) in overlay and (s, r) not in base
+    assert len(base) == 1 and len(overlay) == 2
+    assert set(overlay) == {premise_key((p, q)), premise_key((r, s))}
+
+    # Combinations added to the base later are seen by the overlay.
+    base.add((p, r))
+    assert (r, p) in overlay and len(overlay) == 3
+
+def test_fetched_premises_are_uniform_among_the_remaining():
+    rng = random.Random(1)
+    available = enumerated(2)
+    exclude = available[3:]
+    draws = Counter(fetch_premises(pool, 2, exclude=exclude, rng=rng)
+                    for _ in range(3000))
+
+    assert set(draws) == set(available[:3])
+    assert min(draws.values()) > 900
+
+@pytest.mark.parametrize("exclude", [list, PremiseIndex])
+def test_fetched_premises_respect_reordered_exclusions(exclude):
+    rng = random.Random(2)
+    available = enumerated(2)
+    excluded = exclude(tuple(reversed(c)) for c in available[:-1])
+    for _ in range(50):
+        assert fetch_premises(pool, 2, exclude=excluded, rng=rng) \
+               == available[-1]
+
+def test_no_premises_are_fetched_when_all_are_excluded():
+    rng = random.Random(3)
+    assert fetch_premises(pool, 2, exclude=enumerated(2), rng=rng) is False
+    assert fetch_premises(pool, 6, rng=rng) is False
+
+def test_fetched_premises_leave_out_combinations_within():
+    rng = random.Random(4)
+    within = {sentences[3], sentences[4], Not(sentences[0])}
+    for _ in range(200):
+        premises = fetch_premises(pool, [1, 2], rng=rng, exclude_within=within)
+        assert consistent(premises) and not set(premises) <= within
@@ -0,0 +1,73 @@
+"""
+Tests of resuming simulations from snapshots.
+"""
+
+from functools import lru_cache
+import pickle
+import random
+
+import pytest
+
+from taupy import FixedDebateSimulation, Position, Simulation, strategies
+
+
+def positions():
+    return [Position({}, introduction_strategy=strategies.fortify)
+            for _ in range(4)]
+
+def state(simulation):
+    if isinstance(simulation, FixedDebateSimulation):
+        (arguments, stages) = (simulation.uncovered_arguments, None)
+    else:
+        (arguments, stages) = (simulation.arguments, list(simulation))
+    return ([str(a) for a in arguments], stages, simulation.positions[-1],
+            len(simulation.positions), simulation.rng.getstate())
+
+def simulation():
+    return Simulation(positions=positions(), sentencepool="p:8", seed=5,
+                      default_update_strategy="closest_closed_partial_coherent",
+                      initial_position_size=4)
+
+@lru_cache(maxsize=None)
+def debate():
+    # Generating argument maps is slow, so all tests share one.
+    return FixedDebateSimulation.generate_debate(
+        sentencepool="p:8", num_key_statements=1,
+        debate_generation={"max_density": 1.0}, rng=random.Random(4))
+
+def fixed_simulation():
+    return FixedDebateSimulation(positions=positions(), sentencepool="p:8",
+                                 seed=4, debate=debate())
+
+
+@pytest.mark.parametrize("make", [simulation, fixed_simulation])
+def test_restored_simulation_continues_like_the_original(make, tmp_path):
+    continuous = make()
+    continuous.run(max_steps=8, quiet=True)
+
+    interrupted = make()
+    interrupted.run(max_steps=4, quiet=True)
+    interrupted.snapshot(tmp_path / "simulation.snapshot")
+    restored = type(interrupted).restore(tmp_path / "simulation.snapshot")
+
+    assert state(restored) == state(interrupted)
+    assert len(restored.positions) == len(interrupted.positions)
+    assert restored.positions.stages() == [len(restored.positions) - 1]
+
+    restored.run(max_steps=8, quiet=True)
+    assert state(restored) == state(continuous)
+    pickle.dumps(restored)
+
+def test_snapshot_includes_the_log_on_request():
+    original = fixed_simulation()
+    original.run(max_steps=2, quiet=True)
+
+    assert len(type(original).restore(original.snapshot()).log) == 0
+    assert len(type(original).restore(original.snapshot(include_log=True)).log) \
+           == len(original.log)
+
+def test_snapshot_of_another_type_is_refused():
+    original = fixed_simulation()
+    original.run(max_steps=1, quiet=True)
+    with pytest.raises(TypeError):
+        Simulation.restore(original.snapshot())
@@ -0,0 +1,68 @@
+"""
+Tests of the debate stages of a :py:class:`Simulation`, which are stored as
+lengths of its argument log.
+"""
+
+import pickle
+
+import pytest
+from sympy import symbols
+
+from taupy import Argument, Position, Simulation, strategies
+
+
+@pytest.fixture
+def simulation():
+    simulation = Simulation(
+        positions=[Position({}, introduction_strategy=strategies.fortify)
+                   for _ in range(4)],
+        sentencepool="p:8", seed=5)
+    simulation.run(max_steps=4, quiet=True)
+    return simulation
+
+
+def test_list_methods_return_debate_stages(simulation):
+    stages = [simulation[i] for i in range(len(simulation))]
+
+    assert list(simulation) == stages
+    assert list(reversed(simulation)) == stages[::-1]
+    assert simulation.copy() == stages
+    assert simulation == stages and stages == simulation
+    assert not simulation != stages
+    assert simulation != stages[:-1]
+    assert simulation + [None] == stages + [None]
+    assert [None] + simulation == [None] + stages
+
+def test_stages_are_found_by_their_arguments(simulation):
+    (p0, p1, p2) = symbols("p0 p1 p2")
+    for (i, stage) in enumerate(simulation):
+        assert stage in simulation
+        assert simulation.index(stage) == i
+        assert simulation.count(stage) == 1
+
+    foreign = Argument(p0 & p1, p2)
+    assert foreign not in simulation and 3 not in simulation
+    assert simulation.count(foreign) == 0
+    with pytest.raises(ValueError):
+        simulation.index(foreign)
+
+def test_stages_can_not_be_replaced(simulation):
+    for change in [lambda s: s.insert(0, s[0]), lambda s: s.sort(),
+                   lambda s: s.__setitem__(0, s[0]), lambda s: s.__delitem__(0)]:
+        with pytest.raises(TypeError):
+            change(simulation)
+
+def test_popped_stages_discard_their_arguments(simulation):
+    last = simulation[-1]
+    arguments = list(simulation.arguments)
+    premises = list(simulation.used_premises)
+
+    assert simulation.pop() == last
+    assert simulation.arguments == arguments[:-1]
+    assert simulation.used_premises == premises[:-1]
+    assert len(simulation.premise_index) == len(premises) - 1
+
+    # The simulation continues from the remaining stages.
+    simulation.run(max_steps=6, quiet=True)
+    assert len(simulation.used_premises) == len(simulation.arguments)
+    assert pickle.loads(pickle.dumps(simulation)) == simulation
@@ -0,0 +1,83 @@
+"""
+Tests of experiments that stream their results to an :py:class:`ExperimentStore`.
+"""
+
+import pytest
+
+from taupy import ExperimentStore, Position, strategies, streaming_experiment
+
+EXECUTOR = {"max_workers": 1}
+RUNS = {"max_steps": 3}
+
+
+def settings():
+    positions = [Position(None, introduction_strategy=strategies.attack)
+                 for _ in range(4)]
+    return {"positions": positions, "sentencepool": "p:6"}
+
+def outcome(simulation):
+    return ([str(a) for a in simulation.arguments], list(simulation))
+
+
+def test_store_keeps_results_and_failures(tmp_path):
+    store = ExperimentStore(tmp_path)
+    store.save(1, "first")
+    store.save_failure(0, "Traceback")
+    store.save_failure(2, "Traceback")
+    store.save(2, "third")
+
+    assert store.completed() == [1, 2]
+    assert store.failed() == [0]
+    assert store.results() == ["first", "third"]
+    assert store.failures() == {0: "Traceback"}
+    assert list(tmp_path.glob("*.tmp")) == []
+
+def test_resumed_experiment_keeps_its_seed(tmp_path):
+    # Without a seed, the resumed runs still receive the seeds of the first call.
+    partial = streaming_experiment(3, tmp_path / "partial", executor=EXECUTOR,
+                                   simulations=settings(), runs=RUNS)
+    kept = partial.load(0)
+    (partial.path / "run_000001.pickle").unlink()
+    (partial.path / "run_000002.pickle").unlink()
+    partial = streaming_experiment(3, tmp_path / "partial", executor=EXECUTOR,
+                                   simulations=settings(), runs=RUNS)
+
+    complete = streaming_experiment(3, tmp_path / "complete", executor=EXECUTOR,
+                                    simulations=settings(), runs=RUNS,
+                                    seed=partial.settings()["seed"])
+    assert partial.completed() == [0, 1, 2]
+    assert outcome(partial.load(0)) == outcome(kept)
+    assert [outcome(r) for r in partial.results()] \
+           == [outcome(r) for r in complete.results()]
+
+def test_seeded_resumed_experiment_equals_uninterrupted_one(tmp_path):
+    complete = streaming_experiment(3, tmp_path / "complete", executor=EXECUTOR,
+                                    simulations=settings(), runs=RUNS, seed=5)
+    partial = streaming_experiment(3, tmp_path / "partial", executor=EXECUTOR,
+                                   simulations=settings(), runs=RUNS, seed=5)
+    (partial.path / "run_000001.pickle").unlink()
+    partial = streaming_experiment(3, tmp_path / "partial", executor=EXECUTOR,
+                                   simulations=settings(), runs=RUNS, seed=5)
+
+    assert [outcome(r) for r in partial.results()] \
+           == [outcome(r) for r in complete.results()]
+
+@pytest.mark.parametrize("changed", [{"n": 4}, {"seed": 6},
+                                     {"runs": {"max_steps": 4}},
+                                     {"simulations": {**settings(),
+                                                      "sentencepool": "p:7"}}])
+def test_resuming_with_other_settings_fails(tmp_path, changed):
+    arguments = {"n": 1, "path": tmp_path, "executor": EXECUTOR,
+                 "simulations": settings(), "runs": RUNS, "seed": 5}
+    streaming_experiment(**arguments)
+    with pytest.raises(ValueError):
+        streaming_experiment(**{**arguments, **changed})
+    assert ExperimentStore(tmp_path).completed() == [0]
+
+def test_failed_runs_are_recorded_and_retried(tmp_path):
+    broken = {**settings(), "debate_growth": "unknown"}
+    store = streaming_experiment(2, tmp_path, executor=EXECUTOR,
+                                 simulations=broken, runs=RUNS)
+    assert store.completed() == []
+    assert store.failed() == [0, 1]
+    assert all("Traceback" in tb for tb in store.failures().values())
@@ -0,0 +1,137 @@
+"""
+Tests of the MaxSAT search for closest closed and coherent partial positions,
+and of the worker processes that perform it in parallel.
+"""
+
+from itertools import product
+import random
+import sys
+
+import pytest
+from sympy import And, Not, symbols
+
+from taupy import (Argument, Debate, Position, Simulation, closedness,
+                   dict_to_prop, edit_distance, satisfiability, strategies)
+from taupy.basic.utilities import z3_assertions_from_debate
+from taupy.simulation import update
+from taupy.simulation.update import (UpdatePool,
+                                     closest_closed_partial_neighbours)
+
+
+def random_debate(rng, sentences, arguments=5):
+    def literal(s):
+        return s if rng.random() < 0.5 else Not(s)
+
+    debate = []
+    while len(debate) < arguments:
+        premises = rng.sample(sentences, 2)
+        conclusion = rng.choice([s for s in sentences if s not in premises])
+        debate.append(Argument(And(*map(literal, premises)), literal(conclusion)))
+    return Debate(*debate)
+
+def closed_coherent_positions(debate):
+    """
+    All closed and coherent partial positions on the sentences of ``debate``.
+    """
+    atoms = sorted(debate.atoms(), key=str)
+    positions = []
+    for values in product([True, False, None], repeat=len(atoms)):
+        position = {a: v for (a, v) in zip(atoms, values) if v is not None}
+        if satisfiability(And(dict_to_prop(position), debate)) \
+           and closedness(position, debate=debate):
+            positions.append(position)
+    return positions
+
+def cases(n):
+    rng = random.Random(2)
+    sentences = list(symbols("p:4"))
+    found = []
+    while len(found) < n:
+        debate = random_debate(rng, sentences)
+        if satisfiability(debate):
+            atoms = sorted(debate.atoms(), key=str)
+            found.append((debate, {a: rng.choice([True, False]) for a in atoms}))
+    return found
+
+
+@pytest.mark.parametrize("debate, position", cases(6))
+def test_neighbours_are_the_closest_closed_coherent_positions(debate, position):
+    neighbours = closest_closed_partial_neighbours(position, debate=debate,
+                                                   search_radius=2**8,
+                                                   rng=random.Random(0))
+
+    candidates = closed_coherent_positions(debate)
+    best = min(edit_distance(c, position) for c in candidates)
+    expected = {frozenset(c.items()) for c in candidates
+                if edit_distance(c, position) == best}
+
+    keys = [frozenset(n.items()) for n in neighbours]
+    assert len(keys) == len(set(keys))
+    assert set(keys) == expected
+
+@pytest.mark.parametrize("debate, position", cases(3))
+def test_capped_enumeration_agrees_on_small_debates(debate, position):
+    def search(max_models):
+        return closest_closed_partial_neighbours(position, debate=debate,
+                                                 search_radius=2**8,
+                                                 max_models=max_models,
+                                                 rng=random.Random(0))
+
+    def keys(neighbours):
+        return {frozenset(n.items()) for n in neighbours}
+
+    assert keys(search(None)) == keys(search(1000))
+    for neighbour in search(1):
+        assert closedness(neighbour, debate=debate)
+        assert satisfiability(And(dict_to_prop(neighbour), debate))
+
+def test_pool_sends_only_new_arguments():
+    (a, b, c) = random_debate(random.Random(3), list(symbols("p:4")),
+                              arguments=3).args
+    pool = UpdatePool({"max_workers": 1})
+    try:
+        assert pool.stage([a, b], 2) == (0, 0, [a, b], 2, 1)
+        assert pool.stage([a, b, c], 3) == (0, 2, [c], 3, 2)
+        assert pool.complete((0, 2, [c], 3, 2)) == (0, 0, [a, b, c], 3, 2)
+        # Workers start over if arguments were discarded.
+        assert pool.stage([a, c], 1) == (1, 0, [a, c], 1, 3)
+    finally:
+        pool.shutdown()
+
+def test_worker_stage_is_built_incrementally(monkeypatch):
+    monkeypatch.setattr(update, "_worker_stage",
+                        {"epoch": None, "arguments": [], "compiled": {},
+                         "response": None})
+    arguments = random_debate(random.Random(4), list(symbols("p:4"))).args
+
+    assert update._update_worker_stage(0, 0, list(arguments[:2]), 1, 1)
+    assert update._update_worker_stage(0, 2, list(arguments[2:]), 3, 2)
+    stage = update._worker_stage
+    assert stage["debate"] == Debate(*arguments)
+    assert [str(x) for x in stage["debate_assertions"]] \
+           == [str(x) for x in z3_assertions_from_debate(Debate(*arguments))]
+    assert [str(x) for x in stage["assertions"]] \
+           == [str(z3_assertions_from_debate(x)[0]) for x in arguments[:3]]
+
+    # A worker that missed a stage asks for all of its arguments.
+    assert not update._update_worker_stage(1, 5, [], 3, 3)
+
+def test_pool_is_kept_for_a_run(monkeypatch):
+    simulation = Simulation(
+        positions=[Position({}, introduction_strategy=strategies.fortify)
+                   for _ in range(4)],
+        sentencepool="p:6", seed=2, initial_position_size=3,
+        default_update_strategy="closest_closed_partial_coherent",
+        update_executor={"max_workers": 1})
+    pools = []
+    def recording(simulation, **kwargs):
+        update.response(simulation=simulation, **kwargs)
+        pools.append(simulation._update_pool)
+    monkeypatch.setattr(sys.modules[Simulation.__module__], "response",
+                        recording)
+    simulation.run(max_steps=4, quiet=True)
+
+    assert len(pools) == 4 and pools[0] is not None
+    assert all(p is pools[0] for p in pools)
+    assert simulation._update_pool is None
+    assert len(simulation.positions) == len(simulation)